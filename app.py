@@ -49,23 +49,66 @@ CORS(app, resources={r"/*": {"origins": "*"}}, allow_headers=["Content-Type", "A
 app.config.from_object(Config)
 app.config['SECRET_KEY'] = 'secret_key_skripsi_smartinfra'
 
+# JSON provider cepat (orjson, fallback ke json stdlib)
+from utils.json_provider import FastJSONProvider
+app.json = FastJSONProvider(app)
+
 db.init_app(app)
 
+# =========================
+# RESPONSE CACHE INIT
+# =========================
+from utils.response_cache import response_cache
+response_cache.configure(
+    max_entries=app.config['RESPONSE_CACHE_MAX_ENTRIES'],
+    ttl=app.config['RESPONSE_CACHE_TTL']
+)
+
+# =========================
+# RESPONSE COMPRESSION INIT
+# =========================
+from utils.compression import init_compression
+init_compression(app)
+
 # =========================
 # YOLO MODEL INIT
 # =========================
-from ultralytics import YOLO
+from utils.detector import load_detector
 
-MODEL_PATH = os.path.join(os.path.dirname(__file__), 'best.pt')
+MODEL_PATH = app.config['DETECTOR_MODEL_PATH']
 yolo_model = None
 
 try:
-    yolo_model = YOLO(MODEL_PATH)
-    print(f"✅ YOLO model loaded successfully from: {MODEL_PATH}")
+    yolo_model = load_detector(
+        app.config['DETECTOR_BACKEND'],
+        MODEL_PATH,
+        imgsz=app.config['DETECTOR_IMGSZ'],
+        providers=app.config['DETECTOR_PROVIDERS'],
+        threads=app.config['DETECTOR_THREADS']
+    )
+    print(f"✅ YOLO model loaded successfully from: {MODEL_PATH} (backend: {app.config['DETECTOR_BACKEND']})")
 except Exception as e:
     print(f"⚠️ Failed to load YOLO model: {e}")
     yolo_model = None
 
+# Gabungkan predict() dari upload bersamaan jadi satu batch
+if yolo_model is not None and app.config['INFERENCE_MAX_BATCH_SIZE'] > 1:
+    from utils.inference_batcher import InferenceBatcher
+    yolo_model = InferenceBatcher(
+        yolo_model,
+        max_batch_size=app.config['INFERENCE_MAX_BATCH_SIZE'],
+        max_wait_ms=app.config['INFERENCE_MAX_WAIT_MS']
+    )
+
+# =========================
+# DETECTION CACHE INIT
+# =========================
+from utils.detection_cache import detection_cache
+detection_cache.configure(
+    max_entries=app.config['DETECTION_CACHE_MAX_ENTRIES'],
+    cache_dir=app.config['DETECTION_CACHE_DIR']
+)
+
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 # =========================
@@ -73,7 +116,7 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 # =========================
 from routes.auth import auth_bp
 from routes.users import users_bp
-from routes.posts import posts_bp, set_yolo_model
+from routes.posts import posts_bp, set_yolo_model, process_detection_job
 from routes.admin import admin_bp, check_and_migrate_db
 from routes.others import others_bp, set_chatbot, set_sentiment_service
 
@@ -82,6 +125,21 @@ set_yolo_model(yolo_model)
 set_chatbot(chatbot)
 set_sentiment_service(predict_sentiment)
 
+from utils.detection_jobs import detection_queue, requeue_pending_jobs
+detection_queue.configure(
+    max_workers=app.config['DETECTION_WORKERS'],
+    job_timeout=app.config['DETECTION_JOB_TIMEOUT']
+)
+
+# Jalankan ulang job deteksi yang tertinggal saat server mati. Dijalankan saat import
+# supaya juga berlaku di gunicorn; tiap worker boleh ikut requeue karena job diklaim atomik.
+try:
+    requeued = requeue_pending_jobs(app, process_detection_job)
+    if requeued:
+        print(f"🔁 Requeued {requeued} detection job(s)")
+except Exception as e:
+    print(f"⚠️ Failed to requeue detection jobs: {e}")
+
 # Register blueprints
 app.register_blueprint(auth_bp)
 app.register_blueprint(users_bp)
@@ -12,3 +12,42 @@ class Config:
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
     
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # Limit upload 16M
+
+    # Response cache in-process untuk endpoint feed (per worker)
+    RESPONSE_CACHE_MAX_ENTRIES = 512
+    RESPONSE_CACHE_TTL = 30  # detik
+
+    # Kompresi gzip/brotli untuk response di atas ukuran ini (byte)
+    COMPRESSION_MIN_SIZE = 1024
+
+    # Upload: 'sync' (deteksi di dalam request) atau 'async' (DetectionJob + polling)
+    UPLOAD_MODE = os.environ.get('UPLOAD_MODE', 'sync')
+    DETECTION_WORKERS = 2  # jumlah thread worker deteksi per proses
+    DETECTION_JOB_TIMEOUT = 300  # detik; job PROCESSING lebih lama dari ini boleh diklaim ulang
+
+    # Backend model deteksi: 'torch' (best.pt, ultralytics) atau 'onnx' (best.onnx, onnxruntime)
+    DETECTOR_BACKEND = os.environ.get('DETECTOR_BACKEND', 'torch')
+    DETECTOR_MODEL_PATH = os.environ.get('DETECTOR_MODEL_PATH') or os.path.join(
+        BASE_DIR, 'best.onnx' if DETECTOR_BACKEND == 'onnx' else 'best.pt')
+    DETECTOR_IMGSZ = 640
+    # Execution provider onnxruntime, mis. ['OpenVINOExecutionProvider', 'CPUExecutionProvider']
+    DETECTOR_PROVIDERS = ['CPUExecutionProvider']
+    DETECTOR_THREADS = None  # None = default onnxruntime (semua core)
+
+    # Micro-batching YOLO: gabungkan predict() bersamaan (1 = tanpa batching)
+    INFERENCE_MAX_BATCH_SIZE = 8
+    INFERENCE_MAX_WAIT_MS = 10
+
+    # Cache hasil deteksi per isi gambar + versi model: jumlah entry in-memory per proses,
+    # folder tier disk opsional (None = hanya memori)
+    DETECTION_CACHE_MAX_ENTRIES = 1024
+    DETECTION_CACHE_DIR = os.environ.get('DETECTION_CACHE_DIR')
+
+    # Normalisasi gambar upload: sisi terpanjang, format simpan ('jpeg'/'webp'), kualitas
+    IMAGE_MAX_SIDE = 1280
+    IMAGE_FORMAT = 'jpeg'
+    IMAGE_QUALITY = 85
+
+    # Deteksi laporan duplikat: jarak Hamming dHash maksimum & radius lokasi (meter)
+    PHASH_MAX_DISTANCE = 8
+    DUPLICATE_RADIUS_M = 30
@@ -0,0 +1,38 @@
+"""
+Script untuk export model YOLO (best.pt) ke ONNX untuk backend DETECTOR_BACKEND=onnx.
+
+Butuh ultralytics (+ torch) hanya saat export; server yang memakai best.onnx
+cukup memasang onnxruntime (atau onnxruntime-openvino).
+
+Jalankan dari root project:
+    python export_onnx.py
+    python export_onnx.py --weights best.pt --imgsz 640
+"""
+import argparse
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def export_onnx(weights, imgsz):
+    """Export best.pt -> best.onnx (batch & ukuran input dinamis, graph disederhanakan)."""
+    from ultralytics import YOLO
+
+    model = YOLO(weights)
+    # dynamic=True: ukuran batch bebas (InferenceBatcher tetap bisa batching) dan
+    # tinggi/lebar bebas, supaya letterbox bisa sama dengan predict() best.pt
+    output_path = model.export(format='onnx', imgsz=imgsz, dynamic=True, simplify=True)
+    print(f"✅ Model exported: {output_path}")
+    return output_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export YOLO best.pt ke ONNX')
+    parser.add_argument('--weights', default=os.path.join(BASE_DIR, 'best.pt'), help='Path model .pt')
+    parser.add_argument('--imgsz', type=int, default=640, help='Ukuran input model')
+    args = parser.parse_args()
+
+    print(f"Exporting {args.weights} ke ONNX...")
+    print("-" * 50)
+    export_onnx(args.weights, args.imgsz)
+    print("Set DETECTOR_BACKEND=onnx untuk memakai model ini.")
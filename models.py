@@ -2,13 +2,39 @@ from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, timezone
 from werkzeug.security import generate_password_hash, check_password_hash
 import enum
-from sqlalchemy import Enum, UniqueConstraint
+from sqlalchemy import Enum, String, UniqueConstraint, DDL, event
+from sqlalchemy.dialects import mysql
+from utils.geo import encode_geohash
 
 
 # Helper function untuk mendapatkan waktu UTC saat ini (timezone-aware)
 def utc_now():
     return datetime.now(timezone.utc)
 
+# Default kolom posts.geohash: dihitung dari latitude/longitude saat INSERT
+def default_geohash(context):
+    params = context.get_current_parameters()
+    if params.get('latitude') is None or params.get('longitude') is None:
+        return None
+    return encode_geohash(params['latitude'], params['longitude'])
+
+# Kolom *_key dibandingkan per code point (utf8mb4_bin di MySQL): filter prefix
+# memakai range key <= kolom < key' (utils/locations.py) yang mengikuti urutan
+# code point, bukan urutan collation default (utf8mb4_0900_ai_ci menaruh tanda
+# baca sebelum huruf/angka, sehingga range untuk key berakhiran 'z' jadi kosong)
+LOCATION_KEY_COLLATION = 'utf8mb4_bin'
+LOCATION_KEY_TYPE = String(100).with_variant(mysql.VARCHAR(100, collation=LOCATION_KEY_COLLATION), 'mysql')
+
+# Normalisasi nama lokasi untuk kolom *_key: huruf kecil, spasi dirapikan
+def normalize_location(value):
+    return ' '.join(value.split()).lower() if value else ''
+
+def location_key_default(column):
+    """Default kolom *_key: diisi dari kolom lokasi aslinya saat INSERT"""
+    def default(context):
+        return normalize_location(context.get_current_parameters().get(column))
+    return default
+
 db = SQLAlchemy()
 
 # 1. Role User
@@ -111,12 +137,21 @@ class Post(db.Model):
 
     latitude = db.Column(db.Numeric(10, 8), nullable=False)
     longitude = db.Column(db.Numeric(11, 8), nullable=False)
+    # Geohash koordinat (di-index) untuk query area peta
+    geohash = db.Column(db.String(12), nullable=True, index=True, default=default_geohash)
+    # dHash 64-bit (hex) foto untuk deteksi laporan duplikat
+    phash = db.Column(db.String(16), nullable=True)
     address = db.Column(db.String(255), nullable=True)
     
     # Lokasi detail untuk filter/sort
     province = db.Column(db.String(100), nullable=True)     # Provinsi (administrativeArea)
     city = db.Column(db.String(100), nullable=True)         # Kota/Kabupaten (subAdministrativeArea)
     district = db.Column(db.String(100), nullable=True)     # Kecamatan (locality)
+    
+    # Versi ternormalisasi (lowercase) dari kolom lokasi, di-index untuk filter exact/prefix
+    province_key = db.Column(LOCATION_KEY_TYPE, nullable=True, index=True, default=location_key_default('province'))
+    city_key = db.Column(LOCATION_KEY_TYPE, nullable=True, index=True, default=location_key_default('city'))
+    district_key = db.Column(LOCATION_KEY_TYPE, nullable=True, index=True, default=location_key_default('district'))
 
     # Info Kerusakan
     pothole_count = db.Column(db.Integer, default=0)
@@ -127,24 +162,50 @@ class Post(db.Model):
     confirm_count = db.Column(db.Integer, default=0) 
     false_count = db.Column(db.Integer, default=0)   
     
+    # Skor trending yang disimpan (bisa di-index), diperbarui setiap verifikasi
+    engagement_score = db.Column(db.Float, default=0, nullable=False)
+    
     # Status penanganan oleh petugas (disimpan sebagai uppercase untuk match dengan MySQL ENUM)
     status = db.Column(db.String(20), default='MENUNGGU', nullable=False)
     
     created_at = db.Column(db.DateTime(timezone=True), default=utc_now)
 
+    __table_args__ = (
+        # Feed trending: status != 'SELESAI' bukan range di kolom depan, jadi index
+        # diawali kunci urut dan status dicek sebagai filter sisa
+        db.Index('ix_posts_engagement', 'engagement_score', 'created_at', 'id'),
+        # /api/posts/query?status=...&sort=trending: equality status lalu urut engagement_score
+        db.Index('ix_posts_status_engagement', 'status', 'engagement_score', 'created_at'),
+        # /api/posts/query: filter equality lalu urut created_at (lihat utils/post_filters.py)
+        db.Index('ix_posts_created', 'created_at'),
+        db.Index('ix_posts_status_created', 'status', 'created_at'),
+        db.Index('ix_posts_severity_created', 'severity', 'created_at'),
+        db.Index('ix_posts_location_created', 'province_key', 'city_key', 'district_key', 'created_at'),
+        db.Index('ix_posts_user_created', 'user_id', 'created_at'),
+        # Refcount file gambar content-addressed
+        db.Index('ix_posts_image_path', 'image_path'),
+    )
+
     @property
     def uploaded_by(self):
         return self.author.full_name if self.author else 'Unknown'
 
+    def update_engagement_score(self):
+        """Hitung ulang engagement_score dari jumlah vote (titik untuk menambah time decay)"""
+        self.engagement_score = (self.confirm_count or 0) + (self.false_count or 0)
+
     def to_dict(self):
         from flask import request
-        full_image_url = f"{request.host_url}uploads/{self.image_path}"
+        upload_base = f"{request.host_url}uploads/"
         
         return {
             'id': self.id,
             'user_id': self.user_id,
             'uploaded_by': self.uploaded_by,
-            'image_url': full_image_url,
+            'image_url': upload_base + self.image_path,
+            # Varian kecil untuk list feed & marker peta
+            'thumb_url': f"{upload_base}thumb/{self.image_path}",
+            'medium_url': f"{upload_base}medium/{self.image_path}",
             'lat': float(self.latitude),
             'long': float(self.longitude),
             'address': self.address if self.address else "Lokasi tidak diketahui",
@@ -164,6 +225,28 @@ class Post(db.Model):
             'date': self.created_at.strftime('%Y-%m-%d %H:%M')
         }
 
+# --- FULL-TEXT SEARCH POSTS (address + caption) ---
+# MySQL: index FULLTEXT di tabel posts. SQLite (test/dev): tabel virtual FTS5
+# external-content yang disinkronkan lewat trigger (tidak menyimpan teks dua kali).
+POSTS_FULLTEXT_MYSQL = "ALTER TABLE posts ADD FULLTEXT INDEX ix_posts_fulltext (address, caption)"
+
+POSTS_FTS_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+    "address, caption, content='posts', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts(rowid, address, caption) VALUES (new.id, new.address, new.caption); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, address, caption) VALUES ('delete', old.id, old.address, old.caption); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF address, caption ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, address, caption) VALUES ('delete', old.id, old.address, old.caption); "
+    "INSERT INTO posts_fts(rowid, address, caption) VALUES (new.id, new.address, new.caption); END",
+]
+
+event.listen(Post.__table__, 'after_create', DDL(POSTS_FULLTEXT_MYSQL).execute_if(dialect='mysql'))
+for _stmt in POSTS_FTS_SQLITE:
+    event.listen(Post.__table__, 'after_create', DDL(_stmt).execute_if(dialect='sqlite'))
+event.listen(Post.__table__, 'before_drop', DDL("DROP TABLE IF EXISTS posts_fts").execute_if(dialect='sqlite'))
+
 # --- MODEL VERIFIKASI ---
 class PostVerification(db.Model):
     __tablename__ = 'post_verifications'
@@ -175,4 +258,65 @@ class PostVerification(db.Model):
     verification_type = db.Column(Enum(VerificationType), nullable=False)
     created_at = db.Column(db.DateTime(timezone=True), default=utc_now)
 
-    __table_args__ = (UniqueConstraint('post_id', 'user_id', name='unique_user_verification'),)
\ No newline at end of file
+    __table_args__ = (UniqueConstraint('post_id', 'user_id', name='unique_user_verification'),)
+
+# --- MODEL VERSI RESOURCE (UNTUK ETAG) ---
+# Satu baris per resource ('posts', 'reviews', 'users'), dinaikkan oleh route
+# yang menulis ke resource tersebut. Dibaca endpoint list untuk ETag murah.
+class ResourceVersion(db.Model):
+    __tablename__ = 'resource_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+
+# --- MODEL FACET LOKASI ---
+# Satu baris per kombinasi (provinsi, kota, kecamatan) yang pernah dipakai post,
+# beserta jumlah post-nya. Dipelihara incremental oleh upload/delete post,
+# menggantikan SELECT DISTINCT atas seluruh tabel posts.
+class PostLocation(db.Model):
+    __tablename__ = 'post_locations'
+
+    id = db.Column(db.Integer, primary_key=True)
+    province = db.Column(db.String(100), nullable=False, default='')
+    city = db.Column(db.String(100), nullable=False, default='')
+    district = db.Column(db.String(100), nullable=False, default='')
+    post_count = db.Column(db.Integer, default=0, nullable=False)
+
+    __table_args__ = (UniqueConstraint('province', 'city', 'district', name='unique_post_location'),)
+
+# --- MODEL JOB DETEKSI (UPLOAD ASYNC) ---
+# Upload mode async menyimpan gambar lalu membuat job ini; worker pool menjalankan
+# deteksi YOLO dan membuat post. Client mem-poll status lewat /api/upload/jobs/<id>.
+# Status: QUEUED -> PROCESSING -> DONE (post dibuat) / REJECTED (tidak ada lubang) / FAILED
+class DetectionJob(db.Model):
+    __tablename__ = 'detection_jobs'
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    status = db.Column(db.String(20), default='QUEUED', nullable=False, index=True)
+
+    # Data upload yang dibutuhkan untuk membuat post setelah deteksi
+    image_path = db.Column(db.String(255), nullable=False)
+    latitude = db.Column(db.Numeric(10, 8), nullable=False)
+    longitude = db.Column(db.Numeric(11, 8), nullable=False)
+    address = db.Column(db.String(255), nullable=True)
+    province = db.Column(db.String(100), nullable=True)
+    city = db.Column(db.String(100), nullable=True)
+    district = db.Column(db.String(100), nullable=True)
+
+    post_id = db.Column(db.Integer, db.ForeignKey('posts.id', ondelete='SET NULL'), nullable=True)
+    error = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), default=utc_now)
+    updated_at = db.Column(db.DateTime(timezone=True), default=utc_now, onupdate=utc_now)
+
+    post = db.relationship('Post')
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'post': self.post.to_dict() if self.post else None,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'updated_at': self.updated_at.strftime('%Y-%m-%d %H:%M:%S') if self.updated_at else None
+        }
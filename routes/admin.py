@@ -3,8 +3,13 @@ Admin Routes - Dashboard Stats, User Management, DB Migration
 """
 from flask import Blueprint, request, jsonify
 from sqlalchemy import func
-from models import db, User, UserRole, Post, Review
+from models import db, User, UserRole, Post, Review, ResourceVersion, PostLocation, DetectionJob, LOCATION_KEY_COLLATION
 from utils.decorators import token_required
+from utils.http_cache import mark_changed
+from utils.response_cache import response_cache
+from utils.clustering import cluster_cache
+from utils.detection_jobs import detection_queue
+from utils.detection_cache import detection_cache
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -144,13 +149,98 @@ def admin_update_user(current_user, user_id):
         user.set_password(data['password'])
     if 'points' in data: user.points = int(data['points'])
     
+    mark_changed('users')
     db.session.commit()
     return jsonify({'message': 'User berhasil diperbarui', 'user': user.to_dict()})
 
 
+# =========================
+# CACHE STATS (ADMIN ONLY)
+# =========================
+@admin_bp.route('/api/admin/cache-stats', methods=['GET'])
+@token_required
+def get_cache_stats(current_user):
+    """Counter hit/miss response cache di worker ini"""
+    if current_user.role != UserRole.ADMIN:
+        return jsonify({'error': 'Akses ditolak'}), 403
+    
+    return jsonify({
+        'response_cache': response_cache.stats(),
+        'cluster_cache': cluster_cache.stats(),
+        'detection_queue': detection_queue.stats(),
+        'detection_cache': detection_cache.stats()
+    })
+
+
 # =========================
 # DATABASE MIGRATION
 # =========================
+def backfill_post_geohash(batch_size=1000):
+    """
+    Isi posts.geohash untuk baris lama. Diproses per batch: satu SELECT lalu
+    satu executemany UPDATE per batch, commit per batch.
+    
+    Returns:
+        int: Jumlah baris yang diisi
+    """
+    from sqlalchemy import text
+    from utils.geo import encode_geohash
+    
+    total = 0
+    while True:
+        rows = db.session.execute(
+            text("SELECT id, latitude, longitude FROM posts WHERE geohash IS NULL LIMIT :n"),
+            {'n': batch_size}
+        ).fetchall()
+        if len(rows) == 0:
+            break
+        
+        db.session.execute(
+            text("UPDATE posts SET geohash = :geohash WHERE id = :id"),
+            [{'geohash': encode_geohash(lat, lng), 'id': post_id} for post_id, lat, lng in rows]
+        )
+        db.session.commit()
+        total += len(rows)
+        if len(rows) < batch_size:
+            break
+    return total
+
+
+def backfill_location_keys(batch_size=1000):
+    """
+    Isi posts.province_key/city_key/district_key untuk baris lama, per batch
+    seperti backfill_post_geohash.
+    
+    Returns:
+        int: Jumlah baris yang diisi
+    """
+    from sqlalchemy import text
+    from models import normalize_location
+    
+    total = 0
+    while True:
+        rows = db.session.execute(
+            text("SELECT id, province, city, district FROM posts WHERE province_key IS NULL LIMIT :n"),
+            {'n': batch_size}
+        ).fetchall()
+        if len(rows) == 0:
+            break
+        
+        db.session.execute(
+            text("UPDATE posts SET province_key = :province, city_key = :city, district_key = :district WHERE id = :id"),
+            [
+                {'province': normalize_location(province), 'city': normalize_location(city),
+                 'district': normalize_location(district), 'id': post_id}
+                for post_id, province, city, district in rows
+            ]
+        )
+        db.session.commit()
+        total += len(rows)
+        if len(rows) < batch_size:
+            break
+    return total
+
+
 def check_and_migrate_db(app):
     """Cek dan update schema database jika diperlukan"""
     from sqlalchemy import text, inspect
@@ -221,3 +311,196 @@ def check_and_migrate_db(app):
                     print("✅ Migration: Added 'district' to 'posts'")
                 except Exception as e:
                     print(f"❌ Migration failed: {e}")
+
+            # 5. Cek posts.engagement_score (skor trending yang bisa di-index)
+            if 'engagement_score' not in post_cols:
+                print("⚠️ Column 'engagement_score' missing in 'posts', migrating...")
+                try:
+                    db.session.execute(text("ALTER TABLE posts ADD COLUMN engagement_score FLOAT NOT NULL DEFAULT 0"))
+                    # Backfill semua baris sekaligus
+                    db.session.execute(text(
+                        "UPDATE posts SET engagement_score = COALESCE(confirm_count, 0) + COALESCE(false_count, 0)"
+                    ))
+                    db.session.commit()
+                    print("✅ Migration: Added and backfilled 'engagement_score' in 'posts'")
+                except Exception as e:
+                    print(f"❌ Migration failed: {e}")
+
+            # 6. Cek posts.geohash (query area peta)
+            if 'geohash' not in post_cols:
+                print("⚠️ Column 'geohash' missing in 'posts', migrating...")
+                try:
+                    db.session.execute(text("ALTER TABLE posts ADD COLUMN geohash VARCHAR(12)"))
+                    db.session.commit()
+                    filled = backfill_post_geohash()
+                    print(f"✅ Migration: Added 'geohash' to 'posts' ({filled} rows backfilled)")
+                except Exception as e:
+                    print(f"❌ Migration failed: {e}")
+
+            # 7. Cek posts.phash (deteksi foto duplikat)
+            if 'phash' not in post_cols:
+                print("⚠️ Column 'phash' missing in 'posts', migrating...")
+                try:
+                    db.session.execute(text("ALTER TABLE posts ADD COLUMN phash VARCHAR(16)"))
+                    db.session.commit()
+                    print("✅ Migration: Added 'phash' to 'posts'")
+                except Exception as e:
+                    print(f"❌ Migration failed: {e}")
+
+            post_indexes = [i['name'] for i in inspector.get_indexes('posts')]
+            if 'ix_posts_geohash' not in post_indexes:
+                print("⚠️ Index 'ix_posts_geohash' missing in 'posts', migrating...")
+                try:
+                    db.session.execute(text("CREATE INDEX ix_posts_geohash ON posts (geohash)"))
+                    db.session.commit()
+                    print("✅ Migration: Added index 'ix_posts_geohash'")
+                except Exception as e:
+                    print(f"❌ Migration failed: {e}")
+
+            if 'ix_posts_engagement' not in post_indexes:
+                print("⚠️ Index 'ix_posts_engagement' missing in 'posts', migrating...")
+                try:
+                    db.session.execute(text(
+                        "CREATE INDEX ix_posts_engagement ON posts (engagement_score, created_at, id)"
+                    ))
+                    db.session.commit()
+                    print("✅ Migration: Added index 'ix_posts_engagement'")
+                except Exception as e:
+                    print(f"❌ Migration failed: {e}")
+
+            if 'ix_posts_status_engagement' not in post_indexes:
+                print("⚠️ Index 'ix_posts_status_engagement' missing in 'posts', migrating...")
+                try:
+                    db.session.execute(text(
+                        "CREATE INDEX ix_posts_status_engagement ON posts (status, engagement_score, created_at)"
+                    ))
+                    db.session.commit()
+                    print("✅ Migration: Added index 'ix_posts_status_engagement'")
+                except Exception as e:
+                    print(f"❌ Migration failed: {e}")
+
+            # 8. Cek posts.province_key/city_key/district_key (filter lokasi pakai index)
+            key_type = "VARCHAR(100)"
+            if db.engine.dialect.name == 'mysql':
+                # Urutan code point untuk range prefix (lihat LOCATION_KEY_COLLATION di models.py)
+                key_type = f"VARCHAR(100) CHARACTER SET utf8mb4 COLLATE {LOCATION_KEY_COLLATION}"
+            if 'province_key' not in post_cols:
+                print("⚠️ Columns '*_key' missing in 'posts', migrating...")
+                try:
+                    for col in ('province_key', 'city_key', 'district_key'):
+                        db.session.execute(text(f"ALTER TABLE posts ADD COLUMN {col} {key_type}"))
+                    db.session.commit()
+                    filled = backfill_location_keys()
+                    print(f"✅ Migration: Added location keys to 'posts' ({filled} rows backfilled)")
+                except Exception as e:
+                    print(f"❌ Migration failed: {e}")
+            elif db.engine.dialect.name == 'mysql':
+                # Kolom dari migrasi lama memakai collation default tabel
+                wrong = db.session.execute(text(
+                    "SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'posts' "
+                    "AND COLUMN_NAME IN ('province_key', 'city_key', 'district_key') "
+                    "AND COLLATION_NAME <> :collation"
+                ), {'collation': LOCATION_KEY_COLLATION}).scalars().all()
+                if wrong:
+                    print(f"⚠️ Columns {wrong} in 'posts' not using {LOCATION_KEY_COLLATION}, migrating...")
+                    try:
+                        for col in wrong:
+                            db.session.execute(text(f"ALTER TABLE posts MODIFY {col} {key_type}"))
+                        db.session.commit()
+                        print(f"✅ Migration: Changed location keys to {LOCATION_KEY_COLLATION}")
+                    except Exception as e:
+                        print(f"❌ Migration failed: {e}")
+
+            for col in ('province_key', 'city_key', 'district_key'):
+                index_name = f'ix_posts_{col}'
+                if index_name not in post_indexes:
+                    print(f"⚠️ Index '{index_name}' missing in 'posts', migrating...")
+                    try:
+                        db.session.execute(text(f"CREATE INDEX {index_name} ON posts ({col})"))
+                        db.session.commit()
+                        print(f"✅ Migration: Added index '{index_name}'")
+                    except Exception as e:
+                        print(f"❌ Migration failed: {e}")
+
+            # 9. Index komposit untuk /api/posts/query (filter + urut created_at)
+            composite_indexes = {
+                'ix_posts_created': 'created_at',
+                'ix_posts_status_created': 'status, created_at',
+                'ix_posts_severity_created': 'severity, created_at',
+                'ix_posts_location_created': 'province_key, city_key, district_key, created_at',
+                'ix_posts_user_created': 'user_id, created_at',
+            }
+            for index_name, columns in composite_indexes.items():
+                if index_name not in post_indexes:
+                    print(f"⚠️ Index '{index_name}' missing in 'posts', migrating...")
+                    try:
+                        db.session.execute(text(f"CREATE INDEX {index_name} ON posts ({columns})"))
+                        db.session.commit()
+                        print(f"✅ Migration: Added index '{index_name}'")
+                    except Exception as e:
+                        print(f"❌ Migration failed: {e}")
+
+            # 10. Index posts.image_path (refcount file gambar content-addressed)
+            if 'ix_posts_image_path' not in post_indexes:
+                print("⚠️ Index 'ix_posts_image_path' missing in 'posts', migrating...")
+                try:
+                    db.session.execute(text("CREATE INDEX ix_posts_image_path ON posts (image_path)"))
+                    db.session.commit()
+                    print("✅ Migration: Added index 'ix_posts_image_path'")
+                except Exception as e:
+                    print(f"❌ Migration failed: {e}")
+
+        # 11. Cek tabel resource_versions (versi resource untuk ETag)
+        if 'resource_versions' not in inspector.get_table_names():
+            print("⚠️ Table 'resource_versions' missing, migrating...")
+            try:
+                ResourceVersion.__table__.create(db.engine)
+                print("✅ Migration: Created table 'resource_versions'")
+            except Exception as e:
+                print(f"❌ Migration failed: {e}")
+
+        # 12. Cek tabel post_locations (facet lokasi untuk /api/posts/locations)
+        if 'post_locations' not in inspector.get_table_names():
+            print("⚠️ Table 'post_locations' missing, migrating...")
+            try:
+                from utils.locations import rebuild_location_facets
+                PostLocation.__table__.create(db.engine)
+                count = rebuild_location_facets()
+                print(f"✅ Migration: Created table 'post_locations' ({count} locations)")
+            except Exception as e:
+                print(f"❌ Migration failed: {e}")
+
+        # 13. Cek tabel detection_jobs (upload async)
+        if 'detection_jobs' not in inspector.get_table_names():
+            print("⚠️ Table 'detection_jobs' missing, migrating...")
+            try:
+                DetectionJob.__table__.create(db.engine)
+                print("✅ Migration: Created table 'detection_jobs'")
+            except Exception as e:
+                print(f"❌ Migration failed: {e}")
+
+        # 14. Cek index full-text posts (address + caption) untuk /api/posts/search
+        if 'posts' in inspector.get_table_names():
+            from models import POSTS_FULLTEXT_MYSQL, POSTS_FTS_SQLITE
+            dialect = db.engine.dialect.name
+            
+            if dialect == 'mysql' and 'ix_posts_fulltext' not in [i['name'] for i in inspector.get_indexes('posts')]:
+                print("⚠️ Index 'ix_posts_fulltext' missing in 'posts', migrating...")
+                try:
+                    db.session.execute(text(POSTS_FULLTEXT_MYSQL))
+                    db.session.commit()
+                    print("✅ Migration: Added FULLTEXT index 'ix_posts_fulltext'")
+                except Exception as e:
+                    print(f"❌ Migration failed: {e}")
+            
+            if dialect == 'sqlite' and 'posts_fts' not in inspector.get_table_names():
+                print("⚠️ Table 'posts_fts' missing, migrating...")
+                try:
+                    for stmt in POSTS_FTS_SQLITE:
+                        db.session.execute(text(stmt))
+                    db.session.execute(text("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')"))
+                    db.session.commit()
+                    print("✅ Migration: Created FTS5 table 'posts_fts'")
+                except Exception as e:
+                    print(f"❌ Migration failed: {e}")
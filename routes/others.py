@@ -3,8 +3,14 @@ Other Routes - Chatbot, Reviews, Static Files
 """
 import os
 from flask import Blueprint, request, jsonify, send_from_directory, current_app
+from werkzeug.security import safe_join
 from models import db, Review, UserRole
 from utils.decorators import token_required
+from utils.http_cache import etag_versioned, mark_changed
+from utils.serializers import review_list_query, iter_review_dicts
+from utils.streaming import stream_json_array, wants_stream, STREAM_BATCH_SIZE
+from utils.responses import api_response
+from utils.images import ensure_variant
 
 others_bp = Blueprint('others', __name__)
 
@@ -75,6 +81,7 @@ def create_review(current_user):
         sentiment=sentiment
     )
     db.session.add(review)
+    mark_changed('reviews')
     db.session.commit()
 
     return jsonify({'message': 'Review berhasil dikirim', 'data': review.to_dict()}), 201
@@ -84,9 +91,22 @@ def create_review(current_user):
 # GET REVIEWS
 # =========================
 @others_bp.route('/api/reviews', methods=['GET'])
+@etag_versioned('reviews', 'users')
 def get_reviews():
+    """
+    Daftar semua review (terbaru dulu).
+    
+    Query param:
+    - stream: '1' untuk streaming JSON array (export admin, hemat memori)
+    
+    Mengirim MessagePack jika client meminta `Accept: application/msgpack`
+    (kecuali mode stream yang selalu JSON).
+    """
     global predict_sentiment
     
+    if wants_stream():
+        return stream_json_array(_iter_reviews_streaming())
+    
     reviews = Review.query.order_by(Review.created_at.desc()).all()
     
     # Lazy Analysis: Analisis sentimen untuk review yang belum punya label
@@ -102,9 +122,36 @@ def get_reviews():
                 print(f"⚠️ Failed to analyze review {r.id}: {e}")
     
     if updated:
+        mark_changed('reviews')
         db.session.commit()
     
-    return jsonify([r.to_dict() for r in reviews])
+    return api_response([r.to_dict() for r in reviews])
+
+
+def _iter_reviews_streaming():
+    """
+    Versi streaming get_reviews: baris dibaca lewat server-side cursor tanpa ORM
+    object. Lazy analysis tetap jalan; label baru disimpan sekaligus setelah
+    cursor habis supaya tidak ada write di tengah streaming.
+    """
+    rows = review_list_query().order_by(Review.created_at.desc()).yield_per(STREAM_BATCH_SIZE)
+    
+    updates = []
+    for item in iter_review_dicts(rows):
+        if item['comment'] and item['sentiment'] is None and predict_sentiment:
+            try:
+                sentiment = predict_sentiment(item['comment'])
+                if sentiment:
+                    item['sentiment'] = sentiment
+                    updates.append({'id': item['id'], 'sentiment': sentiment})
+            except Exception as e:
+                print(f"⚠️ Failed to analyze review {item['id']}: {e}")
+        yield item
+    
+    if updates:
+        db.session.bulk_update_mappings(Review, updates)
+        mark_changed('reviews')
+        db.session.commit()
 
 
 # =========================
@@ -118,6 +165,7 @@ def delete_review(current_user, review_id):
 
     review = Review.query.get_or_404(review_id)
     db.session.delete(review)
+    mark_changed('reviews')
     db.session.commit()
     return jsonify({'message': 'Review berhasil dihapus'})
 
@@ -125,6 +173,16 @@ def delete_review(current_user, review_id):
 # =========================
 # STATIC FILE (UPLOADS)
 # =========================
-@others_bp.route('/uploads/<filename>')
+@others_bp.route('/uploads/<path:filename>')
 def uploaded_file(filename):
     return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename)
+
+
+@others_bp.route('/uploads/<any(thumb, medium):variant>/<path:filename>')
+def uploaded_variant(variant, filename):
+    """Varian thumb/medium; dibuat dari file asli saat pertama diminta lalu di-cache di disk"""
+    folder = current_app.config['UPLOAD_FOLDER']
+    if safe_join(folder, filename) is None or not ensure_variant(
+            folder, variant, filename, current_app.config.get('IMAGE_QUALITY', 85)):
+        return jsonify({'error': 'File tidak ditemukan'}), 404
+    return send_from_directory(os.path.join(folder, variant), filename)
@@ -2,14 +2,29 @@
 Posts Routes - Upload, Feed, Verification, Filter
 """
 import os
-import cv2
-import numpy as np
-from datetime import datetime
-from flask import Blueprint, request, jsonify, current_app
-from werkzeug.utils import secure_filename
-from models import db, Post, PostVerification, VerificationType
+import uuid
+from flask import Blueprint, request, jsonify, current_app, url_for, g
+from sqlalchemy import or_
+from models import db, Post, PostVerification, VerificationType, User, UserRole, DetectionJob
 from utils.decorators import token_required
-from utils.ai_helper import analyze_severity
+from utils.ai_helper import analyze_severity, detected_boxes
+from utils.pagination import paginate_keyset, parse_limit, InvalidCursor
+from utils.serializers import (post_list_query, serialize_post_rows, iter_post_dicts,
+                               requested_fields, POST_FIELDS)
+from utils.http_cache import etag_versioned, mark_changed
+from utils.response_cache import cached_response
+from utils.streaming import stream_json_array, wants_stream, STREAM_BATCH_SIZE
+from utils.responses import api_response
+from utils.geo import covering_prefixes, parse_bounds, encode_geohash
+from utils.clustering import get_clusters, MIN_ZOOM, MAX_ZOOM
+from utils.locations import record_post_location, location_facets, location_filter, MATCH_MODES
+from utils.search import parse_search_terms, search_posts_query
+from utils.post_filters import apply_post_filters, QUERY_SORTS
+from utils.detection_jobs import detection_queue
+from utils.images import normalize_image
+from utils.image_store import store_image, release_image, content_digest
+from utils.detection_cache import detection_cache
+from utils.duplicates import dhash, find_near_duplicate
 
 posts_bp = Blueprint('posts', __name__)
 
@@ -25,9 +40,94 @@ def set_yolo_model(model):
 # =========================
 # UPLOAD POST
 # =========================
+def _normalize_upload(data):
+    """Normalisasi gambar upload sesuai config (IMAGE_MAX_SIDE, IMAGE_FORMAT, IMAGE_QUALITY)"""
+    config = current_app.config
+    return normalize_image(
+        data,
+        max_side=config.get('IMAGE_MAX_SIDE', 1280),
+        fmt=config.get('IMAGE_FORMAT', 'jpeg'),
+        quality=config.get('IMAGE_QUALITY', 85)
+    )
+
+
+def _detect_potholes(normalized):
+    """
+    Severity + jumlah lubang untuk gambar hasil normalisasi.
+    Hasil di-cache per isi gambar + versi model, jadi upload ulang byte yang sama tidak
+    menjalankan YOLO lagi.
+    """
+    def detect():
+        h, w, _ = normalized.image.shape
+        results = yolo_model.predict(source=normalized.image, conf=0.4, verbose=False)
+        severity, count = analyze_severity(results, w, h)
+        return severity, count, detected_boxes(results)
+
+    # Versi dari load_detector(); model_version None (mis. mock di test) tidak di-cache
+    version = yolo_model.model_version
+    result = detection_cache.get_or_detect(version, content_digest(normalized.data), detect)
+    return result.severity, result.count
+
+
+def _find_duplicate(phash, lat, lng):
+    """Post dengan foto mirip di dekat koordinat (PHASH_MAX_DISTANCE, DUPLICATE_RADIUS_M)"""
+    config = current_app.config
+    return find_near_duplicate(
+        phash, lat, lng,
+        max_distance=config.get('PHASH_MAX_DISTANCE', 8),
+        radius_m=config.get('DUPLICATE_RADIUS_M', 30)
+    )
+
+
+def _attach_duplicate(post, user):
+    """Upload ulang laporan yang sudah ada dihitung sebagai vote CONFIRM (kecuali oleh pemiliknya)"""
+    if post.user_id != user.id:
+        _record_verification(post, user.id, VerificationType.CONFIRM)
+
+
+def _store_normalized(normalized):
+    """Simpan gambar hasil normalisasi (content-addressed) -> image_path"""
+    config = current_app.config
+    return store_image(config['UPLOAD_FOLDER'], normalized, config.get('IMAGE_QUALITY', 85))[0]
+
+
+def _create_post(user, filename, lat, lng, address, province, city, district, severity, count, phash=None):
+    """Buat post hasil deteksi beserta efek sampingnya (poin, facet, cache). Commit oleh pemanggil."""
+    post = Post(
+        user_id=user.id,
+        image_path=filename,
+        latitude=lat,
+        longitude=lng,
+        geohash=encode_geohash(lat, lng),
+        phash=phash,
+        address=address,
+        province=province,
+        city=city,
+        district=district,
+        pothole_count=count,
+        severity=severity,
+        caption=f"Terdeteksi {count} lubang ({severity})"
+    )
+
+    user.points += 10
+    db.session.add(post)
+    record_post_location(province, city, district, +1)
+    mark_changed('posts')
+    return post
+
+
 @posts_bp.route('/api/upload', methods=['POST'])
 @token_required
 def upload_post(current_user):
+    """
+    Upload laporan baru dengan deteksi lubang.
+    
+    Form:
+    - image (wajib), latitude & longitude (wajib), address, province, city, district
+    - mode: 'sync' -> deteksi di dalam request, 200 berisi post
+            'async' -> 202 berisi job_id, status di GET /api/upload/jobs/<job_id>
+      Default dari config UPLOAD_MODE.
+    """
     global yolo_model
     
     if 'image' not in request.files:
@@ -53,32 +153,70 @@ def upload_post(current_user):
     except (ValueError, TypeError):
         return jsonify({'error': 'Format koordinat tidak valid'}), 400
 
+    mode = (request.form.get('mode') or current_app.config.get('UPLOAD_MODE', 'sync')).lower()
+    if mode not in ('sync', 'async'):
+        return jsonify({'error': "Mode upload harus 'sync' atau 'async'"}), 400
+
     file = request.files['image']
-    file_bytes = np.frombuffer(file.read(), np.uint8)
-    img = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
+    if mode == 'async':
+        return _enqueue_upload(current_user, file.read(), lat, lng, address, province, city, district)
+
+    # Decode tereduksi + orientasi EXIF + downscale, lalu encode ulang untuk disimpan
+    normalized = _normalize_upload(file.read())
 
-    if img is None:
+    if normalized is None:
         return jsonify({'error': 'File tidak valid'}), 400
 
+    # Foto yang sama (di-crop/kompres ulang) di lokasi yang sama: tanpa inferensi
+    phash = dhash(normalized.image)
+    duplicate = _find_duplicate(phash, lat, lng)
+    if duplicate is not None:
+        _attach_duplicate(duplicate, current_user)
+        db.session.commit()
+        return jsonify({
+            'message': 'Laporan serupa sudah ada',
+            'duplicate_of': duplicate.id,
+            'data': duplicate.to_dict()
+        })
+
     if yolo_model is None:
         return jsonify({'error': 'Model AI tidak tersedia. Silakan hubungi administrator.'}), 503
 
-    h, w, _ = img.shape
-    
     # Jalankan inferensi menggunakan model YOLO lokal
-    results = yolo_model.predict(source=img, conf=0.4, verbose=False)
-    severity, count = analyze_severity(results, w, h)
+    severity, count = _detect_potholes(normalized)
 
     if count == 0:
         return jsonify({'message': 'Tidak terdeteksi lubang'}), 406
 
-    filename = secure_filename(f"{int(datetime.now().timestamp())}_{current_user.id}.jpg")
-    path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+    # Content-addressed: foto identik tidak ditulis ulang
+    filename = _store_normalized(normalized)
 
-    with open(path, 'wb') as f:
-        f.write(file_bytes)
+    post = _create_post(current_user, filename, lat, lng, address, province, city, district, severity, count, phash)
+    db.session.commit()
+    # release_image() bersamaan (post lain dengan foto sama dihapus) bisa saja baru membuang file ini
+    _store_normalized(normalized)
 
-    post = Post(
+    return jsonify({'message': 'Upload berhasil', 'data': post.to_dict()})
+
+
+# =========================
+# UPLOAD ASYNC (DETECTION JOB)
+# =========================
+def _enqueue_upload(current_user, image_bytes, lat, lng, address, province, city, district):
+    """Simpan byte asli (.upload), buat DetectionJob, lalu serahkan normalisasi & deteksi ke worker"""
+    if not image_bytes:
+        return jsonify({'error': 'File tidak valid'}), 400
+
+    if yolo_model is None:
+        return jsonify({'error': 'Model AI tidak tersedia. Silakan hubungi administrator.'}), 503
+
+    job_id = uuid.uuid4().hex
+    filename = f"{job_id}.upload"
+    with open(os.path.join(current_app.config['UPLOAD_FOLDER'], filename), 'wb') as f:
+        f.write(image_bytes)
+
+    job = DetectionJob(
+        id=job_id,
         user_id=current_user.id,
         image_path=filename,
         latitude=lat,
@@ -86,69 +224,263 @@ def upload_post(current_user):
         address=address,
         province=province,
         city=city,
-        district=district,
-        pothole_count=count,
-        severity=severity,
-        caption=f"Terdeteksi {count} lubang ({severity})"
+        district=district
     )
+    db.session.add(job)
+    db.session.commit()
 
-    current_user.points += 10
-    db.session.add(post)
+    detection_queue.submit(current_app._get_current_object(), job_id, process_detection_job)
+
+    status_url = url_for('posts.get_detection_job', job_id=job_id)
+    response = jsonify({
+        'message': 'Upload diterima, deteksi sedang diproses',
+        'job_id': job_id,
+        'status': 'QUEUED',
+        'status_url': status_url
+    })
+    response.status_code = 202
+    response.headers['Location'] = status_url
+    return response
+
+
+def _finish_rejected_job(job, path, status, error):
+    """Job tanpa post: hapus gambar yang sudah disimpan lalu catat statusnya"""
+    if os.path.exists(path):
+        os.remove(path)
+    job.status = status
+    job.error = error
     db.session.commit()
 
-    return jsonify({'message': 'Upload berhasil', 'data': post.to_dict()})
+
+def process_detection_job(job):
+    """
+    Handler worker untuk satu DetectionJob (dipanggil di app context worker).
+    Hasil: DONE + post_id, DUPLICATE + post_id laporan yang sudah ada,
+    REJECTED jika tidak ada lubang, FAILED jika gambar rusak.
+    Exception (-> FAILED oleh DetectionJobQueue) ikut menghapus byte asli (.upload).
+    """
+    path = os.path.join(current_app.config['UPLOAD_FOLDER'], job.image_path)
+    try:
+        _run_detection_job(job, path)
+    except Exception:
+        if path.endswith('.upload') and os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+def _run_detection_job(job, path):
+    with open(path, 'rb') as f:
+        normalized = _normalize_upload(f.read())
+    if normalized is None:
+        return _finish_rejected_job(job, path, 'FAILED', 'File tidak valid')
+
+    user = db.session.get(User, job.user_id)
+    lat, lng = float(job.latitude), float(job.longitude)
+    phash = dhash(normalized.image)
+    duplicate = _find_duplicate(phash, lat, lng)
+    if duplicate is not None:
+        _attach_duplicate(duplicate, user)
+        os.remove(path)
+        job.image_path = duplicate.image_path
+        job.post_id = duplicate.id
+        job.status = 'DUPLICATE'
+        db.session.commit()
+        return
+
+    if yolo_model is None:
+        raise RuntimeError('Model AI tidak tersedia')
+
+    severity, count = _detect_potholes(normalized)
+    if count == 0:
+        return _finish_rejected_job(job, path, 'REJECTED', 'Tidak terdeteksi lubang')
+
+    # Ganti byte asli dengan hasil normalisasi (content-addressed)
+    filename = _store_normalized(normalized)
+    os.remove(path)
+
+    post = _create_post(user, filename, lat, lng, job.address,
+                        job.province, job.city, job.district, severity, count, phash)
+    db.session.flush()
+    job.image_path = filename
+    job.post_id = post.id
+    job.status = 'DONE'
+    db.session.commit()
+    _store_normalized(normalized)
+
+
+@posts_bp.route('/api/upload/jobs/<job_id>', methods=['GET'])
+@token_required
+def get_detection_job(current_user, job_id):
+    """Status job deteksi (QUEUED, PROCESSING, DONE, DUPLICATE, REJECTED, FAILED) + post hasilnya"""
+    job = db.session.get(DetectionJob, job_id)
+    if job is None or (job.user_id != current_user.id and current_user.role != UserRole.ADMIN):
+        return jsonify({'error': 'Job tidak ditemukan'}), 404
+
+    # Job yang tertahan (proses pemegangnya mati) dijadwalkan ulang saat di-poll
+    detection_queue.resubmit_if_stale(current_app._get_current_object(), job_id, process_detection_job)
+    return jsonify(job.to_dict())
 
 
 # =========================
 # GET POSTS (FEED)
 # =========================
+# Mode sort feed: masing-masing mengembalikan (query, sort keys DESC, row -> nilai key).
+# Kolom terakhir selalu Post.id supaya urutan (dan cursor) unik.
+def _feed_terbaru(fields=None):
+    return (post_list_query(fields),
+            [Post.created_at, Post.id],
+            lambda r: [r.created_at, r.id])
+
+
+def _feed_trending(fields=None):
+    # Exclude posts yang sudah selesai
+    return (post_list_query(fields).filter(Post.status != 'SELESAI'),
+            [Post.engagement_score, Post.created_at, Post.id],
+            lambda r: [r.engagement_score, r.created_at, r.id])
+
+
+def _feed_selesai(fields=None):
+    return (post_list_query(fields).filter(Post.status == 'SELESAI'),
+            [Post.created_at, Post.id],
+            lambda r: [r.created_at, r.id])
+
+
+FEED_SORTS = {
+    'terbaru': _feed_terbaru,
+    'trending': _feed_trending,
+    'selesai': _feed_selesai,
+}
+
+
 @posts_bp.route('/api/posts', methods=['GET'])
+@etag_versioned('posts', 'users')
+@cached_response('posts', 'users')
 def get_posts():
     """
-    Mendapatkan semua posts dengan opsi sorting.
+    Mendapatkan posts dengan opsi sorting.
     
     Query params:
     - sort: 'terbaru' (default), 'trending', 'selesai'
+    - limit: Jumlah post per halaman (maks 100), mengaktifkan mode paginasi
+    - cursor: Nilai `next_cursor` dari halaman sebelumnya
+    - fields: Field yang dikirim, dipisah koma (opsional), mis. id,lat,long,status
+    
+    Tanpa `limit`/`cursor` endpoint mengembalikan list penuh (kompatibel dengan
+    client lama). Dengan paginasi responsnya {'data': [...], 'next_cursor': ...}.
     """
     sort_type = request.args.get('sort', 'terbaru').lower()
+    if sort_type not in FEED_SORTS:
+        sort_type = 'terbaru'
     
-    if sort_type == 'trending':
-        # Exclude posts yang sudah selesai
-        posts = Post.query.filter(Post.status != 'SELESAI')\
-            .order_by((Post.confirm_count + Post.false_count).desc(), Post.created_at.desc()).all()
-    elif sort_type == 'selesai':
-        posts = Post.query.filter(Post.status == 'SELESAI')\
-            .order_by(Post.created_at.desc()).all()
-    else:
-        posts = Post.query.order_by(Post.created_at.desc()).all()
+    try:
+        fields = requested_fields(POST_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    query, keys, row_key = FEED_SORTS[sort_type](fields)
+    
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        rows = query.order_by(*[k.desc() for k in keys]).all()
+        return api_response(serialize_post_rows(rows, fields))
     
-    return jsonify([p.to_dict() for p in posts])
+    try:
+        limit = parse_limit(request.args.get('limit'))
+    except ValueError:
+        return jsonify({'error': 'Limit harus berupa angka'}), 400
+    
+    try:
+        rows, next_cursor = paginate_keyset(
+            query, sort_type, keys, row_key,
+            cursor=request.args.get('cursor'), limit=limit
+        )
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return api_response({
+        'data': serialize_post_rows(rows, fields),
+        'next_cursor': next_cursor
+    })
+
+
+# =========================
+# QUERY POSTS (FILTER GABUNGAN)
+# =========================
+@posts_bp.route('/api/posts/query', methods=['GET'])
+@etag_versioned('posts', 'users')
+@cached_response('posts', 'users')
+def query_posts():
+    """
+    Satu endpoint untuk filter + sort + paginasi posts.
+    
+    Query params (semua opsional, digabung dengan AND):
+    - status: menunggu, diproses, selesai (bisa dipisah koma) atau 'all'
+    - severity: serius, tidak_serius (bisa dipisah koma)
+    - province, city, district, match: Sama seperti /api/posts/filter
+    - user_id: Post milik user tertentu
+    - from, to: Rentang tanggal dibuat (YYYY-MM-DD, `to` inklusif)
+    - sort: 'terbaru' (default) atau 'trending'
+    - limit: Jumlah post per halaman (default 20, maks 100)
+    - cursor: Nilai `next_cursor` dari halaman sebelumnya
+    - fields: Field yang dikirim, dipisah koma (opsional), mis. id,lat,long,status
+    
+    Response: {'data': [...], 'next_cursor': ...}
+    """
+    sort_type = request.args.get('sort', 'terbaru').lower()
+    if sort_type not in QUERY_SORTS:
+        return jsonify({'error': 'Sort tidak valid'}), 400
+    keys, row_key = QUERY_SORTS[sort_type]
+    
+    try:
+        fields = requested_fields(POST_FIELDS)
+        query = apply_post_filters(post_list_query(fields), request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        limit = parse_limit(request.args.get('limit'))
+    except ValueError:
+        return jsonify({'error': 'Limit harus berupa angka'}), 400
+    
+    try:
+        rows, next_cursor = paginate_keyset(
+            query, f'query-{sort_type}', keys, row_key,
+            cursor=request.args.get('cursor'), limit=limit
+        )
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return api_response({
+        'data': serialize_post_rows(rows, fields),
+        'next_cursor': next_cursor
+    })
 
 
 # =========================
 # GET LOCATIONS (FOR FILTER)
 # =========================
 @posts_bp.route('/api/posts/locations', methods=['GET'])
+@etag_versioned('posts')
+@cached_response('posts')
 def get_posts_locations():
     """
     Mendapatkan daftar unik lokasi (provinsi, kota, kecamatan) dari semua posts.
     Berguna untuk mengisi dropdown filter di map.
-    """
-    provinces = db.session.query(Post.province).filter(Post.province != None, Post.province != '').distinct().all()
-    cities = db.session.query(Post.city).filter(Post.city != None, Post.city != '').distinct().all()
-    districts = db.session.query(Post.district).filter(Post.district != None, Post.district != '').distinct().all()
     
-    return jsonify({
-        'provinces': sorted([p[0] for p in provinces if p[0]]),
-        'cities': sorted([c[0] for c in cities if c[0]]),
-        'districts': sorted([d[0] for d in districts if d[0]])
-    })
+    Query param:
+    - tree: '1' untuk menyertakan hierarki provinsi -> kota -> kecamatan beserta jumlah post
+    
+    Dibaca dari tabel facet post_locations (satu query), bukan DISTINCT atas tabel posts.
+    """
+    with_tree = request.args.get('tree', '').lower() in ('1', 'true', 'yes')
+    return api_response(location_facets(with_tree=with_tree))
 
 
 # =========================
 # FILTER POSTS BY LOCATION
 # =========================
 @posts_bp.route('/api/posts/filter', methods=['GET'])
+@etag_versioned('posts', 'users')
+@cached_response('posts', 'users')
 def get_posts_by_location():
     """
     Filter posts berdasarkan lokasi.
@@ -157,48 +489,190 @@ def get_posts_by_location():
     - province: Filter berdasarkan provinsi
     - city: Filter berdasarkan kota/kabupaten
     - district: Filter berdasarkan kecamatan
+    - match: 'prefix' (default), 'exact' atau 'contains'
+    - stream: '1' untuk streaming JSON array (hemat memori untuk hasil besar)
+    - fields: Field yang dikirim, dipisah koma (opsional), mis. id,lat,long,status
+    
+    Pencocokan tidak peka huruf besar/kecil dan spasi berlebih, memakai kolom
+    *_key yang di-index. 'contains' (substring) tetap tersedia tapi selalu
+    full scan, jadi hanya dipakai jika diminta.
     """
-    province = request.args.get('province', '').strip()
-    city = request.args.get('city', '').strip()
-    district = request.args.get('district', '').strip()
+    match = request.args.get('match', 'prefix').lower()
+    if match not in MATCH_MODES:
+        return jsonify({'error': 'Parameter match harus exact, prefix atau contains'}), 400
+    
+    try:
+        fields = requested_fields(POST_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    query = post_list_query(fields)
     
-    query = Post.query
+    for param, column in (('province', Post.province_key),
+                          ('city', Post.city_key),
+                          ('district', Post.district_key)):
+        value = request.args.get(param, '').strip()
+        if value:
+            query = query.filter(location_filter(column, value, match))
     
-    if province:
-        query = query.filter(Post.province.ilike(f'%{province}%'))
-    if city:
-        query = query.filter(Post.city.ilike(f'%{city}%'))
-    if district:
-        query = query.filter(Post.district.ilike(f'%{district}%'))
+    query = query.order_by(Post.created_at.desc())
     
-    posts = query.order_by(Post.created_at.desc()).all()
+    if wants_stream():
+        return stream_json_array(iter_post_dicts(query.yield_per(STREAM_BATCH_SIZE), fields))
     
-    return jsonify([p.to_dict() for p in posts])
+    return api_response(serialize_post_rows(query.all(), fields))
+
+
+# =========================
+# SEARCH POSTS
+# =========================
+@posts_bp.route('/api/posts/search', methods=['GET'])
+@etag_versioned('posts', 'users')
+@cached_response('posts', 'users')
+def search_posts():
+    """
+    Cari posts berdasarkan alamat dan caption (full-text index).
+    
+    Query params:
+    - q: Kata kunci (wajib), mis. "Jl. Sudirman"
+    - limit: Jumlah post per halaman (default 20, maks 100)
+    - cursor: Nilai `next_cursor` dari halaman sebelumnya
+    - fields: Field yang dikirim, dipisah koma (opsional), mis. id,lat,long,status
+    
+    Hasil diurutkan dari yang paling relevan.
+    """
+    terms = parse_search_terms(request.args.get('q'))
+    if not terms:
+        return jsonify({'error': 'Parameter q wajib diisi'}), 400
+    
+    try:
+        limit = parse_limit(request.args.get('limit'))
+    except ValueError:
+        return jsonify({'error': 'Limit harus berupa angka'}), 400
+    
+    try:
+        fields = requested_fields(POST_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    query, keys, row_key = search_posts_query(terms, fields)
+    try:
+        rows, next_cursor = paginate_keyset(
+            query, 'search', keys, row_key,
+            cursor=request.args.get('cursor'), limit=limit
+        )
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return api_response({
+        'data': serialize_post_rows(rows, fields),
+        'next_cursor': next_cursor
+    })
 
 
 # =========================
 # GET POSTS BY STATUS
 # =========================
 @posts_bp.route('/api/posts/by-status', methods=['GET'])
+@etag_versioned('posts', 'users')
+@cached_response('posts', 'users')
 def get_posts_by_status():
     """
     Mendapatkan posts berdasarkan status.
-    Query param: status (menunggu, diproses, selesai, atau 'all')
+    Query param: status (menunggu, diproses, selesai, atau 'all'), fields (opsional)
     """
     status_filter = request.args.get('status', 'all').lower()
     
-    if status_filter == 'all':
-        posts = Post.query.order_by(Post.created_at.desc()).all()
-    elif status_filter == 'menunggu':
-        posts = Post.query.filter(Post.status == 'MENUNGGU').order_by(Post.created_at.desc()).all()
-    elif status_filter == 'diproses':
-        posts = Post.query.filter(Post.status == 'DIPROSES').order_by(Post.created_at.desc()).all()
-    elif status_filter == 'selesai':
-        posts = Post.query.filter(Post.status == 'SELESAI').order_by(Post.created_at.desc()).all()
-    else:
+    try:
+        fields = requested_fields(POST_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    query = post_list_query(fields)
+    if status_filter in ('menunggu', 'diproses', 'selesai'):
+        query = query.filter(Post.status == status_filter.upper())
+    elif status_filter != 'all':
         return jsonify({'error': 'Status filter tidak valid'}), 400
     
-    return jsonify([p.to_dict() for p in posts])
+    rows = query.order_by(Post.created_at.desc()).all()
+    return api_response(serialize_post_rows(rows, fields))
+
+
+# =========================
+# GET POSTS IN MAP VIEWPORT
+# =========================
+@posts_bp.route('/api/posts/in-bounds', methods=['GET'])
+@etag_versioned('posts', 'users')
+@cached_response('posts', 'users')
+def get_posts_in_bounds():
+    """
+    Mendapatkan posts di dalam viewport peta.
+    
+    Query params:
+    - min_lat, max_lat, min_lng, max_lng: Bounding box viewport (wajib)
+    - limit: Jumlah maksimum post (default 500, maks 2000), terbaru dulu
+    - fields: Field yang dikirim, dipisah koma (opsional), mis. id,lat,long,status
+    
+    Viewport diubah menjadi beberapa prefix geohash sehingga query hanya
+    menyentuh range index posts.geohash di sekitar viewport.
+    """
+    try:
+        min_lat, max_lat, min_lng, max_lng = parse_bounds(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        limit = parse_limit(request.args.get('limit'), default=500, maximum=2000)
+    except ValueError:
+        return jsonify({'error': 'Limit harus berupa angka'}), 400
+    
+    try:
+        fields = requested_fields(POST_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    prefixes = covering_prefixes(min_lat, max_lat, min_lng, max_lng)
+    rows = post_list_query(fields).filter(
+        or_(*[Post.geohash.like(f'{prefix}%') for prefix in prefixes]),
+        Post.latitude.between(min_lat, max_lat),
+        Post.longitude.between(min_lng, max_lng)
+    ).order_by(Post.created_at.desc(), Post.id.desc()).limit(limit + 1).all()
+    
+    return api_response({
+        'data': serialize_post_rows(rows[:limit], fields),
+        'truncated': len(rows) > limit
+    })
+
+
+# =========================
+# MAP CLUSTERS
+# =========================
+@posts_bp.route('/api/posts/clusters', methods=['GET'])
+@etag_versioned('posts')
+def get_posts_clusters():
+    """
+    Cluster marker untuk viewport peta pada zoom tertentu.
+    
+    Query params:
+    - min_lat, max_lat, min_lng, max_lng: Bounding box viewport (wajib)
+    - zoom: Zoom level peta 0-20 (wajib)
+    
+    Setiap cluster berisi centroid, jumlah post, severity terburuk dan
+    komposisi status, sehingga payload peta tetap kecil berapapun jumlah laporan.
+    """
+    try:
+        min_lat, max_lat, min_lng, max_lng = parse_bounds(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        zoom = int(request.args['zoom'])
+    except (KeyError, ValueError):
+        return jsonify({'error': 'Parameter zoom wajib berupa angka'}), 400
+    if not (MIN_ZOOM <= zoom <= MAX_ZOOM):
+        return jsonify({'error': f'Zoom harus antara {MIN_ZOOM}-{MAX_ZOOM}'}), 400
+    
+    return api_response(get_clusters(min_lat, max_lat, min_lng, max_lng, zoom, g.resource_versions['posts']))
 
 
 # =========================
@@ -211,37 +685,42 @@ def verify_post(current_user, post_id):
     vtype = request.json.get('type')
 
     action = VerificationType.CONFIRM if vtype == 'CONFIRM' else VerificationType.FALSE
+    _record_verification(post, current_user.id, action)
+    db.session.commit()
+
+    return jsonify({
+        'message': 'Verifikasi disimpan',
+        'data': {
+            'valid': post.confirm_count,
+            'false': post.false_count
+        }
+    })
+
+
+def _record_verification(post, user_id, action):
+    """Simpan/ubah vote user lalu hitung ulang polling post. Commit oleh pemanggil."""
     existing = PostVerification.query.filter_by(
-        post_id=post_id,
-        user_id=current_user.id
+        post_id=post.id,
+        user_id=user_id
     ).first()
 
     if existing:
         existing.verification_type = action
     else:
         db.session.add(PostVerification(
-            post_id=post_id,
-            user_id=current_user.id,
+            post_id=post.id,
+            user_id=user_id,
             verification_type=action
         ))
-
-    db.session.commit()
+    db.session.flush()
 
     # Update polling counts
-    c_count = PostVerification.query.filter_by(post_id=post_id, verification_type=VerificationType.CONFIRM).count()
-    f_count = PostVerification.query.filter_by(post_id=post_id, verification_type=VerificationType.FALSE).count()
-
-    post.confirm_count = c_count
-    post.false_count = f_count
-    db.session.commit()
-
-    return jsonify({
-        'message': 'Verifikasi disimpan',
-        'data': {
-            'valid': c_count,
-            'false': f_count
-        }
-    })
+    post.confirm_count = PostVerification.query.filter_by(
+        post_id=post.id, verification_type=VerificationType.CONFIRM).count()
+    post.false_count = PostVerification.query.filter_by(
+        post_id=post.id, verification_type=VerificationType.FALSE).count()
+    post.update_engagement_score()
+    mark_changed('posts')
 
 
 # =========================
@@ -257,12 +736,14 @@ def delete_post(current_user, post_id):
         return jsonify({'error': 'Akses ditolak'}), 403
     
     PostVerification.query.filter_by(post_id=post_id).delete()
-    image_path = os.path.join(current_app.config['UPLOAD_FOLDER'], post.image_path)
-    if os.path.exists(image_path):
-        os.remove(image_path)
     
     db.session.delete(post)
+    record_post_location(post.province, post.city, post.district, -1)
+    mark_changed('posts')
     db.session.commit()
+    
+    # File bisa dipakai post lain (foto identik), hapus hanya jika tidak ada referensi lagi
+    release_image(current_app.config['UPLOAD_FOLDER'], post.image_path)
     return jsonify({'message': 'Laporan berhasil dihapus'})
 
 
@@ -300,6 +781,7 @@ def update_post_status(current_user, post_id):
     # Simpan status sebagai string uppercase
     post.status = new_status
     
+    mark_changed('posts')
     db.session.commit()
     
     return jsonify({
@@ -1,10 +1,15 @@
 """
 User Routes - Profile, User Management
 """
-import os
+from collections import Counter
 from flask import Blueprint, request, jsonify, current_app
 from models import db, User, UserRole, Post, PostVerification, Review
 from utils.decorators import token_required
+from utils.http_cache import mark_changed
+from utils.locations import record_post_location
+from utils.serializers import user_list_query, serialize_user_rows, requested_fields, USER_FIELDS
+from utils.responses import api_response
+from utils.image_store import release_image
 
 users_bp = Blueprint('users', __name__)
 
@@ -39,6 +44,7 @@ def update_profile(current_user, user_id):
         else:
             return jsonify({'error': 'Password minimal 6 karakter'}), 400
 
+    mark_changed('users')
     db.session.commit()
     return jsonify({'message': 'Profil diperbarui', 'user': current_user.to_dict()})
 
@@ -59,23 +65,29 @@ def delete_user(current_user, user_id):
     # Cleanup data user manual (untuk safety jika cascade gagal/tidak kena)
     PostVerification.query.filter_by(user_id=user_id).delete()
     
-    # Hapus file gambar post user ini
+    # Kumpulkan jumlah post per lokasi (facet) dan path gambar; file dilepas setelah commit
     user_posts = Post.query.filter_by(user_id=user_id).all()
+    removed_locations = Counter()
+    image_paths = set()
     for p in user_posts:
-        if os.path.exists(os.path.join(current_app.config['UPLOAD_FOLDER'], p.image_path)):
-            try:
-                os.remove(os.path.join(current_app.config['UPLOAD_FOLDER'], p.image_path))
-            except:
-                pass
+        removed_locations[(p.province, p.city, p.district)] += 1
+        image_paths.add(p.image_path)
     
+    for (province, city, district), count in removed_locations.items():
+        record_post_location(province, city, district, -count)
     Post.query.filter_by(user_id=user_id).delete()
     Review.query.filter_by(user_id=user_id).delete()
     
     # CRITICAL FIX: Hapus user yang TEPAT (sesuai user_id), BUKAN current_user (admin)
     user_to_delete = User.query.get_or_404(user_id)
     db.session.delete(user_to_delete)
+    mark_changed('posts', 'reviews', 'users')
     db.session.commit()
 
+    # Hapus file gambar yang tidak dipakai post user lain
+    for image_path in image_paths:
+        release_image(current_app.config['UPLOAD_FOLDER'], image_path)
+
     return jsonify({'message': 'Akun dihapus'})
 
 
@@ -84,6 +96,14 @@ def delete_user(current_user, user_id):
 # =========================
 @users_bp.route('/api/users', methods=['GET'])
 def get_all_users():
-    """Daftar semua user untuk admin"""
-    users = User.query.all()
-    return jsonify([u.to_dict() for u in users])
+    """
+    Daftar semua user untuk admin.
+    Query param: fields (opsional), mis. id,username,full_name
+    """
+    try:
+        fields = requested_fields(USER_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    rows = user_list_query(fields).order_by(User.id).all()
+    return api_response(serialize_user_rows(rows, fields))
@@ -0,0 +1,108 @@
+"""
+API tests for server-side map clustering
+"""
+import pytest
+
+
+JAKARTA_BOUNDS = 'min_lat=-6.40&max_lat=-6.05&min_lng=106.65&max_lng=107.00'
+
+
+def _points(coords):
+    return [{'latitude': lat, 'longitude': lng, 'severity': 'TIDAK_SERIUS'} for lat, lng in coords]
+
+
+@pytest.mark.unit
+class TestZoomPrecision:
+    """Test cases for zoom_to_precision"""
+
+    def test_precision_grows_with_zoom(self):
+        from utils.clustering import zoom_to_precision
+
+        precisions = [zoom_to_precision(z) for z in range(0, 21)]
+        assert precisions == sorted(precisions)
+        assert precisions[0] == 1
+        assert precisions[-1] >= 9
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestClustersAPI:
+    """Test cases for GET /api/posts/clusters"""
+
+    def test_country_zoom_groups_posts(self, client, db_session, sample_user, add_posts):
+        # 10 post berdekatan di Monas -> satu cluster di zoom kota
+        add_posts(sample_user, _points([(-6.1754 + i * 0.0001, 106.8272) for i in range(10)]))
+
+        response = client.get(f'/api/posts/clusters?{JAKARTA_BOUNDS}&zoom=8')
+        assert response.status_code == 200
+        data = response.get_json()
+
+        assert len(data['clusters']) == 1
+        cluster = data['clusters'][0]
+        assert cluster['count'] == 10
+        assert cluster['status'] == {'menunggu': 10, 'diproses': 0, 'selesai': 0}
+        assert cluster['post_id'] is None
+        assert abs(cluster['lat'] - (-6.17495)) < 0.001
+
+    def test_worst_severity_and_status_mix(self, client, db_session, sample_user, add_posts):
+        posts = add_posts(sample_user, _points([(-6.1754, 106.8272), (-6.1755, 106.8273)]))
+        posts[1].severity = 'SERIUS'
+        posts[1].status = 'SELESAI'
+        db_session.commit()
+
+        cluster = client.get(f'/api/posts/clusters?{JAKARTA_BOUNDS}&zoom=8').get_json()['clusters'][0]
+        assert cluster['severity'] == 'SERIUS'
+        assert cluster['status']['selesai'] == 1
+        assert cluster['status']['menunggu'] == 1
+
+    def test_street_zoom_splits_posts(self, client, db_session, sample_user, add_posts):
+        posts = add_posts(sample_user, _points([(-6.1754, 106.8272), (-6.2444, 106.8000)]))
+
+        data = client.get(f'/api/posts/clusters?{JAKARTA_BOUNDS}&zoom=16').get_json()
+        assert sorted(c['post_id'] for c in data['clusters']) == sorted(p.id for p in posts)
+
+    def test_tiles_cached_and_invalidated_on_delete(self, client, db_session, sample_user, auth_headers, add_posts):
+        from utils.clustering import cluster_cache
+
+        posts = add_posts(sample_user, _points([(-6.1754, 106.8272), (-6.1755, 106.8273)]))
+        url = f'/api/posts/clusters?{JAKARTA_BOUNDS}&zoom=8'
+
+        client.get(url)
+        misses = cluster_cache.stats()['misses']
+        client.get(url)
+        assert cluster_cache.stats()['misses'] == misses
+        assert cluster_cache.stats()['hits'] > 0
+
+        response = client.delete(f'/api/posts/{posts[0].id}', headers=auth_headers)
+        assert response.status_code == 200
+
+        assert client.get(url).get_json()['clusters'][0]['count'] == 1
+        assert cluster_cache.stats()['misses'] > misses
+
+    def test_posts_outside_viewport_not_clustered(self, client, db_session, sample_user, add_posts):
+        # Satu sel cluster di zoom 8, tapi hanya post pertama yang ada di viewport
+        add_posts(sample_user, _points([(-6.1754, 106.8272), (-6.1754, 106.9500)]))
+
+        data = client.get('/api/posts/clusters?min_lat=-6.2&max_lat=-6.1&min_lng=106.8&max_lng=106.9&zoom=8')
+        cluster, = data.get_json()['clusters']
+        assert cluster['count'] == 1
+        assert abs(cluster['lng'] - 106.8272) < 0.001
+
+    def test_cache_follows_version_from_other_worker(self, client, db_session, sample_user, add_posts):
+        from sqlalchemy import text
+        from utils.http_cache import mark_changed
+
+        add_posts(sample_user, _points([(-6.1754, 106.8272), (-6.1755, 106.8273)]))
+        url = f'/api/posts/clusters?{JAKARTA_BOUNDS}&zoom=8'
+        assert client.get(url).get_json()['clusters'][0]['count'] == 2
+
+        # Worker lain menghapus post: cluster_cache di proses ini tidak dibuang, hanya versi naik
+        db_session.execute(text("DELETE FROM posts WHERE id = (SELECT MAX(id) FROM posts)"))
+        mark_changed('posts')
+        db_session.commit()
+
+        assert client.get(url).get_json()['clusters'][0]['count'] == 1
+
+    def test_invalid_zoom(self, client, db_session):
+        assert client.get(f'/api/posts/clusters?{JAKARTA_BOUNDS}').status_code == 400
+        assert client.get(f'/api/posts/clusters?{JAKARTA_BOUNDS}&zoom=25').status_code == 400
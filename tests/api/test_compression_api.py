@@ -0,0 +1,115 @@
+"""
+API tests for gzip/brotli response compression
+"""
+import gzip
+import json
+import pytest
+
+
+ROWS = [{'address': f'Jl. Sudirman No. {i}', 'province': 'DKI Jakarta', 'caption': 'Terdeteksi 3 lubang'}
+        for i in range(30)]
+
+
+@pytest.mark.unit
+class TestChooseEncoding:
+    """Test cases for Accept-Encoding negotiation"""
+
+    @pytest.mark.parametrize('header,expected', [
+        (None, None),
+        ('identity', None),
+        ('gzip', 'gzip'),
+        ('gzip, deflate', 'gzip'),
+        ('gzip;q=0, deflate', None),
+    ])
+    def test_gzip_negotiation(self, app, monkeypatch, header, expected):
+        import utils.compression
+
+        monkeypatch.setattr(utils.compression, 'brotli', None)
+        headers = {'Accept-Encoding': header} if header else {}
+        with app.test_request_context(headers=headers):
+            assert utils.compression.choose_encoding() == expected
+
+    def test_brotli_preferred(self, app):
+        pytest.importorskip('brotli')
+        from utils.compression import choose_encoding
+
+        with app.test_request_context(headers={'Accept-Encoding': 'gzip, br'}):
+            assert choose_encoding() == 'br'
+        with app.test_request_context(headers={'Accept-Encoding': 'gzip, br;q=0.5'}):
+            assert choose_encoding() == 'gzip'
+
+
+@pytest.mark.api
+class TestCompressionAPI:
+    """Test cases for compressed responses"""
+
+    def test_gzip_feed(self, client, db_session, sample_user, add_posts):
+        add_posts(sample_user, ROWS)
+        plain = client.get('/api/posts')
+        compressed = client.get('/api/posts', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in plain.headers
+        assert 'Accept-Encoding' in plain.headers['Vary']
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert int(compressed.headers['Content-Length']) < len(plain.data)
+        assert json.loads(gzip.decompress(compressed.data)) == plain.get_json()
+
+    def test_brotli_feed(self, client, db_session, sample_user, add_posts):
+        brotli = pytest.importorskip('brotli')
+        add_posts(sample_user, ROWS)
+
+        response = client.get('/api/posts', headers={'Accept-Encoding': 'gzip, br'})
+        assert response.headers['Content-Encoding'] == 'br'
+        assert json.loads(brotli.decompress(response.data)) == client.get('/api/posts').get_json()
+
+    def test_small_payload_not_compressed(self, client, sample_post):
+        response = client.get('/api/posts/locations', headers={'Accept-Encoding': 'gzip'})
+        assert len(response.data) < 1024
+        assert 'Content-Encoding' not in response.headers
+
+    def test_uncached_endpoint_compressed(self, client, db_session, sample_user):
+        from models import Review
+
+        db_session.add_all([Review(user_id=sample_user.id, rating=5, comment='Aplikasi sangat membantu',
+                                   sentiment='positif') for _ in range(30)])
+        db_session.commit()
+        response = client.get('/api/reviews', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'X-Cache' not in response.headers
+
+    def test_cached_payload_compressed_once(self, client, db_session, sample_user, monkeypatch, add_posts):
+        import utils.response_cache
+        import utils.compression
+
+        calls = []
+        real_compress = utils.response_cache.compress
+
+        def counting_compress(body, encoding):
+            calls.append(encoding)
+            return real_compress(body, encoding)
+
+        monkeypatch.setattr(utils.response_cache, 'compress', counting_compress)
+        monkeypatch.setattr(utils.compression, 'compress', counting_compress)
+        add_posts(sample_user, ROWS)
+
+        responses = [client.get('/api/posts', headers={'Accept-Encoding': 'gzip'}) for _ in range(3)]
+
+        assert [r.headers['X-Cache'] for r in responses] == ['MISS', 'HIT', 'HIT']
+        assert all(r.headers['Content-Encoding'] == 'gzip' for r in responses)
+        assert responses[0].data == responses[2].data
+        assert calls == ['gzip']
+
+    def test_stream_not_compressed(self, client, db_session, sample_user, add_posts):
+        add_posts(sample_user, ROWS)
+        response = client.get('/api/posts/filter?province=DKI&stream=1', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+        assert len(response.get_json()) == 30
+
+    def test_not_modified_has_no_body(self, client, db_session, sample_user, add_posts):
+        add_posts(sample_user, ROWS)
+        etag = client.get('/api/posts').headers['ETag']
+        response = client.get('/api/posts', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert 'Content-Encoding' not in response.headers
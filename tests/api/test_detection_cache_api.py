@@ -0,0 +1,63 @@
+"""
+API tests for the detection result cache on /api/upload
+"""
+from unittest.mock import patch
+import pytest
+from utils.detection_cache import DetectionCache
+
+
+@pytest.fixture
+def cache():
+    cache = DetectionCache()
+    with patch('routes.posts.detection_cache', cache):
+        yield cache
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestDetectionCacheAPI:
+    """Test cases for skipping inference on identical image bytes"""
+
+    def test_retry_skips_inference(self, client, db_session, auth_headers, cache, mock_model, upload):
+        model = mock_model(version='torch-v1')
+        first = upload(auth_headers, model)
+        second = upload(auth_headers, model, lat=-6.3)
+
+        assert first.status_code == 200 and second.status_code == 200
+        assert second.get_json()['data']['pothole_count'] == 1
+        assert model.predict.call_count == 1
+        assert cache.stats()['hits'] == 1
+
+    def test_rejected_retry_skips_inference(self, client, db_session, auth_headers, cache, mock_model, upload):
+        model = mock_model(conf=0.1, version='torch-v1')
+        assert upload(auth_headers, model).status_code == 406
+        assert upload(auth_headers, model).status_code == 406
+        assert model.predict.call_count == 1
+
+    def test_async_shares_cache(self, client, db_session, auth_headers, cache, mock_model, upload):
+        model = mock_model(version='torch-v1')
+        upload(auth_headers, model)
+        response = upload(auth_headers, model, lat=-6.3, mode='async')
+        job = client.get(response.get_json()['status_url'], headers=auth_headers).get_json()
+
+        assert job['status'] == 'DONE'
+        assert model.predict.call_count == 1
+
+    def test_new_model_version_misses(self, client, db_session, auth_headers, cache, mock_model, upload):
+        upload(auth_headers, mock_model(version='torch-v1'))
+
+        # Model baru dimuat (restart): versi lain, hasil model lama tidak dipakai
+        model = mock_model(version='torch-v2')
+        upload(auth_headers, model, lat=-6.3)
+        assert model.predict.call_count == 1
+        assert cache.stats()['hits'] == 0
+
+    def test_model_without_version_not_cached(self, client, db_session, auth_headers, cache, mock_model, upload):
+        model = mock_model(version=None)
+        upload(auth_headers, model)
+        upload(auth_headers, model, lat=-6.3)
+        assert model.predict.call_count == 2
+
+    def test_cache_stats(self, client, admin_headers):
+        response = client.get('/api/admin/cache-stats', headers=admin_headers)
+        assert 'hit_rate' in response.get_json()['detection_cache']
@@ -0,0 +1,74 @@
+"""
+API tests for near-duplicate uploads (perceptual hash)
+"""
+import cv2
+import numpy as np
+import pytest
+from models import Post, PostVerification, DetectionJob
+
+
+def scene(seed):
+    """Gambar sintetis dengan struktur (lingkaran acak) supaya dHash informatif"""
+    rng = np.random.default_rng(seed)
+    img = np.full((480, 640, 3), 120, dtype=np.uint8)
+    for _ in range(25):
+        color = tuple(int(v) for v in rng.integers(0, 255, 3))
+        center = (int(rng.integers(0, 640)), int(rng.integers(0, 480)))
+        cv2.circle(img, center, int(rng.integers(20, 120)), color, -1)
+    return img
+
+
+def recompressed(img, quality=40):
+    return cv2.imdecode(cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])[1], cv2.IMREAD_COLOR)
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestDuplicateUploadAPI:
+    """Test cases for skipping inference on resubmitted photos"""
+
+    def test_resubmission_becomes_confirm_vote(self, client, db_session, auth_headers, admin_headers, mock_model, upload):
+        original = upload(auth_headers, mock_model(), scene(0)).get_json()['data']
+
+        model = mock_model()
+        response = upload(admin_headers, model, recompressed(scene(0)), lat=-6.20008)
+
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body['duplicate_of'] == original['id']
+        assert body['data']['verification'] == {'valid': 1, 'false': 0}
+        model.predict.assert_not_called()
+        assert db_session.query(Post).count() == 1
+
+    def test_owner_retry_returns_existing_post(self, client, db_session, sample_user, auth_headers, mock_model, upload):
+        original = upload(auth_headers, mock_model(), scene(0)).get_json()['data']
+        db_session.refresh(sample_user)
+        points = sample_user.points
+
+        body = upload(auth_headers, mock_model(), scene(0)).get_json()
+        assert body['duplicate_of'] == original['id']
+        assert db_session.query(PostVerification).count() == 0
+        db_session.refresh(sample_user)
+        assert sample_user.points == points
+
+    def test_different_location_or_photo_creates_post(self, client, db_session, auth_headers, mock_model, upload):
+        upload(auth_headers, mock_model(), scene(0))
+        far = upload(auth_headers, mock_model(), scene(0), lat=-6.3).get_json()
+        other = upload(auth_headers, mock_model(), scene(1)).get_json()
+
+        assert 'duplicate_of' not in far and 'duplicate_of' not in other
+        assert db_session.query(Post).count() == 3
+        assert db_session.query(Post.phash).filter(Post.phash.isnot(None)).count() == 3
+
+    def test_async_duplicate(self, client, db_session, auth_headers, admin_headers, mock_model, upload):
+        original = upload(auth_headers, mock_model(), scene(0)).get_json()['data']
+
+        model = mock_model()
+        response = upload(admin_headers, model, scene(0), mode='async')
+        job = client.get(response.get_json()['status_url'], headers=admin_headers).get_json()
+
+        assert job['status'] == 'DUPLICATE'
+        assert job['post']['id'] == original['id']
+        assert job['post']['verification']['valid'] == 1
+        model.predict.assert_not_called()
+        assert db_session.query(DetectionJob).one().image_path == db_session.get(Post, original['id']).image_path
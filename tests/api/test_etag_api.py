@@ -0,0 +1,95 @@
+"""
+API tests for ETag / If-None-Match on list endpoints
+"""
+import pytest
+
+
+@pytest.mark.api
+class TestETagAPI:
+    """Test cases for conditional GET on feed and listing endpoints"""
+
+    @pytest.mark.parametrize('url', [
+        '/api/posts',
+        '/api/posts/by-status',
+        '/api/posts/locations',
+        '/api/posts/filter',
+        '/api/reviews',
+    ])
+    def test_etag_and_304(self, client, sample_post, sample_review, url):
+        """Test that repeating a request with If-None-Match returns 304"""
+        first = client.get(url)
+        assert first.status_code == 200
+        etag = first.headers['ETag']
+        assert etag
+
+        second = client.get(url, headers={'If-None-Match': etag})
+        assert second.status_code == 304
+        assert second.data == b''
+        assert second.headers['ETag'] == etag
+        # 304 membawa Vary yang sama dengan 200
+        assert set(second.vary) == set(first.vary) >= {'Accept', 'Accept-Encoding'}
+
+    def test_304_skips_feed_query(self, client, sample_post):
+        """Test that a 304 only costs the version lookup"""
+        from sqlalchemy import event
+        from models import db
+
+        etag = client.get('/api/posts').headers['ETag']
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = client.get('/api/posts', headers={'If-None-Match': etag})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+        assert response.status_code == 304
+        assert len(statements) == 1
+        assert 'resource_versions' in statements[0]
+
+    def test_verify_changes_etag(self, client, sample_post, auth_headers):
+        """Test that a write route invalidates the post ETag"""
+        etag = client.get('/api/posts').headers['ETag']
+
+        client.post(f'/api/posts/{sample_post.id}/verify', json={'type': 'CONFIRM'},
+                    headers=auth_headers)
+
+        response = client.get('/api/posts', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert response.get_json()[0]['verification']['valid'] == 1
+
+    def test_status_update_changes_etag(self, client, sample_post, petugas_headers):
+        """Test that a status update invalidates the by-status ETag"""
+        etag = client.get('/api/posts/by-status').headers['ETag']
+
+        client.put(f'/api/posts/{sample_post.id}/status', json={'status': 'SELESAI'},
+                   headers=petugas_headers)
+
+        response = client.get('/api/posts/by-status', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+
+    def test_review_write_does_not_change_post_etag(self, client, sample_post, auth_headers):
+        """Test that versions are tracked per resource"""
+        posts_etag = client.get('/api/posts').headers['ETag']
+        reviews_etag = client.get('/api/reviews').headers['ETag']
+
+        client.post('/api/reviews', json={'rating': 4, 'comment': 'Oke'}, headers=auth_headers)
+
+        assert client.get('/api/posts', headers={'If-None-Match': posts_etag}).status_code == 304
+        assert client.get('/api/reviews', headers={'If-None-Match': reviews_etag}).status_code == 200
+
+    def test_profile_update_changes_post_etag(self, client, sample_user, sample_post, auth_headers):
+        """Test that renaming the author invalidates feeds showing uploaded_by"""
+        etag = client.get('/api/posts').headers['ETag']
+
+        client.put(f'/api/users/{sample_user.id}', json={'full_name': 'Nama Baru'},
+                   headers=auth_headers)
+
+        response = client.get('/api/posts', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.get_json()[0]['uploaded_by'] == 'Nama Baru'
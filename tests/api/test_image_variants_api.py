@@ -0,0 +1,149 @@
+"""
+API tests for thumb/medium image variants
+"""
+import io
+import os
+from unittest.mock import MagicMock, patch
+import cv2
+import numpy as np
+import pytest
+from models import Post
+
+
+def _write_jpeg(folder, filename, w, h):
+    cv2.imwrite(os.path.join(folder, filename), np.full((h, w, 3), 90, dtype=np.uint8))
+
+
+def _decoded_shape(response):
+    return cv2.imdecode(np.frombuffer(response.data, np.uint8), cv2.IMREAD_COLOR).shape
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestImageVariantsAPI:
+    """Test cases for /uploads/<variant>/<filename> and thumb_url/medium_url"""
+
+    def test_payload_urls(self, client, sample_post):
+        post = client.get('/api/posts').get_json()[0]
+        assert post['thumb_url'] == f'http://localhost/uploads/thumb/{sample_post.image_path}'
+        assert post['medium_url'] == f'http://localhost/uploads/medium/{sample_post.image_path}'
+
+        sparse = client.get('/api/posts?fields=id,thumb_url').get_json()[0]
+        assert sparse == {'id': sample_post.id, 'thumb_url': post['thumb_url']}
+
+    def test_variants_created_on_upload(self, app, client, db_session, auth_headers):
+        mock_box = MagicMock()
+        mock_box.conf = [0.9]
+        mock_box.xywh = [[500, 400, 100, 100]]
+        mock_result = MagicMock()
+        mock_result.boxes = [mock_box]
+        mock_model = MagicMock()
+        mock_model.model_version = None
+        mock_model.predict.return_value = [mock_result]
+
+        with patch('routes.posts.yolo_model', mock_model):
+            with patch('cv2.imdecode', return_value=np.zeros((800, 1000, 3), dtype=np.uint8)):
+                response = client.post('/api/upload', data={
+                    'image': (io.BytesIO(b"fakeimagecontent"), 'test_image.jpg'),
+                    'latitude': -6.2,
+                    'longitude': 106.8
+                }, content_type='multipart/form-data', headers=auth_headers)
+
+        assert response.status_code == 200
+        filename = db_session.query(Post).one().image_path
+        folder = app.config['UPLOAD_FOLDER']
+        assert os.path.exists(os.path.join(folder, 'thumb', filename))
+        assert os.path.exists(os.path.join(folder, 'medium', filename))
+
+        assert _decoded_shape(client.get(f'/uploads/thumb/{filename}')) == (128, 160, 3)
+        assert _decoded_shape(client.get(f'/uploads/medium/{filename}')) == (512, 640, 3)
+
+        # Hapus post ikut menghapus varian
+        post_id = response.get_json()['data']['id']
+        assert client.delete(f'/api/posts/{post_id}', headers=auth_headers).status_code == 200
+        assert not os.path.exists(os.path.join(folder, filename))
+        assert not os.path.exists(os.path.join(folder, 'thumb', filename))
+        assert not os.path.exists(os.path.join(folder, 'medium', filename))
+
+    def test_lazy_variant_cached_on_disk(self, app, client):
+        folder = app.config['UPLOAD_FOLDER']
+        _write_jpeg(folder, 'legacy.jpg', 2000, 1500)
+
+        response = client.get('/uploads/medium/legacy.jpg')
+        assert response.status_code == 200
+        assert response.mimetype == 'image/jpeg'
+        assert _decoded_shape(response) == (480, 640, 3)
+        assert os.path.exists(os.path.join(folder, 'medium', 'legacy.jpg'))
+
+        with patch('cv2.imdecode') as mock_decode:
+            assert client.get('/uploads/medium/legacy.jpg').status_code == 200
+            mock_decode.assert_not_called()
+
+    def test_small_original_not_upscaled(self, app, client):
+        _write_jpeg(app.config['UPLOAD_FOLDER'], 'small.jpg', 120, 90)
+        assert _decoded_shape(client.get('/uploads/thumb/small.jpg')) == (90, 120, 3)
+
+    @pytest.mark.parametrize('url', [
+        '/uploads/large/legacy.jpg',
+        '/uploads/thumb/tidakada.jpg',
+        '/uploads/thumb/..',
+    ])
+    def test_not_found(self, app, client, url):
+        _write_jpeg(app.config['UPLOAD_FOLDER'], 'legacy.jpg', 200, 100)
+        assert client.get(url).status_code == 404
+
+    @pytest.mark.parametrize('filename', ['job.upload', 'legacy.jpg.tmp', 'legacy.jpg.abc.del'])
+    def test_non_image_files_not_found(self, app, client, filename):
+        # Byte JPEG valid, tapi ekstensinya tidak bisa di-encode OpenCV
+        with open(os.path.join(app.config['UPLOAD_FOLDER'], filename), 'wb') as f:
+            f.write(cv2.imencode('.jpg', np.full((100, 200, 3), 90, dtype=np.uint8))[1].tobytes())
+        assert client.get(f'/uploads/thumb/{filename}').status_code == 404
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestContentAddressedUploadAPI:
+    """Test cases for content-addressed upload storage"""
+
+    def _upload(self, client, auth_headers, value):
+        mock_box = MagicMock()
+        mock_box.conf = [0.9]
+        mock_box.xywh = [[50, 50, 10, 10]]
+        mock_result = MagicMock()
+        mock_result.boxes = [mock_box]
+        mock_model = MagicMock()
+        mock_model.model_version = None
+        mock_model.predict.return_value = [mock_result]
+
+        with patch('routes.posts.yolo_model', mock_model):
+            with patch('cv2.imdecode', return_value=np.full((100, 100, 3), value, dtype=np.uint8)):
+                return client.post('/api/upload', data={
+                    'image': (io.BytesIO(b"fakeimagecontent"), 'test_image.jpg'),
+                    'latitude': -6.2,
+                    'longitude': 106.8
+                }, content_type='multipart/form-data', headers=auth_headers)
+
+    def test_same_second_uploads_do_not_collide(self, client, db_session, auth_headers):
+        """Nama file dari hash konten, bukan timestamp detik + user id"""
+        first = self._upload(client, auth_headers, 10).get_json()['data']
+        second = self._upload(client, auth_headers, 200).get_json()['data']
+        assert first['image_url'] != second['image_url']
+
+    def test_identical_upload_deduplicated(self, app, client, db_session, auth_headers):
+        first = self._upload(client, auth_headers, 30).get_json()['data']
+        second = self._upload(client, auth_headers, 30).get_json()['data']
+
+        assert first['id'] != second['id']
+        assert first['image_url'] == second['image_url']
+        filename = db_session.get(Post, first['id']).image_path
+        assert filename.count('/') == 2
+
+        # URL bersarang (shard) bisa diakses, termasuk variannya
+        assert client.get(f'/uploads/{filename}').status_code == 200
+        assert client.get(f'/uploads/thumb/{filename}').status_code == 200
+
+        # File dihapus hanya setelah referensi terakhir hilang
+        client.delete(f"/api/posts/{first['id']}", headers=auth_headers)
+        assert os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+        client.delete(f"/api/posts/{second['id']}", headers=auth_headers)
+        assert not os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], filename))
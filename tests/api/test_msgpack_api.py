@@ -0,0 +1,78 @@
+"""
+API tests for JSON / MessagePack content negotiation
+"""
+import pytest
+
+msgpack = pytest.importorskip('msgpack')
+
+MSGPACK = {'Accept': 'application/msgpack'}
+
+
+@pytest.mark.unit
+class TestNegotiation:
+    """Test cases for utils.responses.negotiated_format"""
+
+    @pytest.mark.parametrize('accept,expected', [
+        (None, 'json'),
+        ('*/*', 'json'),
+        ('application/json', 'json'),
+        ('application/msgpack', 'msgpack'),
+        ('application/msgpack, application/json;q=0.5', 'msgpack'),
+        ('application/json, application/msgpack', 'json'),
+    ])
+    def test_accept_header(self, app, accept, expected):
+        from utils.responses import negotiated_format
+
+        headers = {'Accept': accept} if accept else {}
+        with app.test_request_context(headers=headers):
+            assert negotiated_format() == expected
+
+    def test_json_without_library(self, app, monkeypatch):
+        import utils.responses
+
+        monkeypatch.setattr(utils.responses, 'msgpack', None)
+        with app.test_request_context(headers=MSGPACK):
+            assert utils.responses.negotiated_format() == 'json'
+            assert utils.responses.api_response({'a': 1}).mimetype == 'application/json'
+
+
+@pytest.mark.api
+class TestMsgpackAPI:
+    """List endpoints return MessagePack on request, JSON by default"""
+
+    @pytest.mark.parametrize('url', ['/api/posts', '/api/posts?limit=5', '/api/reviews', '/api/users'])
+    def test_msgpack_matches_json(self, client, sample_post, sample_review, url):
+        as_json = client.get(url)
+        as_msgpack = client.get(url, headers=MSGPACK)
+
+        assert as_json.mimetype == 'application/json'
+        assert as_msgpack.status_code == 200
+        assert as_msgpack.mimetype == 'application/msgpack'
+        assert 'Accept' in as_msgpack.headers['Vary']
+        assert msgpack.unpackb(as_msgpack.data, raw=False) == as_json.get_json()
+
+    def test_cache_is_per_format(self, client, sample_post):
+        first = client.get('/api/posts', headers=MSGPACK)
+        second = client.get('/api/posts')
+        third = client.get('/api/posts', headers=MSGPACK)
+
+        assert first.headers['X-Cache'] == 'MISS'
+        assert second.headers['X-Cache'] == 'MISS'
+        assert second.mimetype == 'application/json'
+        assert third.headers['X-Cache'] == 'HIT'
+        assert third.mimetype == 'application/msgpack'
+
+    def test_etag_is_per_format(self, client, sample_post):
+        json_etag = client.get('/api/posts').headers['ETag']
+        msgpack_etag = client.get('/api/posts', headers=MSGPACK).headers['ETag']
+        assert json_etag != msgpack_etag
+
+        # ETag JSON tidak boleh memvalidasi salinan MessagePack (dan sebaliknya)
+        assert client.get('/api/posts', headers={**MSGPACK, 'If-None-Match': json_etag}).status_code == 200
+        assert client.get('/api/posts', headers={'If-None-Match': msgpack_etag}).status_code == 200
+        assert client.get('/api/posts', headers={**MSGPACK, 'If-None-Match': msgpack_etag}).status_code == 304
+
+    def test_errors_stay_json(self, client):
+        response = client.get('/api/posts/query?status=batal', headers=MSGPACK)
+        assert response.status_code == 400
+        assert response.mimetype == 'application/json'
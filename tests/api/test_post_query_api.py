@@ -0,0 +1,122 @@
+"""
+API tests for the combined /api/posts/query endpoint
+"""
+import pytest
+from datetime import datetime
+from sqlalchemy import text
+from werkzeug.datastructures import MultiDict
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestPostQueryAPI:
+    """Test cases for GET /api/posts/query"""
+
+    def _ids(self, client, query):
+        response = client.get(f'/api/posts/query?{query}')
+        assert response.status_code == 200
+        return [p['id'] for p in response.get_json()['data']]
+
+    def test_combined_filters(self, client, db_session, sample_user, sample_admin, add_post):
+        match = add_post(sample_user, status='DIPROSES', province='DKI Jakarta',
+                         created_at=datetime(2024, 5, 10, 8, 0))
+        add_post(sample_user, status='MENUNGGU', province='DKI Jakarta',
+                 created_at=datetime(2024, 5, 10, 8, 0))
+        add_post(sample_user, status='DIPROSES', province='Jawa Barat',
+                 created_at=datetime(2024, 5, 10, 8, 0))
+        add_post(sample_user, status='DIPROSES', province='DKI Jakarta',
+                 severity='TIDAK_SERIUS', created_at=datetime(2024, 5, 10, 8, 0))
+        add_post(sample_admin, status='DIPROSES', province='DKI Jakarta',
+                 created_at=datetime(2024, 5, 10, 8, 0))
+        add_post(sample_user, status='DIPROSES', province='DKI Jakarta',
+                 created_at=datetime(2024, 6, 1, 8, 0))
+
+        ids = self._ids(client, f'status=diproses&severity=serius&province=dki&user_id={sample_user.id}'
+                                '&from=2024-05-01&to=2024-05-31')
+        assert ids == [match.id]
+
+    def test_date_range_end_is_inclusive(self, client, db_session, sample_user, add_post):
+        post = add_post(sample_user, created_at=datetime(2024, 5, 31, 23, 59))
+        add_post(sample_user, created_at=datetime(2024, 6, 1, 0, 0))
+
+        assert self._ids(client, 'from=2024-05-01&to=2024-05-31') == [post.id]
+
+    def test_multiple_statuses(self, client, db_session, sample_user, add_post):
+        a = add_post(sample_user, status='MENUNGGU')
+        b = add_post(sample_user, status='DIPROSES')
+        add_post(sample_user, status='SELESAI')
+
+        assert sorted(self._ids(client, 'status=menunggu,diproses')) == sorted([a.id, b.id])
+
+    def test_trending_pagination(self, client, db_session, sample_user, add_post):
+        posts = [add_post(sample_user, engagement_score=score) for score in (3, 1, 5, 2, 4)]
+        expected = [p.id for p in sorted(posts, key=lambda p: p.engagement_score, reverse=True)]
+
+        ids = []
+        url = '/api/posts/query?sort=trending&limit=2'
+        while url:
+            page = client.get(url).get_json()
+            ids.extend(p['id'] for p in page['data'])
+            url = page['next_cursor'] and f"/api/posts/query?sort=trending&limit=2&cursor={page['next_cursor']}"
+        assert ids == expected
+
+    def test_cursor_is_bound_to_sort(self, client, db_session, sample_user, add_post):
+        for _ in range(3):
+            add_post(sample_user)
+
+        cursor = client.get('/api/posts/query?limit=1').get_json()['next_cursor']
+        response = client.get(f'/api/posts/query?sort=trending&cursor={cursor}')
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize('query', [
+        'status=batal', 'severity=parah', 'user_id=abc', 'from=kemarin',
+        'sort=terlama', 'match=regex&province=dki', 'limit=abc'
+    ])
+    def test_invalid_params(self, client, query):
+        response = client.get(f'/api/posts/query?{query}')
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+
+
+@pytest.mark.unit
+class TestPostQueryIndexes:
+    """EXPLAIN QUERY PLAN: common combinations use a composite index without extra sort"""
+
+    @pytest.mark.parametrize('args,sort,index', [
+        ({}, 'terbaru', 'ix_posts_created'),
+        ({'status': 'menunggu'}, 'terbaru', 'ix_posts_status_created'),
+        ({'status': 'menunggu'}, 'trending', 'ix_posts_status_engagement'),
+        ({'severity': 'serius'}, 'terbaru', 'ix_posts_severity_created'),
+        ({'user_id': '1'}, 'terbaru', 'ix_posts_user_created'),
+        ({'province': 'DKI Jakarta', 'city': 'Jakarta Pusat', 'district': 'Menteng', 'match': 'exact'},
+         'terbaru', 'ix_posts_location_created'),
+        ({'from': '2024-01-01', 'to': '2024-01-31'}, 'terbaru', 'ix_posts_created'),
+    ])
+    def test_plan_uses_index(self, db_session, args, sort, index):
+        from utils.post_filters import apply_post_filters, QUERY_SORTS
+        from utils.serializers import post_list_query
+
+        keys, _ = QUERY_SORTS[sort]
+        query = apply_post_filters(post_list_query(), MultiDict(args))\
+            .order_by(*[k.desc() for k in keys]).limit(21)
+        compiled = query.statement.compile(db_session.get_bind(), compile_kwargs={'literal_binds': True})
+        plan = ' ; '.join(r[-1] for r in db_session.execute(text(f'EXPLAIN QUERY PLAN {compiled}')))
+
+        assert f'USING INDEX {index}' in plan
+        assert 'TEMP B-TREE' not in plan
+
+    @pytest.mark.parametrize('sort,index', [
+        ('terbaru', 'ix_posts_created'),
+        ('trending', 'ix_posts_engagement'),
+        ('selesai', 'ix_posts_status_created'),
+    ])
+    def test_feed_plan_uses_index(self, db_session, sort, index):
+        from routes.posts import FEED_SORTS
+
+        query, keys, _ = FEED_SORTS[sort]()
+        query = query.order_by(*[k.desc() for k in keys]).limit(21)
+        compiled = query.statement.compile(db_session.get_bind(), compile_kwargs={'literal_binds': True})
+        plan = ' ; '.join(r[-1] for r in db_session.execute(text(f'EXPLAIN QUERY PLAN {compiled}')))
+
+        assert f'USING INDEX {index}' in plan
+        assert 'TEMP B-TREE' not in plan
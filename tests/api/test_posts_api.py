@@ -1,6 +1,8 @@
 """
 API tests for posts endpoints
 """
+import base64
+import json
 import pytest
 import io
 
@@ -94,6 +96,7 @@ class TestPostsAPI:
         # Check if verification count increased
         db_session.refresh(sample_post)
         assert sample_post.confirm_count == 1  # Was 0 initially
+        assert sample_post.engagement_score == 1
     
     def test_verify_nonexistent_post(self, client, auth_headers):
         """Test verifying a non-existent post"""
@@ -148,6 +151,8 @@ class TestPostsAPI:
         mock_yolo_response.boxes = [mock_box] 
         
         mock_model = MagicMock()
+        
+        mock_model.model_version = None
         mock_model.predict.return_value = [mock_yolo_response]
         
         # Mock cv2.imdecode
@@ -190,6 +195,8 @@ class TestPostsAPI:
         mock_yolo_response.boxes = [] 
         
         mock_model = MagicMock()
+        
+        mock_model.model_version = None
         mock_model.predict.return_value = [mock_yolo_response]
         
         fake_img = np.zeros((100, 100, 3), dtype=np.uint8)
@@ -222,3 +229,395 @@ class TestPostsAPI:
         )
         assert response.status_code == 400
 
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestPostsPaginationAPI:
+    """Test cases for cursor pagination on GET /api/posts"""
+
+    def _rows(self, n):
+        # created_at banyak yang sama: urutan ditentukan tie-breaker id
+        from datetime import datetime, timedelta
+
+        base = datetime(2025, 1, 1, 12, 0, 0)
+        return [{'created_at': base + timedelta(minutes=i % 3)} for i in range(n)]
+
+    def test_paginated_response_shape(self, client, db_session, sample_user, add_posts):
+        """Test that limit switches the response to a page object"""
+        add_posts(sample_user, self._rows(5))
+
+        response = client.get('/api/posts?limit=2')
+        assert response.status_code == 200
+        data = response.get_json()
+
+        assert len(data['data']) == 2
+        assert data['next_cursor']
+
+    def test_walk_all_pages_terbaru(self, client, db_session, sample_user, add_posts):
+        """Test that following next_cursor visits every post exactly once"""
+        add_posts(sample_user, self._rows(7))
+
+        seen = []
+        url = '/api/posts?limit=3'
+        while url:
+            data = client.get(url).get_json()
+            seen.extend(p['id'] for p in data['data'])
+            url = f"/api/posts?limit=3&cursor={data['next_cursor']}" if data['next_cursor'] else None
+
+        assert len(seen) == 7
+        assert len(set(seen)) == 7
+        # Hasilnya sama dengan urutan feed tanpa paginasi
+        assert seen == [p['id'] for p in client.get('/api/posts').get_json()]
+
+    def test_walk_all_pages_trending(self, client, db_session, sample_user, add_posts):
+        """Test trending pagination with ties on the engagement count"""
+        posts = add_posts(sample_user, self._rows(6))
+        posts[2].confirm_count = 5
+        posts[4].false_count = 2
+        posts[2].update_engagement_score()
+        posts[4].update_engagement_score()
+        db_session.commit()
+
+        seen = []
+        url = '/api/posts?sort=trending&limit=2'
+        while url:
+            data = client.get(url).get_json()
+            seen.extend(p['id'] for p in data['data'])
+            url = (f"/api/posts?sort=trending&limit=2&cursor={data['next_cursor']}"
+                   if data['next_cursor'] else None)
+
+        assert seen[:2] == [posts[2].id, posts[4].id]
+        assert sorted(seen) == sorted(p.id for p in posts)
+
+    def test_trending_uses_engagement_score(self, client, db_session, sample_user, add_posts):
+        """Test that trending order follows the stored engagement_score"""
+        posts = add_posts(sample_user, self._rows(3))
+        posts[0].engagement_score = 10
+        posts[1].engagement_score = 20
+        posts[2].status = 'SELESAI'
+        posts[2].engagement_score = 99
+        db_session.commit()
+
+        data = client.get('/api/posts?sort=trending').get_json()
+        assert [p['id'] for p in data] == [posts[1].id, posts[0].id]
+
+    def test_limit_is_capped(self, client, db_session, sample_user, add_posts):
+        """Test that limit larger than the maximum is capped"""
+        from utils.pagination import MAX_LIMIT
+
+        add_posts(sample_user, self._rows(3))
+        data = client.get('/api/posts?limit=100000').get_json()
+
+        assert len(data['data']) == 3
+        assert data['next_cursor'] is None
+        assert MAX_LIMIT == 100
+
+    def test_invalid_cursor(self, client, db_session):
+        """Test that a corrupt cursor is rejected"""
+        response = client.get('/api/posts?limit=2&cursor=not-a-cursor')
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize('payload', [['terbaru', [1], 2], ['terbaru', 'x', 'y']])
+    def test_forged_cursor_rejected(self, client, db_session, sample_user, payload, add_posts):
+        """Test that cursors with wrong key types return 400 instead of a 500 or a bogus page"""
+        add_posts(sample_user, self._rows(3))
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+        response = client.get(f'/api/posts?limit=1&cursor={cursor}')
+        assert response.status_code == 400
+
+    def test_cursor_from_other_sort_rejected(self, client, db_session, sample_user, add_posts):
+        """Test that a cursor cannot be reused across sort modes"""
+        add_posts(sample_user, self._rows(3))
+        cursor = client.get('/api/posts?limit=1').get_json()['next_cursor']
+
+        response = client.get(f'/api/posts?sort=trending&limit=1&cursor={cursor}')
+        assert response.status_code == 400
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestPostsLocationFilterAPI:
+    """Test cases for index-friendly matching in /api/posts/filter"""
+
+    ROWS = [{'province': p, 'city': c} for p, c in [
+        ('DKI Jakarta', 'Jakarta Selatan'),
+        ('dki  jakarta', 'Jakarta Pusat'),
+        ('Jawa Barat', 'Bandung'),
+        ('Jawa Tengah', 'Semarang'),
+    ]]
+
+    def _cities(self, client, query):
+        response = client.get(f'/api/posts/filter?{query}')
+        assert response.status_code == 200
+        return sorted(p['city'] for p in response.get_json())
+
+    def test_location_keys_filled_on_insert(self, db_session, sample_user, add_posts):
+        from models import Post
+
+        add_posts(sample_user, self.ROWS)
+        keys = {p.province_key for p in Post.query.all()}
+        assert keys == {'dki jakarta', 'jawa barat', 'jawa tengah'}
+
+    def test_prefix_is_default(self, client, db_session, sample_user, add_posts):
+        add_posts(sample_user, self.ROWS)
+
+        assert self._cities(client, 'province=jawa') == ['Bandung', 'Semarang']
+        assert self._cities(client, 'province=DKI%20Jakarta') == ['Jakarta Pusat', 'Jakarta Selatan']
+        assert self._cities(client, 'province=Jakarta') == []
+
+    def test_prefix_with_max_code_point(self, client, db_session, sample_user, add_posts):
+        """Test that a trailing U+10FFFF does not break the prefix range"""
+        add_posts(sample_user, self.ROWS)
+
+        assert self._cities(client, 'province=%F4%8F%BF%BF') == []
+        assert self._cities(client, 'province=jawa%F4%8F%BF%BF') == []
+        response = client.get('/api/posts/query?province=%F4%8F%BF%BF')
+        assert response.status_code == 200
+
+    def test_prefix_upper_bound(self):
+        """Test the exclusive upper bound used for prefix ranges"""
+        from utils.locations import _prefix_upper_bound
+
+        assert _prefix_upper_bound('jawa') == 'jawb'
+        assert _prefix_upper_bound('ja\U0010ffff') == 'jb'
+        assert _prefix_upper_bound('\U0010ffff\U0010ffff') is None
+        assert _prefix_upper_bound('a\ud7ff') == 'a\ue000'
+
+    def test_exact_match(self, client, db_session, sample_user, add_posts):
+        add_posts(sample_user, self.ROWS)
+
+        assert self._cities(client, 'province=JAWA%20%20BARAT&match=exact') == ['Bandung']
+        assert self._cities(client, 'province=Jawa&match=exact') == []
+
+    def test_contains_match(self, client, db_session, sample_user, add_posts):
+        add_posts(sample_user, self.ROWS)
+
+        assert self._cities(client, 'city=jakarta&match=contains') == ['Jakarta Pusat', 'Jakarta Selatan']
+        assert self._cities(client, 'city=%25&match=contains') == []
+
+    def test_invalid_match(self, client):
+        response = client.get('/api/posts/filter?province=DKI&match=regex')
+        assert response.status_code == 400
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestPostsStreamingAPI:
+    """Test cases for streaming mode on /api/posts/filter"""
+
+    def test_stream_matches_list(self, client, db_session, sample_user):
+        from models import Post
+
+        db_session.add_all([
+            Post(user_id=sample_user.id, image_path=f'{i}.jpg', latitude=-6.2, longitude=106.8,
+                 severity='SERIUS', province='DKI Jakarta')
+            for i in range(5)
+        ])
+        db_session.commit()
+
+        normal = client.get('/api/posts/filter?province=DKI').get_json()
+        response = client.get('/api/posts/filter?province=DKI&stream=1')
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.get_json() == normal
+        assert len(normal) == 5
+
+    def test_stream_empty(self, client, db_session):
+        response = client.get('/api/posts/filter?stream=1')
+        assert response.get_json() == []
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestPostsInBoundsAPI:
+    """Test cases for GET /api/posts/in-bounds"""
+
+    COORDS = {
+        'monas': (-6.1754, 106.8272),
+        'blok_m': (-6.2444, 106.8000),
+        'bandung': (-6.9175, 107.6191),
+    }
+
+    def _seed(self, add_posts, user):
+        posts = add_posts(user, [{'image_path': f'{name}.jpg', 'latitude': lat, 'longitude': lng}
+                                 for name, (lat, lng) in self.COORDS.items()])
+        return dict(zip(self.COORDS, posts))
+
+    def test_geohash_filled_on_insert(self, add_posts, sample_user):
+        from utils.geo import encode_geohash
+
+        posts = self._seed(add_posts, sample_user)
+        assert posts['monas'].geohash == encode_geohash(-6.1754, 106.8272)
+
+    def test_only_posts_inside_viewport(self, client, add_posts, sample_user):
+        posts = self._seed(add_posts, sample_user)
+
+        response = client.get('/api/posts/in-bounds?min_lat=-6.30&max_lat=-6.10'
+                              '&min_lng=106.70&max_lng=106.90')
+        assert response.status_code == 200
+        data = response.get_json()
+
+        assert sorted(p['id'] for p in data['data']) == sorted([posts['monas'].id, posts['blok_m'].id])
+        assert data['truncated'] is False
+
+    def test_limit_sets_truncated(self, client, add_posts, sample_user):
+        self._seed(add_posts, sample_user)
+
+        data = client.get('/api/posts/in-bounds?min_lat=-8&max_lat=-6&min_lng=106'
+                          '&max_lng=108&limit=2').get_json()
+        assert len(data['data']) == 2
+        assert data['truncated'] is True
+
+    def test_invalid_bounds(self, client, db_session):
+        assert client.get('/api/posts/in-bounds?min_lat=1').status_code == 400
+        assert client.get('/api/posts/in-bounds?min_lat=5&max_lat=1'
+                          '&min_lng=0&max_lng=1').status_code == 400
+
+    def test_backfill_geohash(self, app, add_posts, sample_user):
+        from models import db, Post
+        from routes.admin import backfill_post_geohash
+
+        posts = self._seed(add_posts, sample_user)
+        db.session.execute(db.text("UPDATE posts SET geohash = NULL"))
+        db.session.commit()
+
+        assert backfill_post_geohash(batch_size=2) == 3
+        db.session.expire_all()
+        assert db.session.get(Post, posts['bandung'].id).geohash.startswith('qqu')
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestPostLocationsAPI:
+    """Test cases for the post_locations facet table behind /api/posts/locations"""
+
+    ROWS = [{'province': p, 'city': c, 'district': d} for p, c, d in [
+        ('DKI Jakarta', 'Jakarta Pusat', 'Menteng'),
+        ('DKI Jakarta', 'Jakarta Pusat', 'Menteng'),
+        ('DKI Jakarta', 'Jakarta Selatan', 'Kebayoran Baru'),
+        ('Jawa Barat', 'Bandung', ''),
+        (None, None, None),
+    ]]
+
+    def _seed(self, add_posts, user):
+        from utils.locations import rebuild_location_facets
+
+        posts = add_posts(user, self.ROWS)
+        rebuild_location_facets()
+        return posts
+
+    def test_flat_lists(self, client, add_posts, sample_user):
+        self._seed(add_posts, sample_user)
+
+        data = client.get('/api/posts/locations').get_json()
+        assert data['provinces'] == ['DKI Jakarta', 'Jawa Barat']
+        assert data['cities'] == ['Bandung', 'Jakarta Pusat', 'Jakarta Selatan']
+        assert data['districts'] == ['Kebayoran Baru', 'Menteng']
+        assert 'tree' not in data
+
+    def test_tree_with_counts(self, client, add_posts, sample_user):
+        self._seed(add_posts, sample_user)
+
+        tree = client.get('/api/posts/locations?tree=1').get_json()['tree']
+        jakarta = tree[0]
+        assert jakarta['name'] == 'DKI Jakarta'
+        assert jakarta['count'] == 3
+        assert jakarta['cities'][0] == {
+            'name': 'Jakarta Pusat', 'count': 2,
+            'districts': [{'name': 'Menteng', 'count': 2}]
+        }
+        assert tree[1]['cities'][0] == {'name': 'Bandung', 'count': 1, 'districts': []}
+
+    def test_single_query(self, client, add_posts, sample_user):
+        from sqlalchemy import event
+        from models import db
+
+        self._seed(add_posts, sample_user)
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            client.get('/api/posts/locations?tree=1')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+        facet_queries = [s for s in statements if 'resource_versions' not in s]
+        assert len(facet_queries) == 1
+        assert 'post_locations' in facet_queries[0]
+
+    def test_delete_decrements(self, client, add_posts, sample_user, auth_headers):
+        posts = self._seed(add_posts, sample_user)
+
+        client.delete(f'/api/posts/{posts[3].id}', headers=auth_headers)
+
+        data = client.get('/api/posts/locations').get_json()
+        assert data['provinces'] == ['DKI Jakarta']
+        assert 'Bandung' not in data['cities']
+
+    def test_upload_increments(self, client, db_session, auth_headers):
+        from unittest.mock import MagicMock, patch
+        import numpy as np
+
+        mock_box = MagicMock()
+        mock_box.conf = [0.9]
+        mock_box.xywh = [[50, 50, 10, 10]]
+        mock_result = MagicMock()
+        mock_result.boxes = [mock_box]
+        mock_model = MagicMock()
+        mock_model.model_version = None
+        mock_model.predict.return_value = [mock_result]
+
+        with patch('routes.posts.yolo_model', mock_model):
+            with patch('cv2.imdecode', return_value=np.zeros((100, 100, 3), dtype=np.uint8)):
+                for _ in range(2):
+                    response = client.post('/api/upload', data={
+                        'image': (io.BytesIO(b"fakeimagecontent"), 'test.jpg'),
+                        'latitude': -6.2, 'longitude': 106.8,
+                        'province': 'Bali', 'city': 'Denpasar', 'district': 'Kuta'
+                    }, content_type='multipart/form-data', headers=auth_headers)
+                    assert response.status_code == 200
+
+        tree = client.get('/api/posts/locations?tree=1').get_json()['tree']
+        assert tree == [{'name': 'Bali', 'count': 2, 'cities': [
+            {'name': 'Denpasar', 'count': 2, 'districts': [{'name': 'Kuta', 'count': 2}]}
+        ]}]
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestPostsSparseFieldsAPI:
+    """Test cases for ?fields= on post and user list endpoints"""
+
+    @pytest.mark.parametrize('url', [
+        '/api/posts?fields=id,status',
+        '/api/posts?limit=5&fields=id,status',
+        '/api/posts/query?fields=id,status',
+        '/api/posts/filter?province=DKI&fields=id,status',
+        '/api/posts/filter?province=DKI&stream=1&fields=id,status',
+        '/api/posts/by-status?fields=id,status',
+        '/api/posts/search?q=jakarta&fields=id,status',
+        '/api/posts/in-bounds?min_lat=-7&max_lat=-6&min_lng=106&max_lng=107&fields=id,status',
+    ])
+    def test_only_requested_fields(self, client, sample_post, url):
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.get_json()
+        posts = data['data'] if isinstance(data, dict) else data
+        assert posts == [{'id': sample_post.id, 'status': 'MENUNGGU'}]
+
+    def test_unknown_field(self, client, sample_post):
+        response = client.get('/api/posts?fields=id,secret')
+        assert response.status_code == 400
+        assert 'secret' in response.get_json()['error']
+
+    def test_users_fields(self, client, sample_user):
+        response = client.get('/api/users?fields=id,username')
+        assert response.status_code == 200
+        assert response.get_json() == [{'id': sample_user.id, 'username': 'testuser'}]
+        assert client.get('/api/users?fields=password_hash').status_code == 400
@@ -172,3 +172,30 @@ class TestReviewsAPI:
             
             updated_review = db_session.query(Review).get(review.id)
             assert updated_review.sentiment == 'positif'
+
+    def test_get_reviews_stream(self, client, sample_review):
+        """Test streaming mode returns the same payload as the normal list"""
+        normal = client.get('/api/reviews').get_json()
+
+        response = client.get('/api/reviews?stream=1')
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'application/json'
+        assert response.get_json() == normal
+
+    def test_get_reviews_stream_lazy_analysis(self, client, db_session, sample_user):
+        """Test streaming mode still labels reviews and saves them after the stream"""
+        from unittest.mock import MagicMock, patch
+        from models import Review
+
+        review = Review(user_id=sample_user.id, rating=4, comment="Bagus", sentiment=None)
+        db_session.add(review)
+        db_session.commit()
+
+        mock_predictor = MagicMock(return_value='positif')
+        with patch('routes.others.predict_sentiment', mock_predictor):
+            data = client.get('/api/reviews?stream=1').get_json()
+
+        assert data[0]['sentiment'] == 'positif'
+        db_session.expire_all()
+        assert db_session.get(Review, review.id).sentiment == 'positif'
@@ -0,0 +1,109 @@
+"""
+API tests for full-text post search
+"""
+import pytest
+from sqlalchemy import text
+
+
+def _texts(rows):
+    return [{'address': address, 'caption': caption} for address, caption in rows]
+
+
+@pytest.mark.unit
+class TestSearchTerms:
+    """Test cases for query parsing in utils.search"""
+
+    def test_punctuation_is_dropped(self):
+        from utils.search import parse_search_terms, fts5_query, mysql_boolean_query
+
+        terms = parse_search_terms('Jl. Sudirman')
+        assert terms == ['jl', 'sudirman']
+        assert fts5_query(terms) == '"jl" "sudirman"*'
+        assert mysql_boolean_query(terms) == '+jl +sudirman*'
+
+    def test_fts_syntax_is_not_passed_through(self):
+        from utils.search import parse_search_terms
+
+        assert parse_search_terms('"a" OR NEAR(b') == ['a', 'or', 'near', 'b']
+        assert parse_search_terms('  ...  ') == []
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestSearchAPI:
+    """Test cases for GET /api/posts/search"""
+
+    def test_matches_address_and_caption(self, client, db_session, sample_user, add_posts):
+        add_posts(sample_user, _texts([
+            ('Jl. Sudirman No. 1, Jakarta', 'Lubang besar'),
+            ('Jl. Thamrin', 'Dekat Jl. Sudirman'),
+            ('Jl. Gatot Subroto', 'Aspal retak'),
+        ]))
+
+        response = client.get('/api/posts/search?q=Jl.%20Sudirman')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert {p['address'] for p in data['data']} == {'Jl. Sudirman No. 1, Jakarta', 'Jl. Thamrin'}
+        assert data['next_cursor'] is None
+
+    def test_ranked_by_relevance(self, client, db_session, sample_user, add_posts):
+        add_posts(sample_user, _texts([
+            ('Jl. Merdeka', 'Lubang kecil'),
+            ('Jl. Lubang Buaya', 'Lubang lubang lubang di lajur kiri'),
+        ]))
+
+        data = client.get('/api/posts/search?q=lubang').get_json()['data']
+        assert [p['address'] for p in data] == ['Jl. Lubang Buaya', 'Jl. Merdeka']
+
+    def test_prefix_and_case_insensitive(self, client, db_session, sample_user, add_posts):
+        add_posts(sample_user, _texts([('JALAN SUDIRMAN', None)]))
+
+        data = client.get('/api/posts/search?q=sudir').get_json()['data']
+        assert len(data) == 1
+
+    def test_index_follows_updates_and_deletes(self, client, db_session, sample_user, add_posts):
+        from utils.http_cache import mark_changed
+
+        post, = add_posts(sample_user, _texts([('Jl. Sudirman', None)]))
+
+        post.address = 'Jl. Thamrin'
+        mark_changed('posts')
+        db_session.commit()
+        assert client.get('/api/posts/search?q=sudirman').get_json()['data'] == []
+        assert len(client.get('/api/posts/search?q=thamrin').get_json()['data']) == 1
+
+        db_session.delete(post)
+        mark_changed('posts')
+        db_session.commit()
+        assert client.get('/api/posts/search?q=thamrin').get_json()['data'] == []
+
+    def test_pagination(self, client, db_session, sample_user, add_posts):
+        add_posts(sample_user, _texts([(f'Jl. Sudirman {i}', None) for i in range(5)]))
+
+        ids = []
+        url = '/api/posts/search?q=sudirman&limit=2'
+        while url:
+            page = client.get(url).get_json()
+            assert len(page['data']) <= 2
+            ids.extend(p['id'] for p in page['data'])
+            url = page['next_cursor'] and f"/api/posts/search?q=sudirman&limit=2&cursor={page['next_cursor']}"
+
+        assert len(ids) == 5
+        assert len(set(ids)) == 5
+
+    def test_uses_fts_index(self, app, db_session):
+        from utils.search import search_posts_query
+
+        query, _, _ = search_posts_query(['sudirman'])
+        compiled = query.statement.compile(db_session.get_bind(), compile_kwargs={'literal_binds': True})
+        plan = ' '.join(r[-1] for r in db_session.execute(text(f'EXPLAIN QUERY PLAN {compiled}')))
+        assert 'SCAN posts_fts VIRTUAL TABLE INDEX' in plan
+        assert 'SEARCH posts USING INTEGER PRIMARY KEY' in plan
+
+    def test_missing_query(self, client):
+        assert client.get('/api/posts/search').status_code == 400
+        assert client.get('/api/posts/search?q=...').status_code == 400
+
+    def test_invalid_cursor(self, client):
+        response = client.get('/api/posts/search?q=sudirman&cursor=rusak')
+        assert response.status_code == 400
@@ -0,0 +1,197 @@
+"""
+API tests for async upload (DetectionJob + status polling)
+"""
+import os
+import threading
+from datetime import timedelta
+from unittest.mock import patch
+import numpy as np
+import pytest
+from flask import Flask
+from models import db, DetectionJob, Post, utc_now
+from routes.posts import process_detection_job
+from utils.detection_jobs import detection_queue, claim_job, requeue_pending_jobs
+
+
+LOCATION = dict(address='Jalan Test', province='DKI Jakarta', city='Jakarta Pusat', district='Menteng')
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestUploadJobsAPI:
+    """Test cases for /api/upload?mode=async and /api/upload/jobs/<job_id>"""
+
+    def test_async_upload_done(self, app, client, db_session, sample_user, auth_headers, mock_model, upload):
+        points_before = sample_user.points
+        response = upload(auth_headers, mock_model(), mode='async', **LOCATION)
+
+        assert response.status_code == 202
+        body = response.get_json()
+        assert body['status'] == 'QUEUED'
+        assert response.headers['Location'] == body['status_url']
+
+        status = client.get(body['status_url'], headers=auth_headers)
+        assert status.status_code == 200
+        job = status.get_json()
+        assert job['status'] == 'DONE'
+        assert job['error'] is None
+        assert job['post']['pothole_count'] == 1
+        assert job['post']['severity'] == 'TIDAK_SERIUS'
+        assert job['post']['address'] == 'Jalan Test'
+
+        # Byte asli (.upload) diganti hasil normalisasi
+        filename = db_session.get(DetectionJob, job['job_id']).image_path
+        assert filename.endswith('.jpg')
+        assert os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+        assert not os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], f"{job['job_id']}.upload"))
+
+        db_session.refresh(sample_user)
+        assert sample_user.points == points_before + 10
+        assert len(client.get('/api/posts').get_json()) == 1
+
+    def test_async_upload_rejected(self, app, client, db_session, auth_headers, mock_model, upload):
+        response = upload(auth_headers, mock_model(boxes=0), mode='async')
+        job = client.get(response.get_json()['status_url'], headers=auth_headers).get_json()
+
+        assert job['status'] == 'REJECTED'
+        assert job['error'] == 'Tidak terdeteksi lubang'
+        assert job['post'] is None
+        filename = db_session.get(DetectionJob, job['job_id']).image_path
+        assert not os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+
+    def test_async_upload_failed(self, app, client, db_session, auth_headers, mock_model, upload):
+        model = mock_model()
+        model.predict.side_effect = RuntimeError('CUDA out of memory')
+        response = upload(auth_headers, model, mode='async')
+        job = client.get(response.get_json()['status_url'], headers=auth_headers).get_json()
+
+        assert job['status'] == 'FAILED'
+        assert 'CUDA out of memory' in job['error']
+        # Byte asli tidak tertinggal di disk
+        assert not os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], f"{job['job_id']}.upload"))
+
+    def test_async_upload_invalid_image(self, client, db_session, auth_headers, mock_model, upload):
+        response = upload(auth_headers, mock_model(), img=None, mode='async')
+        job = client.get(response.get_json()['status_url'], headers=auth_headers).get_json()
+
+        assert job['status'] == 'FAILED'
+        assert job['error'] == 'File tidak valid'
+
+    def test_async_upload_model_unavailable(self, client, db_session, auth_headers, upload):
+        response = upload(auth_headers, None, mode='async')
+        assert response.status_code == 503
+        assert db_session.query(DetectionJob).count() == 0
+
+    def test_invalid_mode(self, client, db_session, auth_headers, mock_model, upload):
+        response = upload(auth_headers, mock_model(), mode='batch')
+        assert response.status_code == 400
+
+    def test_sync_mode_unchanged(self, client, db_session, auth_headers, mock_model, upload):
+        response = upload(auth_headers, mock_model(), mode='sync')
+        assert response.status_code == 200
+        assert response.get_json()['message'] == 'Upload berhasil'
+        assert db_session.query(DetectionJob).count() == 0
+
+    def test_job_other_user_not_found(self, client, db_session, sample_admin, auth_headers):
+        job = DetectionJob(id='a' * 32, user_id=sample_admin.id, image_path='x.jpg', latitude=-6.2, longitude=106.8)
+        db_session.add(job)
+        db_session.commit()
+
+        assert client.get(f'/api/upload/jobs/{job.id}', headers=auth_headers).status_code == 404
+        assert client.get('/api/upload/jobs/tidakada', headers=auth_headers).status_code == 404
+
+    def test_admin_can_view_job(self, client, db_session, sample_user, admin_headers):
+        job = DetectionJob(id='b' * 32, user_id=sample_user.id, image_path='x.jpg', latitude=-6.2, longitude=106.8)
+        db_session.add(job)
+        db_session.commit()
+
+        response = client.get(f'/api/upload/jobs/{job.id}', headers=admin_headers)
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'QUEUED'
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestDetectionJobClaim:
+    """Test cases for atomic job claiming and stale job recovery"""
+
+    def _job(self, app, db_session, user, status='QUEUED', age=0):
+        job_id = os.urandom(16).hex()
+        with open(os.path.join(app.config['UPLOAD_FOLDER'], f'{job_id}.upload'), 'wb') as f:
+            f.write(b'fakeimagecontent')
+        job = DetectionJob(id=job_id, user_id=user.id, image_path=f'{job_id}.upload',
+                           latitude=-6.2, longitude=106.8, status=status,
+                           updated_at=utc_now() - timedelta(seconds=age))
+        db_session.add(job)
+        db_session.commit()
+        return job
+
+    def test_claim_only_once(self, app, db_session, sample_user):
+        job = self._job(app, db_session, sample_user)
+        assert claim_job(job.id)
+        assert not claim_job(job.id)
+
+    def test_stale_processing_reclaimable(self, app, db_session, sample_user):
+        fresh = self._job(app, db_session, sample_user, status='PROCESSING')
+        stale = self._job(app, db_session, sample_user, status='PROCESSING', age=600)
+        assert not claim_job(fresh.id, stale_after=300)
+        assert claim_job(stale.id, stale_after=300)
+
+    def test_concurrent_claim_single_winner(self, tmp_path):
+        # SQLite file (bukan StaticPool bersama) supaya tiap thread punya koneksi & session sendiri
+        file_app = Flask(__name__)
+        file_app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'jobs.db'}"
+        db.init_app(file_app)
+        with file_app.app_context():
+            db.create_all()
+            job_id = os.urandom(16).hex()
+            db.session.add(DetectionJob(id=job_id, user_id=1, image_path=f'{job_id}.upload',
+                                        latitude=-6.2, longitude=106.8))
+            db.session.commit()
+
+        workers = 8
+        barrier = threading.Barrier(workers)
+        results = []
+
+        def claim():
+            with file_app.app_context():
+                barrier.wait()
+                results.append(claim_job(job_id))
+                db.session.remove()
+
+        threads = [threading.Thread(target=claim) for _ in range(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+
+        assert sorted(results) == [False] * (workers - 1) + [True]
+        with file_app.app_context():
+            assert db.session.get(DetectionJob, job_id).status == 'PROCESSING'
+            db.session.remove()
+            db.engine.dispose()
+
+    def test_requeued_then_resubmitted_job_runs_once(self, app, client, db_session, sample_user, mock_model):
+        job = self._job(app, db_session, sample_user)
+        model = mock_model()
+        with patch('routes.posts.yolo_model', model):
+            with patch('cv2.imdecode', return_value=np.zeros((100, 100, 3), dtype=np.uint8)):
+                # Requeue saat start lalu worker/proses lain menjadwalkan job yang sama
+                # (berurutan: SQLite test memakai satu koneksi bersama)
+                assert requeue_pending_jobs(app, process_detection_job) == 1
+                detection_queue.join(timeout=5)
+                detection_queue.submit(app, job.id, process_detection_job)
+                detection_queue.join(timeout=5)
+
+        assert model.predict.call_count == 1
+        assert db_session.query(Post).count() == 1
+
+    def test_poll_resubmits_stale_job(self, app, client, db_session, sample_user, auth_headers, mock_model):
+        job = self._job(app, db_session, sample_user, status='PROCESSING', age=600)
+        with patch('routes.posts.yolo_model', mock_model()):
+            with patch('cv2.imdecode', return_value=np.zeros((100, 100, 3), dtype=np.uint8)):
+                client.get(f'/api/upload/jobs/{job.id}', headers=auth_headers)
+                detection_queue.join(timeout=5)
+
+        db_session.expire_all()
+        assert db_session.get(DetectionJob, job.id).status == 'DONE'
@@ -0,0 +1 @@
+# Benchmark scripts (dijalankan manual, tidak ikut pytest)
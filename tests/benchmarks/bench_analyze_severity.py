@@ -0,0 +1,104 @@
+"""
+Benchmark analyze_severity: loop per box (implementasi lama) vs NumPy vectorized
+
+Boxes dibuat mirip ultralytics: atribut conf/xywh untuk semua box, dan
+iterasi menghasilkan objek Boxes per box (slice tensor). Jika torch
+terpasang, tensor memakai torch (float() per box = sinkronisasi per box).
+
+Jalankan dari root project:
+    python -m tests.benchmarks.bench_analyze_severity --detections 1,10,100,1000
+"""
+import argparse
+import time
+import numpy as np
+from utils.ai_helper import analyze_severity, analyze_severity_batch
+
+try:
+    import torch
+except ImportError:  # torch opsional, default NumPy
+    torch = None
+
+
+class Boxes:
+    def __init__(self, conf, xywh):
+        self.conf = conf
+        self.xywh = xywh
+
+    def __len__(self):
+        return len(self.conf)
+
+    def __iter__(self):
+        for i in range(len(self.conf)):
+            yield Boxes(self.conf[i:i + 1], self.xywh[i:i + 1])
+
+
+class Result:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+def make_result(n, rng, use_torch):
+    conf = rng.uniform(0.2, 1.0, n).astype(np.float32)
+    xywh = np.column_stack([rng.uniform(0, 640, (n, 2)), rng.uniform(2, 60, (n, 2))]).astype(np.float32)
+    if use_torch:
+        conf, xywh = torch.from_numpy(conf), torch.from_numpy(xywh)
+    return Result(Boxes(conf, xywh))
+
+
+def legacy_analyze_severity(results, img_w, img_h, confidence_threshold=0.4):
+    """Implementasi sebelum vectorized (float() per box)"""
+    boxes = results[0].boxes if len(results) > 0 else []
+    filtered_boxes = []
+    for box in boxes:
+        conf = float(box.conf[0]) if len(box.conf) > 0 else 0
+        if conf > confidence_threshold:
+            filtered_boxes.append(box)
+    count = len(filtered_boxes)
+    if count == 0:
+        return "AMAN", 0
+    serious = False
+    img_area = img_w * img_h
+    for box in filtered_boxes:
+        if box.xywh is not None and len(box.xywh) > 0:
+            xywh = box.xywh[0]
+            if float(xywh[2]) * float(xywh[3]) / img_area > 0.035:
+                serious = True
+                break
+    return ("SERIUS" if count > 4 or serious else "TIDAK_SERIUS"), count
+
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - t0) * 1e6
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--detections', default='1,10,100,1000', help='Jumlah box per gambar')
+    parser.add_argument('--batch', type=int, default=8, help='Jumlah gambar untuk analyze_severity_batch')
+    parser.add_argument('--repeat', type=int, default=20, help='Pengulangan (diambil yang tercepat)')
+    args = parser.parse_args()
+
+    use_torch = torch is not None
+    print(f"Tensor: {'torch' if use_torch else 'numpy'}\n")
+    rng = np.random.default_rng(42)
+
+    print(f"{'boxes':>7}{'loop µs':>12}{'vector µs':>12}{'batch x' + str(args.batch) + ' µs':>16}{'speedup':>10}")
+    for n in [int(d) for d in args.detections.split(',')]:
+        results = [make_result(n, rng, use_torch)]
+        batch = [make_result(n, rng, use_torch) for _ in range(args.batch)]
+        assert legacy_analyze_severity(results, 640, 480) == analyze_severity(results, 640, 480)
+
+        loop = best_of(lambda: legacy_analyze_severity(results, 640, 480), args.repeat)
+        vector = best_of(lambda: analyze_severity(results, 640, 480), args.repeat)
+        batched = best_of(lambda: analyze_severity_batch(batch, (640, 480)), args.repeat)
+        print(f"{n:>7}{loop:>12.1f}{vector:>12.1f}{batched:>16.1f}{loop / vector:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark micro-batching inferensi: throughput vs latency p95
+
+Model default adalah simulasi dengan biaya tetap per panggilan predict()
+(overhead pre/post-processing) + biaya per gambar, dan melepas GIL seperti
+inferensi torch. Dengan --model best.pt (ultralytics terpasang) benchmark
+memakai model YOLO asli.
+
+Jalankan dari root project:
+    python -m tests.benchmarks.bench_inference_batcher --clients 16 --requests 20
+"""
+import argparse
+import statistics
+import threading
+import time
+import numpy as np
+from utils.inference_batcher import InferenceBatcher
+
+
+class SimulatedModel:
+    def __init__(self, call_ms, image_ms):
+        self.call_ms = call_ms
+        self.image_ms = image_ms
+        self._lock = threading.Lock()  # satu device: predict tidak paralel
+
+    def predict(self, source, **kwargs):
+        sources = source if isinstance(source, list) else [source]
+        with self._lock:
+            time.sleep((self.call_ms + self.image_ms * len(sources)) / 1000)
+        return [None] * len(sources)
+
+
+def run(model, clients, requests, batch_size, wait_ms):
+    predictor = InferenceBatcher(model, max_batch_size=batch_size, max_wait_ms=wait_ms)
+    img = np.zeros((640, 640, 3), dtype=np.uint8)
+    latencies = []
+    lock = threading.Lock()
+    start = threading.Barrier(clients + 1)
+
+    def client():
+        start.wait()
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            predictor.predict(source=img, conf=0.4, verbose=False)
+            elapsed = (time.perf_counter() - t0) * 1000
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    total = time.perf_counter() - t0
+
+    p95 = statistics.quantiles(latencies, n=20)[-1]
+    avg_batch = predictor.stats()['avg_batch_size'] if batch_size > 1 else 1
+    return len(latencies) / total, statistics.median(latencies), p95, avg_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=16, help='Jumlah upload bersamaan')
+    parser.add_argument('--requests', type=int, default=20, help='Request per client')
+    parser.add_argument('--call-ms', type=float, default=30, help='Biaya tetap per predict() (simulasi)')
+    parser.add_argument('--image-ms', type=float, default=8, help='Biaya per gambar (simulasi)')
+    parser.add_argument('--model', help='Path model YOLO (butuh ultralytics), default simulasi')
+    parser.add_argument('--batch-sizes', default='1,2,4,8,16')
+    parser.add_argument('--waits', default='2,10,25', help='max_wait_ms yang diuji')
+    args = parser.parse_args()
+
+    if args.model:
+        from ultralytics import YOLO
+        model = YOLO(args.model)
+    else:
+        model = SimulatedModel(args.call_ms, args.image_ms)
+
+    print(f"{'batch':>6}{'wait ms':>9}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'avg batch':>11}")
+    for batch_size in [int(b) for b in args.batch_sizes.split(',')]:
+        waits = [0] if batch_size == 1 else [float(w) for w in args.waits.split(',')]
+        for wait_ms in waits:
+            throughput, p50, p95, avg_batch = run(model, args.clients, args.requests, batch_size, wait_ms)
+            print(f"{batch_size:>6}{wait_ms:>9g}{throughput:>10.1f}{p50:>10.1f}{p95:>10.1f}{avg_batch:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark JSON provider: DefaultJSONProvider Flask vs FastJSONProvider
+
+Payload memakai output asli Post.to_dict() (post transient dengan author)
+dan payload /api/dashboard/growth (list timestamp ISO).
+
+Jalankan dari root project:
+    python -m tests.benchmarks.bench_json_provider --posts 5000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from models import Post, User, UserRole
+from utils import json_provider
+from utils.json_provider import FastJSONProvider
+
+
+def make_posts(n):
+    rng = random.Random(42)
+    authors = [User(id=i, username=f'u{i}', email=f'u{i}@example.com', full_name=f'User {i}',
+                    role=UserRole.USER) for i in range(1, 201)]
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        Post(id=i, user_id=(i % 200) + 1, author=authors[i % 200], image_path=f'{i}.jpg',
+             latitude=-6.2 + rng.uniform(-0.5, 0.5), longitude=106.8 + rng.uniform(-0.5, 0.5),
+             address=f'Jl. Sudirman No. {rng.randint(1, 200)}, Jakarta', province='DKI Jakarta',
+             city='Jakarta Pusat', district=f'Kecamatan {rng.randint(1, 40)}',
+             severity=rng.choice(['SERIUS', 'TIDAK_SERIUS']), pothole_count=rng.randint(1, 9),
+             caption='Terdeteksi 3 lubang (SERIUS)', confirm_count=rng.randint(0, 50),
+             false_count=rng.randint(0, 10), status='MENUNGGU',
+             created_at=start + timedelta(minutes=i))
+        for i in range(n)
+    ]
+
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - t0) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=5000, help='Jumlah post dalam payload')
+    parser.add_argument('--repeat', type=int, default=5, help='Pengulangan (diambil yang tercepat)')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    providers = [('Flask default (json)', DefaultJSONProvider(app)), ('FastJSONProvider', FastJSONProvider(app))]
+    if json_provider.orjson is None:
+        print('orjson tidak terpasang: FastJSONProvider memakai json stdlib\n')
+
+    with app.test_request_context():
+        payloads = {
+            'Post.to_dict()': [p.to_dict() for p in make_posts(args.posts)],
+            'dashboard/growth': {
+                'users': [(datetime(2024, 1, 1) + timedelta(hours=i)).isoformat() for i in range(args.posts)],
+                'posts': [(datetime(2024, 1, 1) + timedelta(minutes=i)).isoformat() for i in range(args.posts * 4)],
+            },
+        }
+
+        print(f"{'Payload':<20}{'Provider':<24}{'response() ms':>15}")
+        for payload_name, payload in payloads.items():
+            for provider_name, provider in providers:
+                elapsed = best_of(lambda: provider.response(payload).get_data(), args.repeat)
+                print(f"{payload_name:<20}{provider_name:<24}{elapsed:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
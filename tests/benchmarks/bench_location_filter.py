@@ -0,0 +1,109 @@
+"""
+Benchmark filter lokasi /api/posts/filter
+
+Membandingkan filter lama `ilike('%x%')` (selalu full scan) dengan filter
+berbasis kolom *_key yang di-index (exact & prefix) pada tabel posts SQLite
+yang diisi data dummy.
+
+Jalankan dari root project:
+    python -m tests.benchmarks.bench_location_filter --rows 1000000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, select, text, func
+from models import db, Post, normalize_location
+from utils.locations import location_filter
+
+PROVINCES = {
+    'DKI Jakarta': ['Jakarta Pusat', 'Jakarta Selatan', 'Jakarta Barat', 'Jakarta Timur'],
+    'Jawa Barat': ['Bandung', 'Bekasi', 'Bogor', 'Depok', 'Cirebon'],
+    'Jawa Tengah': ['Semarang', 'Solo', 'Magelang', 'Tegal'],
+    'Jawa Timur': ['Surabaya', 'Malang', 'Kediri', 'Madiun'],
+    'Bali': ['Denpasar', 'Badung', 'Gianyar'],
+    'Sumatera Utara': ['Medan', 'Binjai', 'Pematangsiantar'],
+    'Sulawesi Selatan': ['Makassar', 'Parepare', 'Palopo'],
+    'Kalimantan Timur': ['Samarinda', 'Balikpapan', 'Bontang'],
+}
+
+
+def seed(conn, rows, batch_size=50000):
+    """Isi tabel posts dengan `rows` baris dummy (executemany per batch)"""
+    rng = random.Random(42)
+    provinces = list(PROVINCES)
+    start = datetime(2024, 1, 1)
+    insert = text(
+        "INSERT INTO posts (user_id, image_path, latitude, longitude, severity, status, "
+        "province, city, district, province_key, city_key, district_key, "
+        "confirm_count, false_count, engagement_score, created_at) "
+        "VALUES (1, 'x.jpg', 0, 0, 'SERIUS', 'MENUNGGU', :p, :c, :d, :pk, :ck, :dk, 0, 0, 0, :t)"
+    )
+    for offset in range(0, rows, batch_size):
+        batch = []
+        for i in range(offset, min(rows, offset + batch_size)):
+            province = rng.choice(provinces)
+            city = rng.choice(PROVINCES[province])
+            district = f'Kecamatan {rng.randint(1, 40)}'
+            batch.append({
+                'p': province, 'c': city, 'd': district,
+                'pk': normalize_location(province), 'ck': normalize_location(city),
+                'dk': normalize_location(district),
+                't': start + timedelta(seconds=i * 30),
+            })
+        conn.execute(insert, batch)
+
+
+def timed(conn, stmt, repeat):
+    """Waktu eksekusi terbaik (ms) dan jumlah baris hasil"""
+    best = None
+    count = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        count = len(conn.execute(stmt).fetchall())
+        elapsed = (time.perf_counter() - t0) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, count
+
+
+def query_plan(conn, stmt):
+    compiled = stmt.compile(conn, compile_kwargs={'literal_binds': True})
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+    return '; '.join(r[-1] for r in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000, help='Jumlah baris dummy (default 1.000.000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Pengulangan per query (diambil yang tercepat)')
+    parser.add_argument('--db', default=':memory:', help='Path file SQLite (default in-memory)')
+    args = parser.parse_args()
+
+    engine = create_engine(f'sqlite:///{args.db}')
+    db.metadata.create_all(engine, tables=[Post.__table__])
+
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(Post.__table__)).scalar() < args.rows:
+            t0 = time.perf_counter()
+            seed(conn, args.rows)
+            print(f"Seeded {args.rows:,} rows in {time.perf_counter() - t0:.1f}s")
+        conn.execute(text("ANALYZE"))
+
+        columns = select(Post.id, Post.province, Post.city).order_by(Post.created_at.desc())
+        cases = [
+            ("ilike '%jawa barat%' (lama)", columns.where(Post.province.ilike('%Jawa Barat%'))),
+            ('province_key exact', columns.where(location_filter(Post.province_key, 'Jawa Barat', 'exact'))),
+            ('province_key prefix', columns.where(location_filter(Post.province_key, 'Jawa', 'prefix'))),
+            ("ilike '%balikpapan%' (lama)", columns.where(Post.city.ilike('%Balikpapan%'))),
+            ('city_key exact', columns.where(location_filter(Post.city_key, 'Balikpapan', 'exact'))),
+            ('city_key prefix', columns.where(location_filter(Post.city_key, 'Balik', 'prefix'))),
+        ]
+
+        print(f"\n{'Query':<32}{'Rows':>10}{'Best (ms)':>12}  Plan")
+        for name, stmt in cases:
+            elapsed, count = timed(conn, stmt, args.repeat)
+            print(f"{name:<32}{count:>10,}{elapsed:>12.1f}  {query_plan(conn, stmt)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark encode JSON vs MessagePack untuk payload feed posts
+
+Membandingkan waktu encode/decode dan ukuran payload (mentah dan gzip)
+untuk list post dengan bentuk yang sama dengan /api/posts.
+
+Jalankan dari root project:
+    python -m tests.benchmarks.bench_msgpack --posts 10000
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+from flask import Flask
+import msgpack
+from utils.responses import packb
+
+
+def make_posts(n):
+    """List post dummy dengan field yang sama dengan Post.to_dict()"""
+    rng = random.Random(42)
+    return [
+        {
+            'id': i,
+            'user_id': rng.randint(1, 500),
+            'uploaded_by': f'User {rng.randint(1, 500)}',
+            'image_url': f'https://api.example.com/uploads/{1700000000 + i}_{i % 500}.jpg',
+            'lat': -6.2 + rng.uniform(-0.5, 0.5),
+            'long': 106.8 + rng.uniform(-0.5, 0.5),
+            'address': f'Jl. Sudirman No. {rng.randint(1, 200)}, Jakarta',
+            'province': 'DKI Jakarta',
+            'city': rng.choice(['Jakarta Pusat', 'Jakarta Selatan', 'Jakarta Barat']),
+            'district': f'Kecamatan {rng.randint(1, 40)}',
+            'severity': rng.choice(['SERIUS', 'TIDAK_SERIUS']),
+            'pothole_count': rng.randint(1, 9),
+            'caption': 'Terdeteksi 3 lubang (SERIUS)',
+            'verification': {'valid': rng.randint(0, 50), 'false': rng.randint(0, 10)},
+            'status': rng.choice(['MENUNGGU', 'DIPROSES', 'SELESAI']),
+            'date': '2024-05-10 08:00'
+        }
+        for i in range(n)
+    ]
+
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - t0) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=10000, help='Jumlah post dalam payload')
+    parser.add_argument('--repeat', type=int, default=5, help='Pengulangan (diambil yang tercepat)')
+    args = parser.parse_args()
+
+    posts = make_posts(args.posts)
+    app = Flask(__name__)
+
+    with app.app_context():
+        json_body = app.json.dumps(posts).encode('utf-8')
+        msgpack_body = packb(posts)
+        results = [
+            ('JSON', json_body,
+             best_of(lambda: app.json.dumps(posts).encode('utf-8'), args.repeat),
+             best_of(lambda: json.loads(json_body), args.repeat)),
+            ('MessagePack', msgpack_body,
+             best_of(lambda: packb(posts), args.repeat),
+             best_of(lambda: msgpack.unpackb(msgpack_body, raw=False), args.repeat)),
+        ]
+
+    print(f"{args.posts:,} posts\n")
+    print(f"{'Format':<14}{'Bytes':>12}{'Gzip bytes':>12}{'Encode (ms)':>14}{'Decode (ms)':>14}")
+    for name, body, encode_ms, decode_ms in results:
+        print(f"{name:<14}{len(body):>12,}{len(gzip.compress(body)):>12,}{encode_ms:>14.1f}{decode_ms:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,8 +2,11 @@
 Test configuration and fixtures for SmartInfra Backend
 Using SQLite in-memory database for isolated testing
 """
+import io
 import os
 import sys
+from unittest.mock import MagicMock, patch
+import numpy as np
 import pytest
 from flask import Flask
 
@@ -17,6 +20,10 @@ def create_test_app():
     """Create a fresh Flask app for testing with SQLite."""
     app = Flask(__name__)
     
+    # Same JSON provider as app.py
+    from utils.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
     # Test configuration - SQLite in-memory
     app.config['TESTING'] = True
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
@@ -36,6 +43,10 @@ def create_test_app():
     # Initialize database with this app
     db.init_app(app)
     
+    # Same response compression as app.py (only active with Accept-Encoding)
+    from utils.compression import init_compression
+    init_compression(app)
+    
     # Register blueprints
     from routes.auth import auth_bp
     from routes.users import users_bp
@@ -80,8 +91,13 @@ def client(app):
 @pytest.fixture(scope='function')
 def db_session(app):
     """Create a new database session for a test."""
+    from utils.response_cache import response_cache
+    from utils.clustering import cluster_cache
+    
     with app.app_context():
-        # Clean all tables
+        # Clean all tables (and cached responses built from them)
+        response_cache.clear()
+        cluster_cache.clear()
         db.session.remove()
         db.drop_all()
         db.create_all()
@@ -212,3 +228,91 @@ def petugas_headers(client, sample_petugas):
     data = response.get_json()
     token = data.get('token') if data else None
     return {'Authorization': f'Bearer {token}'} if token else {}
+
+
+@pytest.fixture
+def add_posts(db_session):
+    """
+    Factory: tambah beberapa post sekaligus lalu commit.
+
+    add_posts(user, [{'address': ...}, ...], severity='TIDAK_SERIUS')
+    add_posts(user, 30)  # 30 post dengan nilai default
+    """
+    def _add_posts(user, rows, **common):
+        if isinstance(rows, int):
+            rows = [{}] * rows
+        posts = []
+        for i, row in enumerate(rows):
+            values = dict(user_id=user.id, image_path=f'{i}.jpg', latitude=-6.2, longitude=106.8,
+                          severity='SERIUS', status='MENUNGGU')
+            values.update(common)
+            values.update(row)
+            posts.append(Post(**values))
+        db_session.add_all(posts)
+        db_session.commit()
+        return posts
+
+    return _add_posts
+
+
+@pytest.fixture
+def add_post(add_posts):
+    """Factory: tambah satu post, add_post(user, **kolom)"""
+    def _add_post(user, **kwargs):
+        return add_posts(user, [kwargs])[0]
+
+    return _add_post
+
+
+@pytest.fixture
+def mock_model():
+    """
+    Factory: model YOLO palsu dengan `boxes` deteksi berukuran 10x10.
+
+    version=None (default) membuat hasil deteksi tidak di-cache
+    (lihat utils.detection_cache).
+    """
+    def _mock_model(boxes=1, conf=0.9, version=None):
+        mock_box = MagicMock()
+        mock_box.conf = [conf]
+        mock_box.xywh = [[50, 50, 10, 10]]
+        mock_result = MagicMock()
+        mock_result.boxes = [mock_box] * boxes
+        model = MagicMock()
+        model.predict.return_value = [mock_result]
+        model.model_version = version
+        return model
+
+    return _mock_model
+
+
+# Gambar polos: dHash None, jadi tidak pernah dianggap laporan duplikat
+PLAIN_IMAGE = np.full((480, 640, 3), 80, dtype=np.uint8)
+
+
+@pytest.fixture
+def upload(client):
+    """
+    Helper POST /api/upload dengan model dan hasil cv2.imdecode di-patch.
+
+    Menunggu detection_queue selesai sebelum patch dilepas, supaya job
+    mode=async juga memakai model palsu. img=None mensimulasikan file rusak.
+    """
+    from utils.detection_jobs import detection_queue
+
+    def _upload(headers, model, img=PLAIN_IMAGE, lat=-6.2, lng=106.8, mode='sync', **fields):
+        data = {
+            'image': (io.BytesIO(b"fakeimagecontent"), 'test_image.jpg'),
+            'latitude': lat,
+            'longitude': lng,
+            'mode': mode,
+            **fields
+        }
+        with patch('routes.posts.yolo_model', model):
+            with patch('cv2.imdecode', return_value=img):
+                response = client.post('/api/upload', data=data, content_type='multipart/form-data',
+                                       headers=headers)
+                detection_queue.join(timeout=5)
+        return response
+
+    return _upload
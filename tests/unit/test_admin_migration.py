@@ -93,6 +93,110 @@ class TestDBMigration:
         assert any("ADD COLUMN province" in sql for sql in executed_sqls)
         assert any("ADD COLUMN city" in sql for sql in executed_sqls)
         assert any("ADD COLUMN district" in sql for sql in executed_sqls)
+        assert any("ADD COLUMN geohash" in sql for sql in executed_sqls)
+        assert any("CREATE INDEX ix_posts_geohash" in sql for sql in executed_sqls)
+        assert any("ADD COLUMN province_key" in sql for sql in executed_sqls)
+        assert any("CREATE INDEX ix_posts_district_key" in sql for sql in executed_sqls)
+
+    @patch('routes.admin.db')
+    @patch('sqlalchemy.inspect')
+    def test_migrate_engagement_score(self, mock_inspect, mock_db):
+        """Test adding, backfilling and indexing posts.engagement_score"""
+        mock_inspector = MagicMock()
+        mock_inspect.return_value = mock_inspector
+        mock_inspector.get_table_names.return_value = ['users', 'reviews', 'posts']
+        mock_inspector.get_columns.side_effect = [
+            [{'name': 'created_at'}], # users
+            [{'name': 'sentiment'}], # reviews
+            [{'name': 'status'}, {'name': 'province'}, {'name': 'city'}, {'name': 'district'}] # posts
+        ]
+        mock_inspector.get_indexes.return_value = []
+
+        mock_app = MagicMock()
+        with mock_app.app_context():
+             check_and_migrate_db(mock_app)
+
+        executed_sqls = [str(c[0][0]) for c in mock_db.session.execute.call_args_list]
+        assert any("ADD COLUMN engagement_score" in sql for sql in executed_sqls)
+        assert any("UPDATE posts SET engagement_score" in sql for sql in executed_sqls)
+        assert any("CREATE INDEX ix_posts_engagement" in sql for sql in executed_sqls)
+        assert any("CREATE INDEX ix_posts_status_engagement" in sql for sql in executed_sqls)
+        assert any("CREATE INDEX ix_posts_location_created" in sql for sql in executed_sqls)
+
+    @patch('routes.admin.db')
+    @patch('sqlalchemy.inspect')
+    def test_migrate_fulltext_mysql(self, mock_inspect, mock_db):
+        """Test adding the FULLTEXT index on MySQL"""
+        mock_inspector = MagicMock()
+        mock_inspect.return_value = mock_inspector
+        mock_inspector.get_table_names.return_value = ['users', 'reviews', 'posts']
+        mock_inspector.get_columns.return_value = [{'name': 'created_at'}, {'name': 'sentiment'}]
+        mock_inspector.get_indexes.return_value = []
+        mock_db.engine.dialect.name = 'mysql'
+
+        mock_app = MagicMock()
+        with mock_app.app_context():
+             check_and_migrate_db(mock_app)
+
+        executed_sqls = [str(c[0][0]) for c in mock_db.session.execute.call_args_list]
+        assert any("ADD FULLTEXT INDEX ix_posts_fulltext" in sql for sql in executed_sqls)
+        assert not any("posts_fts" in sql for sql in executed_sqls)
+
+    @patch('routes.admin.db')
+    @patch('sqlalchemy.inspect')
+    def test_migrate_location_key_collation_mysql(self, mock_inspect, mock_db):
+        """Test that *_key columns are added or converted with a binary collation on MySQL"""
+        mock_inspector = MagicMock()
+        mock_inspect.return_value = mock_inspector
+        mock_inspector.get_table_names.return_value = ['users', 'reviews', 'posts']
+        mock_inspector.get_columns.return_value = [{'name': 'created_at'}, {'name': 'sentiment'},
+                                                   {'name': 'province_key'}]
+        mock_inspector.get_indexes.return_value = []
+        mock_db.engine.dialect.name = 'mysql'
+        mock_db.session.execute.return_value.scalars.return_value.all.return_value = ['city_key']
+
+        mock_app = MagicMock()
+        with mock_app.app_context():
+             check_and_migrate_db(mock_app)
+
+        executed_sqls = [str(c[0][0]) for c in mock_db.session.execute.call_args_list]
+        assert any("MODIFY city_key VARCHAR(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin" in sql
+                   for sql in executed_sqls)
+        assert not any("MODIFY province_key" in sql for sql in executed_sqls)
+
+    def test_migrate_fts_sqlite(self, app, db_session, sample_user):
+        """Test creating and rebuilding posts_fts on SQLite for existing posts"""
+        from sqlalchemy import text
+        from models import Post
+
+        db_session.add(Post(user_id=sample_user.id, image_path='1.jpg', latitude=-6.2,
+                            longitude=106.8, severity='SERIUS', address='Jl. Sudirman'))
+        db_session.commit()
+        db_session.execute(text("DROP TABLE posts_fts"))
+        db_session.commit()
+
+        check_and_migrate_db(app)
+
+        rows = db_session.execute(text("SELECT rowid FROM posts_fts WHERE posts_fts MATCH 'sudirman'")).fetchall()
+        assert len(rows) == 1
+
+    def test_backfill_location_keys(self, db_session, sample_user):
+        """Backfill mengisi *_key yang masih NULL dengan nilai ternormalisasi"""
+        from sqlalchemy import text
+        from models import Post
+        from routes.admin import backfill_location_keys
+
+        for i in range(3):
+            db_session.add(Post(user_id=sample_user.id, image_path=f'{i}.jpg', latitude=-6.2,
+                                longitude=106.8, severity='SERIUS', province='  DKI   Jakarta ',
+                                city='Jakarta Pusat', district=None))
+        db_session.commit()
+        db_session.execute(text("UPDATE posts SET province_key = NULL, city_key = NULL, district_key = NULL"))
+        db_session.commit()
+
+        assert backfill_location_keys(batch_size=2) == 3
+        rows = db_session.execute(text("SELECT province_key, city_key, district_key FROM posts")).fetchall()
+        assert set(rows) == {('dki jakarta', 'jakarta pusat', '')}
 
     @patch('routes.admin.db')
     @patch('sqlalchemy.inspect')
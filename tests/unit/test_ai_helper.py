@@ -1,12 +1,13 @@
 import pytest
 from unittest.mock import MagicMock
+import numpy as np
 import sys
 import os
 
 # Ensure we can import from backend_sim
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
-from utils.ai_helper import analyze_severity
+from utils.ai_helper import analyze_severity, analyze_severity_batch, detected_boxes
 
 class TestAIHelper:
     
@@ -91,3 +92,84 @@ class TestAIHelper:
         status, count = analyze_severity(results, 100, 100)
         assert status == "TIDAK_SERIUS"
         assert count == 1
+
+
+class FakeBoxes:
+    """Mirip ultralytics Boxes: conf (N,) dan xywh (N, 4) untuk semua box sekaligus"""
+
+    def __init__(self, conf, xywh):
+        self.conf = np.asarray(conf, dtype=np.float32)
+        self.xywh = np.asarray(xywh, dtype=np.float32).reshape(-1, 4)
+
+    def per_box(self):
+        """Format lama: list box satu-per-satu"""
+        boxes = []
+        for c, row in zip(self.conf, self.xywh):
+            box = MagicMock()
+            box.conf = [c]
+            box.xywh = [row]
+            boxes.append(box)
+        return boxes
+
+
+def _result(boxes):
+    result = MagicMock()
+    result.boxes = boxes
+    return result
+
+
+@pytest.mark.unit
+class TestAnalyzeSeverityVectorized:
+    """Test cases for tensor-level analyze_severity and analyze_severity_batch"""
+
+    def test_tensor_boxes(self):
+        boxes = FakeBoxes([0.9, 0.3, 0.8], [[50, 50, 10, 10], [50, 50, 90, 90], [20, 20, 5, 5]])
+        # Box besar confidence-nya rendah -> tidak dihitung
+        assert analyze_severity([_result(boxes)], 100, 100) == ("TIDAK_SERIUS", 2)
+
+    def test_tensor_boxes_serious_area(self):
+        boxes = FakeBoxes([0.9, 0.9], [[50, 50, 10, 10], [50, 50, 20, 20]])
+        assert analyze_severity([_result(boxes)], 100, 100) == ("SERIUS", 2)
+
+    def test_empty_tensor_boxes(self):
+        assert analyze_severity([_result(FakeBoxes([], []))], 100, 100) == ("AMAN", 0)
+
+    def test_torch_like_tensor(self):
+        tensor = MagicMock()
+        tensor.cpu.return_value.numpy.return_value = np.array([0.9] * 5)
+        boxes = MagicMock(spec=['conf', 'xywh'])
+        boxes.conf = tensor
+        boxes.xywh = np.tile([50, 50, 5, 5], (5, 1))
+        assert analyze_severity([_result(boxes)], 100, 100) == ("SERIUS", 5)
+
+    def test_batch(self):
+        results = [
+            _result(FakeBoxes([0.9], [[50, 50, 10, 10]])),
+            _result(FakeBoxes([], [])),
+            _result(FakeBoxes([0.9], [[50, 50, 20, 20]])),
+            _result(FakeBoxes([0.9] * 6, [[50, 50, 1, 1]] * 6)),
+        ]
+        assert analyze_severity_batch(results, (100, 100)) == [
+            ("TIDAK_SERIUS", 1), ("AMAN", 0), ("SERIUS", 1), ("SERIUS", 6)
+        ]
+        # Ukuran per gambar: box 20x20 kecil untuk gambar 1000x1000
+        sizes = [(100, 100), (100, 100), (1000, 1000), (100, 100)]
+        assert analyze_severity_batch(results, sizes)[2] == ("TIDAK_SERIUS", 1)
+        assert analyze_severity_batch([], (100, 100)) == []
+
+    def test_matches_per_box_path(self):
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            n = int(rng.integers(0, 12))
+            boxes = FakeBoxes(rng.uniform(0, 1, n), np.column_stack([
+                rng.uniform(0, 640, (n, 2)), rng.uniform(1, 200, (n, 2))
+            ]))
+            assert analyze_severity([_result(boxes)], 640, 480) == \
+                analyze_severity([_result(boxes.per_box())], 640, 480)
+
+    def test_detected_boxes(self):
+        boxes = FakeBoxes([0.9, 0.3, 0.5], [[10, 20, 30, 40], [1, 1, 1, 1], [5, 6, 7, 8]])
+        expected = [[10, 20, 30, 40, 0.9], [5, 6, 7, 8, 0.5]]
+        assert detected_boxes([_result(boxes)]) == expected
+        assert detected_boxes([_result(boxes.per_box())]) == expected
+        assert detected_boxes([]) == []
@@ -0,0 +1,96 @@
+"""
+Unit tests for the detection result cache
+"""
+import os
+import pytest
+from utils.detection_cache import DetectionCache, DetectionResult
+
+DIGEST_A = 'a' * 64
+DIGEST_B = 'b' * 64
+RESULT = DetectionResult('SERIUS', 2, [[50.0, 50.0, 10.0, 10.0, 0.9], [20.0, 20.0, 5.0, 5.0, 0.8]])
+
+
+@pytest.mark.unit
+class TestDetectionCache:
+    """Test cases for utils.detection_cache.DetectionCache"""
+
+    def test_hit_and_miss(self):
+        cache = DetectionCache()
+        assert cache.get('v1', DIGEST_A) is None
+        cache.put('v1', DIGEST_A, RESULT)
+
+        assert cache.get('v1', DIGEST_A) == RESULT
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+    def test_get_or_detect_runs_once(self):
+        cache = DetectionCache()
+        calls = []
+
+        def detect():
+            calls.append(1)
+            return RESULT
+
+        assert cache.get_or_detect('v1', DIGEST_A, detect) == RESULT
+        assert cache.get_or_detect('v1', DIGEST_A, detect) == RESULT
+        assert len(calls) == 1
+
+    def test_no_version_not_cached(self):
+        cache = DetectionCache()
+        calls = []
+
+        def detect():
+            calls.append(1)
+            return RESULT
+
+        cache.get_or_detect(None, DIGEST_A, detect)
+        cache.get_or_detect(None, DIGEST_A, detect)
+        assert len(calls) == 2
+        assert cache.stats()['entries'] == 0
+
+    def test_versions_are_separate(self):
+        cache = DetectionCache()
+        cache.put('v1', DIGEST_A, RESULT)
+        assert cache.get('v2', DIGEST_A) is None
+        assert cache.get('v1', DIGEST_A) == RESULT
+
+    def test_lru_eviction(self):
+        cache = DetectionCache(max_entries=2)
+        cache.put('v1', '1', RESULT)
+        cache.put('v1', '2', RESULT)
+        cache.get('v1', '1')
+        cache.put('v1', '3', RESULT)
+
+        assert cache.get('v1', '2') is None
+        assert cache.get('v1', '1') == RESULT and cache.get('v1', '3') == RESULT
+
+
+@pytest.mark.unit
+class TestDetectionCacheDisk:
+    """Test cases for the optional on-disk tier"""
+
+    def test_shared_between_instances(self, tmp_path):
+        cache_dir = str(tmp_path / 'cache')
+        DetectionCache(cache_dir=cache_dir).put('v1', DIGEST_A, RESULT)
+
+        other = DetectionCache(cache_dir=cache_dir)
+        assert other.get('v1', DIGEST_A) == RESULT
+        assert other.get('v1', DIGEST_A) == RESULT
+        assert other.get('v2', DIGEST_A) is None
+        stats = other.stats()
+        assert (stats['disk_hits'], stats['hits'], stats['misses']) == (1, 1, 1)
+
+    def test_old_version_kept_on_disk(self, tmp_path):
+        cache_dir = tmp_path / 'cache'
+        DetectionCache(cache_dir=str(cache_dir)).put('v1', DIGEST_A, RESULT)
+        DetectionCache(cache_dir=str(cache_dir)).put('v2', DIGEST_A, RESULT)
+
+        # Worker yang masih memakai model lama tetap membaca folder versinya
+        assert sorted(os.listdir(cache_dir)) == ['v1', 'v2']
+
+    def test_corrupt_file_is_miss(self, tmp_path):
+        cache_dir = tmp_path / 'cache'
+        DetectionCache(cache_dir=str(cache_dir)).put('v1', DIGEST_B, RESULT)
+        (cache_dir / 'v1' / 'bb' / f'{DIGEST_B}.json').write_bytes(b'{not json')
+
+        assert DetectionCache(cache_dir=str(cache_dir)).get('v1', DIGEST_B) is None
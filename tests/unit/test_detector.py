@@ -0,0 +1,269 @@
+"""
+Unit tests for pluggable detector backends (utils.detector)
+"""
+import os
+import sys
+import types
+from unittest.mock import MagicMock
+import cv2
+import numpy as np
+import pytest
+from utils.ai_helper import analyze_severity
+from utils.detector import letterbox, decode_yolo_output, load_detector, OnnxDetector, TorchDetector
+from utils.inference_batcher import InferenceBatcher
+
+try:
+    import onnx
+    import onnxruntime
+    from onnx import helper, TensorProto
+except ImportError:  # onnx/onnxruntime opsional: test backend ONNX di-skip
+    onnx = onnxruntime = None
+
+requires_onnx = pytest.mark.skipif(onnxruntime is None, reason='onnx/onnxruntime tidak terpasang')
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BEST_PT = os.path.join(BASE_DIR, 'best.pt')
+BEST_ONNX = os.path.join(BASE_DIR, 'best.onnx')
+# Foto jalan berlubang 640x480 untuk uji kesamaan hasil torch vs ONNX
+POTHOLE_IMAGE = os.path.join(BASE_DIR, 'tests', 'fixtures', 'pothole.jpg')
+
+# Anchor output palsu (koordinat input model 640x640): cx, cy, w, h, score
+ANCHORS = np.array([
+    [100, 200, 40, 40, 0.95],   # box a
+    [102, 201, 40, 40, 0.60],   # overlap box a -> dibuang NMS
+    [400, 300, 200, 120, 0.50],  # box b (besar)
+    [600, 600, 20, 20, 0.10],   # di bawah conf
+    [630, 300, 40, 40, 0.70],   # melewati tepi kanan -> di-clip
+    [50, 500, 30, 30, 0.00],    # skor = 0.9 * rata-rata kecerahan gambar
+], dtype=np.float32).T
+
+
+def build_model(path, batch='N', imgsz=640):
+    """Model ONNX format output YOLOv8 (1, 4 + nc, anchors) tanpa torch; imgsz=None = input dinamis"""
+    height, width = (imgsz, imgsz) if imgsz else ('height', 'width')
+    brightness = np.zeros_like(ANCHORS)
+    brightness[4, 5] = 0.9
+    graph = helper.make_graph(
+        [
+            helper.make_node('ReduceMean', ['images'], ['mean'], axes=[1, 2, 3], keepdims=1),
+            helper.make_node('Squeeze', ['mean', 'squeeze_axes'], ['mean3']),
+            helper.make_node('Mul', ['mean3', 'brightness'], ['scaled']),
+            helper.make_node('Add', ['scaled', 'anchors'], ['output0']),
+        ],
+        'fake_yolo',
+        [helper.make_tensor_value_info('images', TensorProto.FLOAT, [batch, 3, height, width])],
+        [helper.make_tensor_value_info('output0', TensorProto.FLOAT, [batch, 5, ANCHORS.shape[1]])],
+        initializer=[
+            helper.make_tensor('squeeze_axes', TensorProto.INT64, [1], [3]),
+            helper.make_tensor('brightness', TensorProto.FLOAT, [1, *ANCHORS.shape], brightness.flatten()),
+            helper.make_tensor('anchors', TensorProto.FLOAT, [1, *ANCHORS.shape], ANCHORS.flatten()),
+        ],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+    return str(path)
+
+
+@pytest.fixture
+def onnx_path(tmp_path):
+    return build_model(tmp_path / 'best.onnx')
+
+
+def black(h=960, w=1280):
+    return np.zeros((h, w, 3), dtype=np.uint8)
+
+
+def ultralytics_letterbox(img, size=640, auto=False, stride=32):
+    """
+    Referensi LetterBox.__call__ ultralytics 8.x (center=True, scaleup=True).
+    Dipakai jika ultralytics tidak terpasang; jika terpasang, test memakai aslinya.
+    """
+    try:
+        from ultralytics.data.augment import LetterBox
+        return LetterBox((size, size), auto=auto, stride=stride)(image=img)
+    except ImportError:
+        pass
+    h, w = img.shape[:2]
+    r = min(size / h, size / w)
+    new_unpad = int(round(w * r)), int(round(h * r))
+    dw, dh = size - new_unpad[0], size - new_unpad[1]
+    if auto:
+        dw, dh = np.mod(dw, stride), np.mod(dh, stride)
+    dw, dh = dw / 2, dh / 2
+    if (w, h) != new_unpad:
+        img = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    return cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+
+
+@pytest.mark.unit
+class TestPrePostProcess:
+    """Test cases for letterbox and YOLOv8 output decoding"""
+
+    def test_letterbox(self):
+        img, scale, pad = letterbox(black(), 640)
+        assert img.shape == (640, 640, 3)
+        assert scale == 0.5
+        assert pad == (0, 80)
+        assert img[0, 0, 0] == 114 and img[320, 320, 0] == 0
+
+    def test_letterbox_auto_minimal_padding(self):
+        img, scale, pad = letterbox(black(720, 1280), 640, auto=True)
+        # 1280x720 -> 640x360, padding tinggi 280 % 32 = 24 -> 12 atas/bawah
+        assert img.shape == (384, 640, 3)
+        assert (scale, pad) == (0.5, (0, 12))
+
+    @pytest.mark.parametrize('auto', [False, True])
+    @pytest.mark.parametrize('shape', [(960, 1280), (480, 640), (720, 1280), (1280, 720), (301, 499), (641, 639)])
+    def test_letterbox_matches_ultralytics(self, shape, auto):
+        img = np.random.default_rng(0).integers(0, 255, (*shape, 3), dtype=np.uint8)
+        boxed, _, _ = letterbox(img, 640, auto=auto)
+
+        np.testing.assert_array_equal(boxed, ultralytics_letterbox(img, 640, auto=auto))
+
+    def test_decode_filters_and_nms(self):
+        xywh, conf, cls = decode_yolo_output(ANCHORS, conf=0.25)
+        assert conf.tolist() == pytest.approx([0.95, 0.70, 0.50])
+        assert xywh[0].tolist() == [100, 200, 40, 40]
+        assert cls.tolist() == [0, 0, 0]
+
+    def test_decode_empty(self):
+        xywh, conf, _ = decode_yolo_output(ANCHORS, conf=0.99)
+        assert xywh.shape == (0, 4) and len(conf) == 0
+
+
+@requires_onnx
+@pytest.mark.unit
+class TestOnnxDetector:
+    """Test cases for the onnxruntime backend"""
+
+    def test_boxes_in_original_coordinates(self, onnx_path):
+        detector = OnnxDetector(onnx_path)
+        result = detector.predict(source=black(), conf=0.25)[0]
+
+        assert len(result.boxes) == 3
+        # (100, 200) di input -> x / 0.5, (y - 80) / 0.5
+        assert result.boxes.xywh[0].tolist() == pytest.approx([200, 240, 80, 80])
+        # Box yang melewati tepi kanan di-clip ke lebar gambar
+        x1 = result.boxes.xywh[1, 0] - result.boxes.xywh[1, 2] / 2
+        x2 = result.boxes.xywh[1, 0] + result.boxes.xywh[1, 2] / 2
+        assert (x1, x2) == pytest.approx((1220, 1280))
+        assert result.orig_shape == (960, 1280)
+
+    def test_batch_matches_single(self, onnx_path):
+        detector = OnnxDetector(onnx_path)
+        white = np.full((480, 640, 3), 255, dtype=np.uint8)
+
+        batch = detector.predict(source=[black(), white], conf=0.25)
+        singles = [detector.predict(source=img, conf=0.25)[0] for img in (black(), white)]
+
+        assert [len(r.boxes) for r in batch] == [3, 4]
+        for got, expected in zip(batch, singles):
+            np.testing.assert_allclose(got.boxes.xywh, expected.boxes.xywh, rtol=1e-5)
+            np.testing.assert_allclose(got.boxes.conf, expected.boxes.conf, rtol=1e-5)
+
+    def test_dynamic_input_pads_like_torch(self, tmp_path):
+        detector = OnnxDetector(build_model(tmp_path / 'dynamic.onnx', imgsz=None))
+        batch, transforms = detector._preprocess([black(720, 1280)])
+        # Satu gambar: padding minimal seperti predict() best.pt
+        assert batch.shape == (1, 3, 384, 640)
+        assert transforms == [(0.5, (0, 12))]
+
+        result = detector.predict(source=black(720, 1280), conf=0.25)[0]
+        assert result.boxes.xywh[0].tolist() == pytest.approx([200, 376, 80, 80])
+
+    def test_dynamic_input_mixed_shapes_square(self, tmp_path):
+        detector = OnnxDetector(build_model(tmp_path / 'dynamic.onnx', imgsz=None))
+        batch, _ = detector._preprocess([black(720, 1280), black(480, 640)])
+        assert batch.shape == (2, 3, 640, 640)
+
+    def test_static_input_always_square(self, onnx_path):
+        batch, _ = OnnxDetector(onnx_path)._preprocess([black(720, 1280)])
+        assert batch.shape == (1, 3, 640, 640)
+
+    def test_static_batch_runs_per_image(self, tmp_path):
+        detector = OnnxDetector(build_model(tmp_path / 'static.onnx', batch=1, imgsz=320), imgsz=640)
+        assert detector.imgsz == 320 and detector.fixed_batch == 1
+
+        results = detector.predict(source=[black(), black()], conf=0.25)
+        assert len(results) == 2
+
+    def test_unavailable_provider_falls_back_to_cpu(self, onnx_path):
+        detector = OnnxDetector(onnx_path, providers=['NotARealExecutionProvider'])
+        assert detector.session.get_providers() == ['CPUExecutionProvider']
+
+    def test_severity_and_batcher_compatible(self, onnx_path):
+        detector = OnnxDetector(onnx_path)
+        results = detector.predict(source=black(), conf=0.4, verbose=False)
+        # box b: 400 x 240 piksel dari 1280 x 960 -> > 3.5% area
+        assert analyze_severity(results, 1280, 960) == ('SERIUS', 3)
+
+        batcher = InferenceBatcher(detector, max_batch_size=4, max_wait_ms=1)
+        assert len(batcher.predict(source=black(), conf=0.4, verbose=False)[0].boxes) == 3
+
+
+@pytest.mark.unit
+class TestTorchDetector:
+    """Test cases for the ultralytics backend preprocessing options"""
+
+    def test_predict_keeps_ultralytics_defaults(self, monkeypatch):
+        yolo = MagicMock()
+        monkeypatch.setitem(sys.modules, 'ultralytics', types.SimpleNamespace(YOLO=yolo))
+
+        TorchDetector('best.pt').predict(source=black(), conf=0.4)
+        kwargs = yolo.return_value.predict.call_args.kwargs
+        # Hanya imgsz yang diisi; preprocessing lain tetap default ultralytics
+        assert kwargs == {'source': kwargs['source'], 'conf': 0.4, 'verbose': False, 'imgsz': 640}
+
+
+def _sorted_xywh(result):
+    xywh = result.boxes.xywh
+    xywh = np.asarray(xywh.cpu() if hasattr(xywh, 'cpu') else xywh, dtype=np.float32)
+    return xywh[np.lexsort(xywh.T[::-1])]
+
+
+@pytest.mark.unit
+class TestLoadDetector:
+    """Test cases for utils.detector.load_detector"""
+
+    @requires_onnx
+    def test_onnx_backend_with_warmup(self, onnx_path):
+        detector = load_detector('onnx', onnx_path, threads=1)
+        assert detector.backend == 'onnx'
+
+    def test_unknown_backend(self, tmp_path):
+        with pytest.raises(ValueError):
+            load_detector('tensorrt', str(tmp_path / 'best.engine'))
+
+    @requires_onnx
+    @pytest.mark.skipif(
+        not (os.path.exists(BEST_PT) and os.path.exists(BEST_ONNX)),
+        reason='best.pt dan best.onnx tidak tersedia'
+    )
+    def test_torch_onnx_parity(self):
+        pytest.importorskip('ultralytics')
+        img = cv2.imread(POTHOLE_IMAGE)
+        h, w = img.shape[:2]
+
+        torch_results = load_detector('torch', BEST_PT).predict(source=img, conf=0.4)
+        onnx_results = load_detector('onnx', BEST_ONNX).predict(source=img, conf=0.4)
+
+        assert len(torch_results[0].boxes) > 0, 'best.pt harus mendeteksi lubang di foto fixture'
+        assert analyze_severity(torch_results, w, h) == analyze_severity(onnx_results, w, h)
+        np.testing.assert_allclose(_sorted_xywh(onnx_results[0]), _sorted_xywh(torch_results[0]), atol=2)
+
+    @requires_onnx
+    def test_model_version_pinned_at_load(self, onnx_path):
+        detector = load_detector('onnx', onnx_path, warmup=False)
+        version = detector.model_version
+        assert version.startswith('onnx-') and len(version) == len('onnx-') + 16
+
+        # File diganti tanpa restart: model di memori (dan versinya) tetap
+        with open(onnx_path, 'ab') as f:
+            f.write(b'\0')
+        assert detector.model_version == version
+        assert load_detector('onnx', build_model(onnx_path + '.2'), warmup=False).model_version == version
+
+
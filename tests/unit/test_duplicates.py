@@ -0,0 +1,97 @@
+"""
+Unit tests for perceptual-hash near-duplicate detection
+"""
+import cv2
+import numpy as np
+import pytest
+from utils.duplicates import dhash, hamming_distance, find_near_duplicate
+from utils.geo import distance_m, radius_bounds
+
+
+def scene(seed):
+    """Gambar sintetis dengan struktur (lingkaran acak) supaya dHash informatif"""
+    rng = np.random.default_rng(seed)
+    img = np.full((480, 640, 3), 120, dtype=np.uint8)
+    for _ in range(25):
+        color = tuple(int(v) for v in rng.integers(0, 255, 3))
+        center = (int(rng.integers(0, 640)), int(rng.integers(0, 480)))
+        cv2.circle(img, center, int(rng.integers(20, 120)), color, -1)
+    return img
+
+
+def recompressed(img, quality=40):
+    return cv2.imdecode(cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])[1], cv2.IMREAD_COLOR)
+
+
+@pytest.mark.unit
+class TestDHash:
+    """Test cases for utils.duplicates.dhash"""
+
+    def test_format(self):
+        value = dhash(scene(0))
+        assert len(value) == 16
+        int(value, 16)
+
+    def test_robust_to_recompression_crop_and_resize(self):
+        img = scene(0)
+        value = dhash(img)
+        assert hamming_distance(value, dhash(recompressed(img))) <= 4
+        assert hamming_distance(value, dhash(img[10:-10, 12:-12])) <= 8
+        assert hamming_distance(value, dhash(cv2.resize(img, (320, 240)))) <= 4
+
+    def test_different_images_far_apart(self):
+        assert hamming_distance(dhash(scene(0)), dhash(scene(1))) > 16
+
+    def test_blank_image_has_no_hash(self):
+        assert dhash(np.zeros((100, 100, 3), dtype=np.uint8)) is None
+        assert dhash(np.full((100, 100), 255, dtype=np.uint8)) is None
+
+    def test_hamming_distance(self):
+        assert hamming_distance('0000000000000000', '0000000000000000') == 0
+        assert hamming_distance('0000000000000000', 'ffffffffffffffff') == 64
+        assert hamming_distance('00000000000000f0', '0000000000000010') == 3
+
+
+@pytest.mark.unit
+class TestGeoDistance:
+    """Test cases for distance helpers used by the duplicate lookup"""
+
+    def test_distance_m(self):
+        assert distance_m(-6.2, 106.8, -6.2, 106.8) == 0
+        # 0.001 derajat latitude ~ 111 m
+        assert 110 < distance_m(-6.2, 106.8, -6.201, 106.8) < 112
+
+    def test_radius_bounds_covers_circle(self):
+        min_lat, max_lat, min_lng, max_lng = radius_bounds(-6.2, 106.8, 100)
+        assert distance_m(-6.2, 106.8, max_lat, 106.8) == pytest.approx(100, rel=1e-3)
+        assert distance_m(-6.2, 106.8, -6.2, max_lng) == pytest.approx(100, rel=1e-3)
+        assert min_lat < -6.2 < max_lat and min_lng < 106.8 < max_lng
+
+
+@pytest.mark.unit
+class TestFindNearDuplicate:
+    """Test cases for utils.duplicates.find_near_duplicate"""
+
+    def test_match_within_radius_and_distance(self, add_post, sample_user):
+        value = dhash(scene(0))
+        post = add_post(sample_user, phash=value)
+
+        assert find_near_duplicate(dhash(recompressed(scene(0))), -6.20005, 106.80005) == post
+        # Foto berbeda di lokasi yang sama
+        assert find_near_duplicate(dhash(scene(1)), -6.2, 106.8) is None
+        # Foto sama tapi ~1 km jauhnya
+        assert find_near_duplicate(value, -6.209, 106.8) is None
+        assert find_near_duplicate(None, -6.2, 106.8) is None
+
+    def test_closest_hash_wins(self, add_post, sample_user):
+        value = dhash(scene(0))
+        near = format(int(value, 16) ^ 0b1, '016x')
+        nearer = add_post(sample_user, latitude=-6.2001, phash=value)
+        add_post(sample_user, phash=near)
+
+        assert find_near_duplicate(value, -6.2, 106.8) == nearer
+
+    def test_finished_posts_ignored(self, add_post, sample_user):
+        value = dhash(scene(0))
+        add_post(sample_user, phash=value, status='SELESAI')
+        assert find_near_duplicate(value, -6.2, 106.8) is None
@@ -0,0 +1,52 @@
+"""
+Unit tests for geohash helpers
+"""
+import pytest
+from utils.geo import encode_geohash, covering_prefixes, cell_size, geohash_bounds, parse_bounds
+
+
+@pytest.mark.unit
+class TestGeo:
+    """Test cases for utils.geo"""
+
+    def test_encode_known_value(self):
+        """Test against a well-known geohash"""
+        assert encode_geohash(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+
+    def test_encode_jakarta_prefix(self):
+        """Nearby points share a prefix"""
+        a = encode_geohash(-6.2000, 106.8166)
+        b = encode_geohash(-6.2001, 106.8167)
+        assert a[:6] == b[:6]
+        assert len(a) == 12
+
+    def test_cell_size(self):
+        lat_h, lng_w = cell_size(1)
+        assert (lat_h, lng_w) == (45.0, 45.0)
+
+    def test_geohash_bounds_contains_point(self):
+        min_lat, max_lat, min_lng, max_lng = geohash_bounds(encode_geohash(-6.2, 106.8, 5))
+        assert min_lat <= -6.2 <= max_lat and min_lng <= 106.8 <= max_lng
+        assert (max_lat - min_lat, max_lng - min_lng) == cell_size(5)
+
+    def test_covering_prefixes_contain_points(self):
+        """Every point inside the box starts with one of the prefixes"""
+        bounds = (-6.40, -6.10, 106.70, 107.00)
+        prefixes = covering_prefixes(*bounds)
+
+        assert 0 < len(prefixes) <= 32
+        assert len(set(len(p) for p in prefixes)) == 1
+        for lat in (-6.40, -6.25, -6.10):
+            for lng in (106.70, 106.85, 107.00):
+                assert encode_geohash(lat, lng).startswith(tuple(prefixes))
+
+    def test_covering_prefixes_small_box_is_precise(self):
+        """A street-level box uses long prefixes"""
+        prefixes = covering_prefixes(-6.2005, -6.1995, 106.8160, 106.8170)
+        assert len(prefixes[0]) >= 5
+
+    def test_parse_bounds_invalid(self):
+        with pytest.raises(ValueError):
+            parse_bounds({'min_lat': '1'})
+        with pytest.raises(ValueError):
+            parse_bounds({'min_lat': '5', 'max_lat': '1', 'min_lng': '0', 'max_lng': '1'})
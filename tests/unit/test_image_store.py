@@ -0,0 +1,111 @@
+"""
+Unit tests for content-addressed image storage
+"""
+import hashlib
+import os
+from unittest.mock import patch
+import numpy as np
+import pytest
+from models import Post
+from utils.images import normalize_image
+from utils.image_store import content_filename, store_image, image_refcount, release_image
+
+
+def _normalized(value=90):
+    import cv2
+    data = cv2.imencode('.png', np.full((300, 400, 3), value, dtype=np.uint8))[1].tobytes()
+    return normalize_image(data)
+
+
+@pytest.mark.unit
+class TestImageStore:
+    """Test cases for utils.image_store"""
+
+    def test_content_filename_sharded(self):
+        digest = hashlib.sha256(b'abc').hexdigest()
+        assert content_filename(b'abc', '.jpg') == f'{digest[:2]}/{digest[2:4]}/{digest}.jpg'
+
+    def test_store_writes_original_and_variants(self, app):
+        folder = app.config['UPLOAD_FOLDER']
+        normalized = _normalized()
+
+        filename, created = store_image(folder, normalized)
+
+        assert created
+        assert filename == content_filename(normalized.data, '.jpg')
+        with open(os.path.join(folder, filename), 'rb') as f:
+            assert f.read() == normalized.data
+        assert os.path.exists(os.path.join(folder, 'thumb', filename))
+        assert os.path.exists(os.path.join(folder, 'medium', filename))
+
+    def test_duplicate_not_written(self, app):
+        folder = app.config['UPLOAD_FOLDER']
+        first, _ = store_image(folder, _normalized(50))
+
+        with patch('utils.image_store.write_atomic') as mock_write, \
+                patch('utils.image_store.save_variants') as mock_variants:
+            second, created = store_image(folder, _normalized(50))
+
+        assert second == first
+        assert not created
+        mock_write.assert_not_called()
+        mock_variants.assert_not_called()
+
+    def test_different_content_different_name(self, app):
+        folder = app.config['UPLOAD_FOLDER']
+        assert store_image(folder, _normalized(10))[0] != store_image(folder, _normalized(20))[0]
+
+    def test_release_respects_refcount(self, app, db_session, sample_user):
+        folder = app.config['UPLOAD_FOLDER']
+        filename, _ = store_image(folder, _normalized(70))
+        posts = [Post(user_id=sample_user.id, image_path=filename, latitude=-6.2, longitude=106.8,
+                      severity='SERIUS') for _ in range(2)]
+        db_session.add_all(posts)
+        db_session.commit()
+        assert image_refcount(filename) == 2
+
+        db_session.delete(posts[0])
+        db_session.commit()
+        assert not release_image(folder, filename)
+        assert os.path.exists(os.path.join(folder, filename))
+
+        db_session.delete(posts[1])
+        db_session.commit()
+        assert release_image(folder, filename)
+        assert not os.path.exists(os.path.join(folder, filename))
+        assert not os.path.exists(os.path.join(folder, 'thumb', filename))
+
+    def test_release_restores_when_upload_commits_concurrently(self, app, db_session, sample_user):
+        folder = app.config['UPLOAD_FOLDER']
+        filename, _ = store_image(folder, _normalized(80))
+        counts = iter([0])
+
+        def refcount(image_path):
+            # Hitungan pertama 0; sebelum hitung ulang, upload identik commit post baru
+            value = next(counts, None)
+            if value is not None:
+                return value
+            db_session.add(Post(user_id=sample_user.id, image_path=filename, latitude=-6.2,
+                                longitude=106.8, severity='SERIUS'))
+            db_session.commit()
+            return image_refcount(image_path)
+
+        with patch('utils.image_store.image_refcount', side_effect=refcount):
+            assert not release_image(folder, filename)
+
+        assert os.path.exists(os.path.join(folder, filename))
+        assert not [f for f in os.listdir(os.path.dirname(os.path.join(folder, filename))) if f.endswith('.del')]
+
+    def test_store_after_commit_recreates_released_file(self, app, db_session):
+        folder = app.config['UPLOAD_FOLDER']
+        normalized = _normalized(85)
+        filename, _ = store_image(folder, normalized)
+
+        # Upload identik melihat file masih ada (tidak menulis), lalu penghapusan selesai
+        assert store_image(folder, normalized) == (filename, False)
+        assert release_image(folder, filename)
+        assert not os.path.exists(os.path.join(folder, filename))
+
+        # Pengecekan ulang setelah commit post menulis ulang file
+        assert store_image(folder, normalized) == (filename, True)
+        assert os.path.exists(os.path.join(folder, filename))
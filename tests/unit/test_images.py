@@ -0,0 +1,97 @@
+"""
+Unit tests for upload image normalization
+"""
+import struct
+from unittest.mock import patch
+import cv2
+import numpy as np
+import pytest
+from utils.images import image_size, normalize_image, fit_within
+
+
+def _jpeg(w, h, orientation=None):
+    img = np.zeros((h, w, 3), dtype=np.uint8)
+    img[:, :w // 4] = 255  # strip putih di kiri untuk cek rotasi
+    data = cv2.imencode('.jpg', img)[1].tobytes()
+    if orientation is None:
+        return data
+    tiff = (b'MM\x00\x2a' + struct.pack('>IH', 8, 1)
+            + struct.pack('>HHIHH', 0x0112, 3, 1, orientation, 0) + struct.pack('>I', 0))
+    app1 = b'\xff\xe1' + struct.pack('>H', len(tiff) + 8) + b'Exif\x00\x00' + tiff
+    return data[:2] + app1 + data[2:]
+
+
+@pytest.mark.unit
+class TestImageSize:
+    """Test cases for header-only size parsing"""
+
+    def test_jpeg(self):
+        assert image_size(_jpeg(400, 300)) == (400, 300)
+        assert image_size(_jpeg(400, 300, orientation=6)) == (400, 300)
+
+    def test_png(self):
+        data = cv2.imencode('.png', np.zeros((30, 50, 3), dtype=np.uint8))[1].tobytes()
+        assert image_size(data) == (50, 30)
+
+    def test_unknown(self):
+        assert image_size(b'fakeimagecontent') is None
+        assert image_size(b'\xff\xd8\xff') is None
+
+
+@pytest.mark.unit
+class TestNormalizeImage:
+    """Test cases for utils.images.normalize_image"""
+
+    def test_downscale_and_reencode_jpeg(self):
+        result = normalize_image(_jpeg(4000, 3000), max_side=1280)
+
+        assert result.ext == '.jpg'
+        assert result.image.shape == (960, 1280, 3)
+        assert result.data[:2] == b'\xff\xd8'
+        assert image_size(result.data) == (1280, 960)
+
+    def test_reduced_decode_flag(self):
+        flags = []
+        real_imdecode = cv2.imdecode
+
+        def spy(buf, flag):
+            flags.append(flag)
+            return real_imdecode(buf, flag)
+
+        with patch('cv2.imdecode', spy):
+            normalize_image(_jpeg(4000, 3000), max_side=1000)
+            normalize_image(_jpeg(4000, 3000), max_side=1280)
+            normalize_image(_jpeg(800, 600), max_side=1280)
+
+        assert flags == [cv2.IMREAD_REDUCED_COLOR_4, cv2.IMREAD_REDUCED_COLOR_2, cv2.IMREAD_COLOR]
+
+    def test_exif_orientation_applied(self):
+        result = normalize_image(_jpeg(400, 300, orientation=6), max_side=1280)
+
+        # Orientation 6 = rotasi 90 derajat searah jarum jam: strip kiri pindah ke atas
+        assert result.image.shape[:2] == (400, 300)
+        assert result.image[:50].mean() > 200
+        assert result.image[-50:].mean() < 50
+        # EXIF tidak ikut tersimpan (hasil tidak diputar dua kali)
+        assert b'Exif' not in result.data
+
+    def test_png_converted_to_webp(self):
+        png = cv2.imencode('.png', np.full((200, 300, 4), 128, dtype=np.uint8))[1].tobytes()
+        result = normalize_image(png, max_side=1280, fmt='webp', quality=80)
+
+        assert result.ext == '.webp'
+        assert result.data[:4] == b'RIFF' and result.data[8:12] == b'WEBP'
+        assert result.image.shape == (200, 300, 3)
+
+    def test_small_image_not_upscaled(self):
+        result = normalize_image(_jpeg(320, 240), max_side=1280)
+        assert result.image.shape == (240, 320, 3)
+
+    def test_invalid(self):
+        assert normalize_image(b'') is None
+        assert normalize_image(b'fakeimagecontent') is None
+
+    def test_fit_within(self):
+        img = np.zeros((100, 1000, 3), dtype=np.uint8)
+        assert fit_within(img, 500).shape == (50, 500, 3)
+        assert fit_within(img, 2000) is img
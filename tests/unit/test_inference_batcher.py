@@ -0,0 +1,144 @@
+"""
+Unit tests for YOLO inference micro-batching
+"""
+import threading
+import time
+import pytest
+from utils.inference_batcher import InferenceBatcher
+
+
+class FakeModel:
+    """Model palsu: hasil = (gambar, conf), mencatat ukuran tiap batch"""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.batches = []
+        self.names = {0: 'pothole'}
+
+    def predict(self, source, conf=0.25, verbose=True):
+        sources = source if isinstance(source, list) else [source]
+        self.batches.append(len(sources))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError('CUDA out of memory')
+        return [(s, conf) for s in sources]
+
+
+def _concurrent_predict(batcher, sources, **kwargs):
+    results = [None] * len(sources)
+    errors = []
+    start = threading.Barrier(len(sources))
+
+    def worker(i):
+        start.wait()
+        try:
+            results[i] = batcher.predict(source=sources[i], **kwargs)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(sources))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    return results, errors
+
+
+@pytest.mark.unit
+class TestInferenceBatcher:
+    """Test cases for utils.inference_batcher.InferenceBatcher"""
+
+    def test_single_call_returns_list(self):
+        batcher = InferenceBatcher(FakeModel(), max_batch_size=4, max_wait_ms=1)
+        assert batcher.predict(source='img', conf=0.4) == [('img', 0.4)]
+
+    def test_concurrent_calls_batched(self):
+        model = FakeModel()
+        batcher = InferenceBatcher(model, max_batch_size=8, max_wait_ms=200)
+
+        results, errors = _concurrent_predict(batcher, [f'img{i}' for i in range(8)], conf=0.4, verbose=False)
+
+        assert not errors
+        # Setiap pemanggil menerima hasil gambarnya sendiri
+        assert results == [[(f'img{i}', 0.4)] for i in range(8)]
+        assert sum(model.batches) == 8
+        assert len(model.batches) < 8
+        stats = batcher.stats()
+        assert stats['images'] == 8
+        assert stats['largest_batch'] == max(model.batches)
+
+    def test_batch_size_limit(self):
+        model = FakeModel()
+        batcher = InferenceBatcher(model, max_batch_size=3, max_wait_ms=200)
+        results, errors = _concurrent_predict(batcher, list(range(7)))
+
+        assert not errors
+        assert max(model.batches) <= 3
+        assert [r[0][0] for r in results] == list(range(7))
+
+    def test_different_kwargs_not_mixed(self):
+        model = FakeModel()
+        batcher = InferenceBatcher(model, max_batch_size=8, max_wait_ms=50)
+        results = {}
+
+        def call(conf):
+            results[conf] = batcher.predict(source='img', conf=conf)
+
+        threads = [threading.Thread(target=call, args=(c,)) for c in (0.25, 0.4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5)
+
+        assert results == {0.25: [('img', 0.25)], 0.4: [('img', 0.4)]}
+
+    def test_exception_propagates_to_callers(self):
+        batcher = InferenceBatcher(FakeModel(fail=True), max_batch_size=4, max_wait_ms=50)
+        results, errors = _concurrent_predict(batcher, ['a', 'b', 'c'])
+
+        assert results == [None, None, None]
+        assert len(errors) == 3
+        assert all('CUDA out of memory' in str(e) for e in errors)
+
+        # Worker tetap hidup setelah error
+        batcher.model.fail = False
+        assert batcher.predict(source='d') == [('d', 0.25)]
+
+    def test_batch_size_one_passthrough(self):
+        model = FakeModel()
+        batcher = InferenceBatcher(model, max_batch_size=1)
+        assert batcher.predict(source='img') == [('img', 0.25)]
+        assert batcher._thread is None
+
+    def test_attribute_passthrough(self):
+        batcher = InferenceBatcher(FakeModel())
+        assert batcher.names == {0: 'pothole'}
+
+    def test_upload_through_batcher(self, client, db_session, auth_headers):
+        """Test that /api/upload works unchanged with a batched model"""
+        import io
+        from unittest.mock import MagicMock, patch
+        import numpy as np
+
+        mock_box = MagicMock()
+        mock_box.conf = [0.9]
+        mock_box.xywh = [[50, 50, 10, 10]]
+        mock_result = MagicMock()
+        mock_result.boxes = [mock_box]
+        mock_model = MagicMock()
+        mock_model.model_version = None
+        mock_model.predict.side_effect = lambda source, **kwargs: [mock_result] * len(source)
+
+        batcher = InferenceBatcher(mock_model, max_batch_size=4, max_wait_ms=1)
+        with patch('routes.posts.yolo_model', batcher):
+            with patch('cv2.imdecode', return_value=np.zeros((100, 100, 3), dtype=np.uint8)):
+                response = client.post('/api/upload', data={
+                    'image': (io.BytesIO(b"fakeimagecontent"), 'test_image.jpg'),
+                    'latitude': -6.2,
+                    'longitude': 106.8
+                }, content_type='multipart/form-data', headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.get_json()['data']['pothole_count'] == 1
+        assert batcher.stats()['batches'] == 1
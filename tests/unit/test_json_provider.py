@@ -0,0 +1,89 @@
+"""
+Unit tests for the orjson-backed JSON provider
+"""
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import datetime, date, timezone
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from models import UserRole
+from utils import json_provider
+from utils.json_provider import FastJSONProvider
+
+
+@dataclasses.dataclass
+class Point:
+    lat: decimal.Decimal
+    role: UserRole
+
+
+SAMPLE = {
+    'id': 7,
+    'lat': decimal.Decimal('-6.20000000'),
+    'created': datetime(2024, 5, 10, 8, 30, tzinfo=timezone.utc),
+    'day': date(2024, 5, 10),
+    'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'nested': {'b': [1, 2.5, None, True], 'a': 'Jl. Sudirman'},
+}
+
+
+def _providers():
+    app = Flask(__name__)
+    return DefaultJSONProvider(app), FastJSONProvider(app), app
+
+
+@pytest.mark.unit
+class TestFastJSONProvider:
+    """Test cases for utils.json_provider.FastJSONProvider"""
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_matches_flask_output(self, monkeypatch, use_orjson):
+        pytest.importorskip('orjson')
+        if not use_orjson:
+            monkeypatch.setattr(json_provider, 'orjson', None)
+        default, fast, _ = _providers()
+
+        assert json.loads(fast.dumps(SAMPLE)) == json.loads(default.dumps(SAMPLE))
+        # sort_keys dipertahankan: body stabil untuk cache/ETag
+        assert fast.dumps({'b': 1, 'a': 2}).replace(' ', '') == '{"a":2,"b":1}'
+
+    def test_enum_and_dataclass(self):
+        _, fast, _ = _providers()
+        data = json.loads(fast.dumps({'role': UserRole.ADMIN, 'p': Point(decimal.Decimal('1.5'), UserRole.USER)}))
+        assert data == {'role': UserRole.ADMIN.value, 'p': {'lat': '1.5', 'role': UserRole.USER.value}}
+
+    def test_falls_back_for_unsupported_values(self):
+        _, fast, _ = _providers()
+        # Integer > 64 bit tidak didukung orjson
+        assert json.loads(fast.dumps({'big': 2 ** 70})) == {'big': 2 ** 70}
+        with pytest.raises(TypeError):
+            fast.dumps({'obj': object()})
+
+    def test_kwargs_use_stdlib(self):
+        _, fast, _ = _providers()
+        assert fast.dumps({'a': 1}, indent=2) == '{\n  "a": 1\n}'
+
+    def test_loads(self):
+        _, fast, _ = _providers()
+        assert fast.loads(b'{"a": [1, "x"]}') == {'a': [1, 'x']}
+        with pytest.raises(ValueError):
+            fast.loads('{rusak')
+
+    def test_response(self):
+        _, fast, app = _providers()
+        with app.app_context():
+            response = fast.response({'b': 'Jalan Rusak', 'a': 1})
+            assert response.mimetype == 'application/json'
+            assert response.get_data() == b'{"a":1,"b":"Jalan Rusak"}\n'
+
+            app.debug = True
+            assert b'\n  "a": 1' in fast.response({'a': 1}).get_data()
+
+    def test_post_payload_round_trip(self, client, sample_post):
+        """Test that /api/posts served through the provider decodes to Post.to_dict()"""
+        response = client.get('/api/posts')
+        with client.application.test_request_context():
+            assert response.get_json() == [sample_post.to_dict()]
@@ -93,6 +93,15 @@ class TestPostModel:
         for i, status in enumerate(statuses):
             assert posts[i].status == status
     
+    def test_location_keys_binary_collation_on_mysql(self):
+        """Prefix ranges on *_key follow code point order, so MySQL must not use the default collation"""
+        from sqlalchemy.dialects import mysql
+        from sqlalchemy.schema import CreateTable
+
+        ddl = str(CreateTable(Post.__table__).compile(dialect=mysql.dialect()))
+        for col in ('province_key', 'city_key', 'district_key'):
+            assert f'{col} VARCHAR(100) COLLATE utf8mb4_bin' in ddl
+
     def test_post_location_data(self, db_session, sample_user):
         """Test post location data"""
         post = Post(
@@ -0,0 +1,88 @@
+"""
+Unit tests for keyset pagination helpers
+"""
+import base64
+import json
+import pytest
+from datetime import datetime
+from models import Post
+from utils.pagination import encode_cursor, decode_cursor, key_types, parse_limit, InvalidCursor
+
+TERBARU = [datetime, int]
+TRENDING = [float, datetime, int]
+
+
+def forged(payload):
+    """Cursor buatan tangan (bukan dari encode_cursor)"""
+    raw = json.dumps(payload).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+@pytest.mark.unit
+class TestPagination:
+    """Test cases for cursor encoding and limit parsing"""
+
+    def test_cursor_roundtrip(self):
+        """Test that datetimes and ints survive encode/decode"""
+        values = [datetime(2025, 1, 2, 3, 4, 5, 678), 42]
+        cursor = encode_cursor('terbaru', values)
+
+        assert decode_cursor(cursor, 'terbaru', TERBARU) == values
+
+    def test_cursor_wrong_sort(self):
+        """Test that the sort name is checked"""
+        cursor = encode_cursor('terbaru', [datetime(2025, 1, 1), 1])
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor, 'selesai', TERBARU)
+
+    def test_cursor_wrong_length(self):
+        """Test that the number of keys is checked"""
+        cursor = encode_cursor('trending', [3, 1])
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor, 'trending', TRENDING)
+
+    def test_cursor_garbage(self):
+        """Test that garbage input raises InvalidCursor"""
+        with pytest.raises(InvalidCursor):
+            decode_cursor('%%%', 'terbaru', TERBARU)
+
+    def test_key_types_from_columns(self):
+        """Test that key types follow the column types"""
+        assert key_types([Post.engagement_score, Post.created_at, Post.id]) == TRENDING
+
+    @pytest.mark.parametrize('payload', [
+        ['terbaru', [1], 2],
+        ['terbaru', 'x', 'y'],
+        ['terbaru', {'dt': '2025-01-01T00:00:00'}, '5'],
+        ['terbaru', {'dt': '2025-01-01T00:00:00'}, 1.5],
+        ['terbaru', {'dt': '2025-01-01T00:00:00'}, True],
+        ['terbaru', {'dt': '2025-01-01T00:00:00'}, 2 ** 70],
+        ['terbaru', 12345, 1],
+        ['trending', 'x', {'dt': '2025-01-01T00:00:00'}, 1],
+        ['trending', None, {'dt': '2025-01-01T00:00:00'}, 1],
+    ])
+    def test_cursor_forged_types(self, payload):
+        """Test that key values of the wrong type are rejected"""
+        types = TRENDING if payload[0] == 'trending' else TERBARU
+        with pytest.raises(InvalidCursor):
+            decode_cursor(forged(payload), payload[0], types)
+
+    def test_cursor_non_finite_score(self):
+        """Test that NaN/Infinity scores are rejected"""
+        cursor = base64.urlsafe_b64encode(b'["trending",NaN,{"dt":"2025-01-01T00:00:00"},1]').decode('ascii')
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor, 'trending', TRENDING)
+
+    def test_cursor_int_score_accepted(self):
+        """Test that an integral engagement score still counts as a number"""
+        values = [3, datetime(2025, 1, 1), 7]
+        assert decode_cursor(encode_cursor('trending', values), 'trending', TRENDING) == values
+
+    def test_parse_limit(self):
+        """Test default, clamping and invalid values"""
+        assert parse_limit(None) == 20
+        assert parse_limit('5') == 5
+        assert parse_limit('0') == 1
+        assert parse_limit('999') == 100
+        with pytest.raises(ValueError):
+            parse_limit('abc')
@@ -0,0 +1,127 @@
+"""
+Unit tests for the in-process response cache
+"""
+import threading
+import time
+import pytest
+from utils.response_cache import ResponseCache
+
+
+def _compute(body, cache, key, tags=("posts",)):
+    def compute():
+        entry = cache.set(key, body, 200, 'application/json', tags)
+        return entry, body
+    return compute
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    """Test cases for ResponseCache"""
+
+    def test_miss_then_hit(self):
+        cache = ResponseCache()
+        entry, result, hit = cache.get_or_compute('k', _compute(b'1', cache, 'k'))
+        assert (result, hit) == (b'1', False)
+
+        entry, result, hit = cache.get_or_compute('k', _compute(b'2', cache, 'k'))
+        assert (entry.body, result, hit) == (b'1', None, True)
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        cache.set('a', b'a', 200, 'application/json', ['posts'])
+        cache.set('b', b'b', 200, 'application/json', ['posts'])
+        cache.get('a')  # a jadi paling baru dipakai
+        cache.set('c', b'c', 200, 'application/json', ['posts'])
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.get('c') is not None
+
+    def test_ttl_expiry(self):
+        cache = ResponseCache(ttl=0.01)
+        cache.set('a', b'a', 200, 'application/json', ['posts'])
+        time.sleep(0.02)
+        assert cache.get('a') is None
+
+    def test_invalidate_by_tag(self):
+        cache = ResponseCache()
+        cache.set('posts', b'p', 200, 'application/json', ['posts', 'users'])
+        cache.set('locations', b'l', 200, 'application/json', ['posts'])
+        cache.set('other', b'o', 200, 'application/json', ['reviews'])
+
+        assert cache.invalidate('users') == 1
+        assert cache.get('posts') is None
+        assert cache.get('locations') is not None
+        assert cache.get('other') is not None
+
+    def test_stampede_single_compute(self):
+        """Test that concurrent misses on one key run compute only once"""
+        cache = ResponseCache()
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return cache.set('k', b'x', 200, 'application/json', ['posts']), b'x'
+
+        def worker():
+            barrier.wait()
+            cache.get_or_compute('k', compute)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert cache.stats()['misses'] == 1
+        assert cache.stats()['hits'] == 7
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestResponseCacheAPI:
+    """Test cases for cached post endpoints"""
+
+    def test_second_request_is_hit(self, client, sample_post):
+        assert client.get('/api/posts').headers['X-Cache'] == 'MISS'
+        response = client.get('/api/posts')
+        assert response.headers['X-Cache'] == 'HIT'
+        assert response.get_json()[0]['id'] == sample_post.id
+
+    def test_query_args_are_normalized(self, client, sample_post):
+        client.get('/api/posts?sort=terbaru&limit=5')
+        assert client.get('/api/posts?limit=5&sort=terbaru').headers['X-Cache'] == 'HIT'
+        assert client.get('/api/posts?limit=6&sort=terbaru').headers['X-Cache'] == 'MISS'
+
+    def test_write_invalidates(self, client, sample_post, auth_headers):
+        from utils.response_cache import response_cache
+
+        client.get('/api/posts/by-status')
+        client.get('/api/posts/locations')
+        assert response_cache.stats()['entries'] == 2
+
+        client.post(f'/api/posts/{sample_post.id}/verify', json={'type': 'CONFIRM'},
+                    headers=auth_headers)
+
+        assert response_cache.stats()['entries'] == 0
+        response = client.get('/api/posts/by-status')
+        assert response.headers['X-Cache'] == 'MISS'
+        assert response.get_json()[0]['verification']['valid'] == 1
+
+    def test_errors_are_not_cached(self, client, db_session):
+        from utils.response_cache import response_cache
+
+        assert client.get('/api/posts/by-status?status=xyz').status_code == 400
+        assert response_cache.stats()['entries'] == 0
+
+    def test_cache_stats_admin_only(self, client, admin_headers, auth_headers):
+        assert client.get('/api/admin/cache-stats', headers=auth_headers).status_code == 403
+
+        response = client.get('/api/admin/cache-stats', headers=admin_headers)
+        assert response.status_code == 200
+        assert 'hits' in response.get_json()['response_cache']
@@ -0,0 +1,139 @@
+"""
+Unit tests for the bulk post serializer
+"""
+import pytest
+from sqlalchemy import event
+from models import db, Post, User, UserRole
+from utils.serializers import (post_list_query, serialize_post_rows, parse_fields, POST_FIELDS,
+                               user_list_query, serialize_user_rows)
+
+
+@pytest.mark.unit
+class TestPostSerializer:
+    """Test cases for post_list_query / serialize_post_rows"""
+
+    def test_matches_to_dict(self, app, sample_post):
+        """Test that bulk output is identical to Post.to_dict()"""
+        with app.test_request_context():
+            rows = post_list_query().filter(Post.id == sample_post.id).all()
+            assert serialize_post_rows(rows) == [sample_post.to_dict()]
+
+    def test_defaults_for_empty_fields(self, app, add_post, sample_user):
+        """Test fallback values for empty address/location"""
+        post = add_post(sample_user, image_path='x.jpg')
+
+        with app.test_request_context():
+            data = serialize_post_rows(post_list_query().all())[0]
+            assert data == post.to_dict()
+            assert data['address'] == "Lokasi tidak diketahui"
+            assert data['province'] == ""
+            assert data['status'] == 'MENUNGGU'
+
+
+@pytest.mark.unit
+class TestSparseFieldsets:
+    """Test cases for ?fields= projection in the serializer and the SELECT"""
+
+    def test_parse_fields(self):
+        assert parse_fields(None, POST_FIELDS) is None
+        assert parse_fields(' , ', POST_FIELDS) is None
+        # Urutan mengikuti definisi field, duplikat dibuang
+        assert parse_fields('status,id,lat,id', POST_FIELDS) == ['id', 'lat', 'status']
+        with pytest.raises(ValueError, match='password'):
+            parse_fields('id,password', POST_FIELDS)
+
+    def test_all_fields_match_full_payload(self, app, sample_post):
+        with app.test_request_context():
+            full = serialize_post_rows(post_list_query().all())
+            sparse = serialize_post_rows(post_list_query(list(POST_FIELDS)).all(), list(POST_FIELDS))
+            assert sparse == full
+
+    def test_projection_limits_select(self, app, sample_post):
+        fields = ['id', 'lat', 'long', 'verification']
+        sql = str(post_list_query(fields).statement)
+        assert 'posts.caption' not in sql
+        assert 'posts.address' not in sql
+        assert 'users' not in sql
+        assert 'posts.confirm_count' in sql
+
+        with app.test_request_context():
+            data = serialize_post_rows(post_list_query(fields).all(), fields)
+            assert data == [{
+                'id': sample_post.id, 'lat': float(sample_post.latitude),
+                'long': float(sample_post.longitude),
+                'verification': {'valid': sample_post.confirm_count, 'false': sample_post.false_count}
+            }]
+
+    def test_uploaded_by_joins_users(self, app, sample_post):
+        assert 'users' in str(post_list_query(['uploaded_by']).statement)
+
+    def test_users_match_to_dict(self, sample_user, sample_admin):
+        assert serialize_user_rows(user_list_query().order_by(User.id).all()) == \
+            [sample_user.to_dict(), sample_admin.to_dict()]
+        sql = str(user_list_query(['id', 'username']).statement)
+        assert 'users.bio' not in sql and 'users.phone' not in sql
+
+
+@pytest.mark.api
+@pytest.mark.posts
+class TestPostListQueryCount:
+    """Post list endpoints must not issue one query per post"""
+
+    def _seed(self, db_session, add_posts, n_users=5, posts_per_user=6):
+        for u in range(n_users):
+            user = User(username=f'u{u}', email=f'u{u}@example.com', full_name=f'User {u}',
+                        role=UserRole.USER)
+            user.set_password('password123')
+            db_session.add(user)
+            db_session.flush()
+            add_posts(user, posts_per_user, province='DKI Jakarta')
+
+    def _count_queries(self, client, url):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = client.get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+        assert response.status_code == 200
+        return response, statements
+
+    @pytest.mark.parametrize('url', [
+        '/api/posts',
+        '/api/posts?limit=10',
+        '/api/posts?sort=trending&limit=10',
+        '/api/posts/filter?province=DKI',
+        '/api/posts/by-status?status=menunggu',
+    ])
+    def test_single_query_per_page(self, client, db_session, add_posts, url):
+        """Test that a page of posts costs one version lookup plus one SELECT"""
+        self._seed(db_session, add_posts)
+        db_session.expunge_all()
+
+        response, statements = self._count_queries(client, url)
+
+        assert len(statements) == 2
+        assert len([s for s in statements if 'FROM posts' in s]) == 1
+        data = response.get_json()
+        posts = data['data'] if isinstance(data, dict) else data
+        assert len(posts) > 1
+        assert all(p['uploaded_by'].startswith('User ') for p in posts)
+
+    def test_sparse_fields_keep_single_query(self, client, db_session, add_posts):
+        """Test that ?fields= skips the users JOIN when uploaded_by is not requested"""
+        self._seed(db_session, add_posts)
+        db_session.expunge_all()
+
+        response, statements = self._count_queries(client, '/api/posts?limit=10&fields=id,lat,long,status')
+
+        posts_sql = [s for s in statements if 'FROM posts' in s]
+        assert len(posts_sql) == 1
+        assert 'users' not in posts_sql[0]
+        assert 'caption' not in posts_sql[0]
+        data = response.get_json()['data']
+        assert len(data) == 10
+        assert set(data[0]) == {'id', 'lat', 'long', 'status'}
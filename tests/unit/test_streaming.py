@@ -0,0 +1,38 @@
+"""
+Unit tests for the streaming JSON helper
+"""
+import json
+import pytest
+from utils.streaming import iter_json_array
+
+
+@pytest.mark.unit
+class TestStreaming:
+    """Test cases for iter_json_array"""
+
+    def test_valid_json_with_small_chunks(self, app):
+        """Test that chunk boundaries never break the JSON array"""
+        items = [{'id': i, 'text': 'x' * i} for i in range(50)]
+        with app.app_context():
+            chunks = list(iter_json_array(items, chunk_size=64))
+
+        assert len(chunks) > 1
+        assert json.loads(''.join(chunks)) == items
+
+    def test_empty(self, app):
+        with app.app_context():
+            assert ''.join(iter_json_array([])) == '[]'
+
+    def test_is_lazy(self, app):
+        """Test that items are consumed only as chunks are requested"""
+        consumed = []
+
+        def items():
+            for i in range(10):
+                consumed.append(i)
+                yield {'id': i}
+
+        with app.app_context():
+            gen = iter_json_array(items(), chunk_size=1)
+            next(gen)
+            assert len(consumed) == 1
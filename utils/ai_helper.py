@@ -1,61 +1,129 @@
 """
 AI Helper Functions untuk analisis gambar
+
+Severity dihitung dari seluruh tensor hasil YOLO sekaligus (boxes.conf dan
+boxes.xywh dipindah ke NumPy sekali per gambar), bukan float() per box.
 """
+import numpy as np
+
+# Jika area box > 3.5% dari total gambar -> SERIUS
+SERIOUS_AREA_RATIO = 0.035
+# Jika ada lebih dari 4 lubang kecil-kecil -> SERIUS (Jalan Hancur)
+SERIOUS_COUNT = 4
+
+
+def _to_numpy(value):
+    """Tensor torch (CPU/GPU) atau array-like -> np.ndarray float"""
+    if hasattr(value, 'cpu'):
+        value = value.cpu().numpy()
+    return np.asarray(value, dtype=np.float64)
+
+
+def _box_arrays(boxes):
+    """
+    Ambil (conf (N,), xywh (N, 4)) dari boxes satu gambar.
+
+    Boxes ultralytics punya atribut conf/xywh untuk semua box sekaligus; list
+    box satu-per-satu (format lama / mock) dikonversi per box. Box tanpa xywh
+    tetap dihitung jumlahnya tapi tidak ikut aturan area (xywh = NaN).
+    """
+    if boxes is None:
+        return np.empty(0), np.empty((0, 4))
+
+    if not isinstance(boxes, (list, tuple)) and hasattr(boxes, 'conf') and hasattr(boxes, 'xywh'):
+        conf = _to_numpy(boxes.conf).reshape(-1)
+        xywh = _to_numpy(boxes.xywh).reshape(-1, 4)
+        return conf, xywh
+
+    conf = np.zeros(len(boxes))
+    xywh = np.full((len(boxes), 4), np.nan)
+    for i, box in enumerate(boxes):
+        if len(box.conf) > 0:
+            conf[i] = float(box.conf[0])
+        if box.xywh is not None and len(box.xywh) > 0:
+            xywh[i] = _to_numpy(box.xywh[0]).reshape(-1)[:4]
+    return conf, xywh
+
+
+def _severity_status(count, serious):
+    if count == 0:
+        return "AMAN"
+    # LOGIKA JUMLAH ATAU UKURAN: banyak lubang kecil, atau 1 lubang besar -> SERIUS
+    return "SERIUS" if count > SERIOUS_COUNT or serious else "TIDAK_SERIUS"
+
+
+def analyze_severity_batch(results, img_sizes, confidence_threshold=0.4):
+    """
+    Severity untuk banyak gambar sekaligus (hasil predict(source=[img, ...])).
+
+    Semua box dari semua gambar digabung jadi satu array, lalu jumlah dan
+    flag area besar per gambar dihitung dengan mask + bincount.
+
+    Args:
+        results: List hasil YOLO, satu per gambar
+        img_sizes: (w, h) yang sama untuk semua gambar, atau list (w, h) per gambar
+        confidence_threshold: Threshold confidence minimum (default 0.4)
+
+    Returns:
+        list: [(severity_status, pothole_count), ...] sesuai urutan results
+    """
+    n = len(results)
+    if n == 0:
+        return []
+    if len(img_sizes) == 2 and np.isscalar(img_sizes[0]):
+        img_sizes = [img_sizes] * n
+
+    per_image = [_box_arrays(r.boxes) for r in results]
+    conf = np.concatenate([c for c, _ in per_image])
+    wh = np.concatenate([xywh for _, xywh in per_image])[:, 2:4]
+    image_idx = np.repeat(np.arange(n), [len(c) for c, _ in per_image])
+    img_area = np.array([w * h for w, h in img_sizes], dtype=np.float64)
+
+    detected = conf > confidence_threshold
+    large = (wh[:, 0] * wh[:, 1]) / img_area[image_idx] > SERIOUS_AREA_RATIO
+    counts = np.bincount(image_idx[detected], minlength=n)
+    serious = np.bincount(image_idx[detected & large], minlength=n) > 0
+
+    return [(_severity_status(int(c), bool(s)), int(c)) for c, s in zip(counts, serious)]
 
 
 def analyze_severity(results, img_w, img_h, confidence_threshold=0.4):
     """
     Menganalisis hasil deteksi YOLO lokal untuk menentukan severity.
-    
+
     Args:
         results: Hasil dari YOLO model.predict()
         img_w: Lebar gambar
         img_h: Tinggi gambar
         confidence_threshold: Threshold confidence minimum (default 0.4)
-    
+
     Returns:
         tuple: (severity_status, pothole_count)
     """
-    # Ambil boxes dari hasil YOLO
-    boxes = results[0].boxes if len(results) > 0 else []
-    
-    # Filter berdasarkan confidence
-    filtered_boxes = []
-    for box in boxes:
-        conf = float(box.conf[0]) if len(box.conf) > 0 else 0
-        if conf > confidence_threshold:
-            filtered_boxes.append(box)
-    
-    count = len(filtered_boxes)
+    if len(results) == 0:
+        return "AMAN", 0
 
+    conf, xywh = _box_arrays(results[0].boxes)
+    detected = conf > confidence_threshold
+    count = int(np.count_nonzero(detected))
     if count == 0:
         return "AMAN", 0
 
-    serious = False
-    img_area = img_w * img_h
+    # LOGIKA UKURAN (AREA): rasio area box terhadap gambar, hanya box yang lolos confidence
+    ratio = xywh[detected, 2] * xywh[detected, 3] / (img_w * img_h)
+    return _severity_status(count, bool((ratio > SERIOUS_AREA_RATIO).any())), count
 
-    for box in filtered_boxes:
-        # YOLO format: xywh atau xyxy
-        # box.xywh memberikan [x_center, y_center, width, height]
-        if box.xywh is not None and len(box.xywh) > 0:
-            xywh = box.xywh[0]  # Ambil tensor pertama
-            box_width = float(xywh[2])
-            box_height = float(xywh[3])
-            box_area = box_width * box_height
-            ratio = box_area / img_area
-            
-            # LOGIKA UKURAN (AREA)
-            # Jika area box > 3.5% dari total gambar -> SERIUS
-            if ratio > 0.035:
-                serious = True
-                break
-
-    # LOGIKA JUMLAH
-    # Jika ada lebih dari 4 lubang kecil-kecil -> SERIUS (Jalan Hancur)
-    # ATAU jika ada 1 lubang besar (serious=True) -> SERIUS
-    if count > 4 or serious:
-        status = "SERIUS"
-    else:
-        status = "TIDAK_SERIUS"
-
-    return status, count
+
+def detected_boxes(results, confidence_threshold=0.4):
+    """
+    Box yang lolos confidence sebagai list biasa (bisa di-JSON-kan).
+
+    Returns:
+        list: [[x, y, w, h, conf], ...] (xywh = center x, center y, lebar, tinggi)
+    """
+    if len(results) == 0:
+        return []
+    conf, xywh = _box_arrays(results[0].boxes)
+    detected = conf > confidence_threshold
+    rows = np.column_stack([xywh[detected], conf[detected]])
+    return [[None if np.isnan(v) else round(float(v), 4) for v in row] for row in rows]
@@ -0,0 +1,150 @@
+"""
+Server-side Marker Clustering untuk peta
+
+Post dikelompokkan per sel geohash (grid bucketing) dengan presisi yang
+mengikuti zoom level. Agregat dihitung di database (GROUP BY prefix geohash)
+dan di-cache per (versi posts, zoom, tile), di mana tile adalah prefix geohash
+yang lebih kasar dari sel cluster.
+
+- Post difilter ke bounding box viewport sebelum dikelompokkan, jadi cluster
+  di tepi viewport hanya menghitung post yang memang terlihat. Tile yang
+  terpotong viewport di-cache dengan key tambahan berupa bagian tile yang
+  terlihat; tile yang seluruhnya di dalam viewport dipakai bersama antar viewport.
+- Key memakai versi resource 'posts' (sama seperti ETag), sehingga perubahan
+  post dari worker mana pun langsung memakai key baru. Entry versi lama
+  tersingkir oleh LRU/TTL.
+"""
+from sqlalchemy import func, case, or_, and_
+from models import db, Post
+from utils.geo import (GEOHASH_PRECISION, cell_size, covering_precision, covering_prefixes,
+                       geohash_bounds)
+from utils.http_cache import get_versions
+from utils.response_cache import ResponseCache
+
+MIN_ZOOM = 0
+MAX_ZOOM = 20
+
+# Cluster kira-kira 1/8 lebar tile peta (~32px pada tile 256px)
+CLUSTERS_PER_TILE_WIDTH_LOG2 = 3
+
+# Tile cache per worker; key berisi versi posts, TTL hanya membatasi umur entry
+cluster_cache = ResponseCache(max_entries=4096, ttl=600)
+
+
+def zoom_to_precision(zoom):
+    """Presisi geohash sel cluster untuk zoom level peta (Web Mercator)"""
+    target_width = 360.0 / (1 << (zoom + CLUSTERS_PER_TILE_WIDTH_LOG2))
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        if cell_size(precision)[1] <= target_width:
+            return precision
+    return GEOHASH_PRECISION
+
+
+def _visible_part(tile, min_lat, max_lat, min_lng, max_lng):
+    """
+    Bagian tile yang masuk viewport, atau None jika seluruh tile terlihat.
+
+    Returns:
+        tuple atau None: (min_lat, max_lat, min_lng, max_lng)
+    """
+    t_min_lat, t_max_lat, t_min_lng, t_max_lng = geohash_bounds(tile)
+    if min_lat <= t_min_lat and t_max_lat <= max_lat and min_lng <= t_min_lng and t_max_lng <= max_lng:
+        return None
+    return (max(min_lat, t_min_lat), min(max_lat, t_max_lat),
+            max(min_lng, t_min_lng), min(max_lng, t_max_lng))
+
+
+def _tile_filter(tile, part):
+    condition = Post.geohash.like(f'{tile}%')
+    if part is None:
+        return condition
+    p_min_lat, p_max_lat, p_min_lng, p_max_lng = part
+    return and_(condition,
+                Post.latitude.between(p_min_lat, p_max_lat),
+                Post.longitude.between(p_min_lng, p_max_lng))
+
+
+def _aggregate_tiles(tiles, precision):
+    """
+    Hitung cluster untuk beberapa tile sekaligus dalam satu query GROUP BY.
+
+    Args:
+        tiles: dict tile -> bagian yang terlihat (None = seluruh tile)
+        precision: Presisi geohash sel cluster
+
+    Returns:
+        dict: tile -> list cluster
+    """
+    cell = func.substr(Post.geohash, 1, precision).label('cell')
+    rows = db.session.query(
+        cell,
+        func.count(Post.id).label('count'),
+        func.avg(Post.latitude).label('lat'),
+        func.avg(Post.longitude).label('lng'),
+        func.max(case((Post.severity == 'SERIUS', 1), else_=0)).label('serious'),
+        func.sum(case((Post.status == 'MENUNGGU', 1), else_=0)).label('menunggu'),
+        func.sum(case((Post.status == 'DIPROSES', 1), else_=0)).label('diproses'),
+        func.sum(case((Post.status == 'SELESAI', 1), else_=0)).label('selesai'),
+        func.min(Post.id).label('post_id'),
+    ).filter(
+        or_(*[_tile_filter(tile, part) for tile, part in tiles.items()])
+    ).group_by(cell).all()
+
+    tile_len = len(next(iter(tiles)))
+    result = {tile: [] for tile in tiles}
+    for r in rows:
+        result[r.cell[:tile_len]].append({
+            'geohash': r.cell,
+            'lat': float(r.lat),
+            'lng': float(r.lng),
+            'count': r.count,
+            'severity': 'SERIUS' if r.serious else 'TIDAK_SERIUS',
+            'status': {
+                'menunggu': int(r.menunggu or 0),
+                'diproses': int(r.diproses or 0),
+                'selesai': int(r.selesai or 0)
+            },
+            # Cluster berisi satu post bisa langsung dirender sebagai marker biasa
+            'post_id': r.post_id if r.count == 1 else None
+        })
+    return result
+
+
+def get_clusters(min_lat, max_lat, min_lng, max_lng, zoom, version=None):
+    """
+    Cluster marker untuk sebuah viewport.
+
+    Args:
+        version: Versi resource 'posts' (g.resource_versions dari etag_versioned);
+            dibaca dari database jika None
+
+    Returns:
+        dict: {'zoom', 'precision', 'clusters': [...]}
+    """
+    if version is None:
+        version, = get_versions(['posts'])
+
+    precision = zoom_to_precision(zoom)
+    tile_precision = max(1, min(precision - 2,
+                                covering_precision(min_lat, max_lat, min_lng, max_lng, max_cells=16)))
+    tiles = covering_prefixes(min_lat, max_lat, min_lng, max_lng, precision=tile_precision)
+
+    parts = {tile: _visible_part(tile, min_lat, max_lat, min_lng, max_lng) for tile in tiles}
+
+    clusters_by_tile = {}
+    missing = {}
+    for tile, part in parts.items():
+        entry = cluster_cache.get((version, zoom, tile, part))
+        if entry is None:
+            missing[tile] = part
+        else:
+            clusters_by_tile[tile] = entry.body
+
+    if missing:
+        cluster_cache.record_miss(len(missing))
+        for tile, clusters in _aggregate_tiles(missing, precision).items():
+            cluster_cache.set((version, zoom, tile, missing[tile]), clusters)
+            clusters_by_tile[tile] = clusters
+
+    clusters = [c for tile in tiles for c in clusters_by_tile[tile]]
+    return {'zoom': zoom, 'precision': precision, 'clusters': clusters}
@@ -0,0 +1,96 @@
+"""
+Response Compression - gzip / brotli lewat Accept-Encoding
+
+init_compression(app) memasang after_request hook yang mengompres response
+JSON/MessagePack/teks di atas batas ukuran minimum. Response dari
+@cached_response sudah dikompres duluan memakai varian yang disimpan di
+entry cache (lihat utils/response_cache.py), jadi payload feed yang sering
+diminta cukup dikompres sekali per encoding.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:  # brotli opsional, tanpa library ini hanya gzip
+    brotli = None
+
+from flask import request, current_app
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/msgpack', 'application/javascript'}
+
+DEFAULT_MIN_SIZE = 1024  # byte, payload lebih kecil tidak sebanding overhead-nya
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Kualitas menengah: rasio mendekati gzip -9, encode jauh lebih cepat dari q11
+
+
+def supported_encodings():
+    """Encoding yang bisa dipakai server, urut dari yang paling disukai"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(body, encoding):
+    """Kompres bytes dengan encoding 'br' atau 'gzip'"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compression_enabled():
+    return 'compression' in current_app.extensions
+
+
+def choose_encoding():
+    """
+    Encoding terbaik dari header Accept-Encoding request saat ini.
+
+    Returns:
+        str: 'br', 'gzip', atau None jika client tidak menerima keduanya
+    """
+    accepted = request.accept_encodings
+    candidates = [e for e in supported_encodings() if accepted.quality(e) > 0]
+    if not candidates:
+        return None
+    # Kualitas tertinggi menang, seri -> urutan preferensi server (br dulu)
+    return max(candidates, key=lambda e: accepted.quality(e))
+
+
+def should_compress(response, size=None):
+    """Response ini layak dikompres? (tipe konten, status, ukuran, belum dikompres)"""
+    if request.method == 'HEAD' or response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if response.direct_passthrough or response.is_streamed or 'Content-Encoding' in response.headers:
+        return False
+    mimetype = response.mimetype or ''
+    if mimetype not in COMPRESSIBLE_MIMETYPES and not mimetype.startswith('text/'):
+        return False
+    if size is None:
+        size = response.calculate_content_length() or 0
+    return size >= current_app.config.get('COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+
+
+def set_encoded_body(response, body, encoding):
+    """Pasang body yang sudah dikompres beserta header-nya"""
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+
+
+def _compress_response(response):
+    if not should_compress(response):
+        # Vary tetap dikirim supaya proxy tidak menyajikan versi terkompres ke client lain
+        if response.mimetype in COMPRESSIBLE_MIMETYPES:
+            response.vary.add('Accept-Encoding')
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding()
+    if encoding is not None:
+        set_encoded_body(response, compress(response.get_data(), encoding), encoding)
+    return response
+
+
+def init_compression(app):
+    """Aktifkan kompresi response untuk app"""
+    app.config.setdefault('COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+    app.extensions['compression'] = True
+    app.after_request(_compress_response)
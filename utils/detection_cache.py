@@ -0,0 +1,144 @@
+"""
+Detection Cache - Cache hasil deteksi YOLO per isi gambar
+
+Client mobile mengulang /api/upload saat koneksi putus, dan moderator kadang
+mengunggah ulang foto yang sama. Tanpa cache, setiap ulangan menjalankan
+inferensi lagi untuk byte yang identik.
+
+- Key: versi model + sha256 byte gambar hasil normalisasi (sama dengan nama
+  file di image_store)
+- Versi model: dihitung sekali oleh load_detector() dari file yang benar-benar
+  dimuat (detector.model_version). Mengganti file model tanpa restart tidak
+  mengubah versi, karena model lama di memori juga masih dipakai; setelah
+  restart, versi baru otomatis memakai key baru.
+- Tier 1: LRU in-memory per proses (DETECTION_CACHE_MAX_ENTRIES)
+- Tier 2 (opsional): file JSON di DETECTION_CACHE_DIR/<versi>/ab/<sha256>.json,
+  dipakai bersama antar worker dan tetap ada setelah restart. Folder versi lama
+  tidak dihapus otomatis (worker lain mungkin masih memakai model itu).
+"""
+import json
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from utils.images import write_atomic
+
+# boxes: [[x, y, w, h, conf], ...] dari ai_helper.detected_boxes
+DetectionResult = namedtuple('DetectionResult', ['severity', 'count', 'boxes'])
+
+
+class DetectionCache:
+    """LRU in-memory + tier disk opsional, thread-safe, key per versi model"""
+
+    def __init__(self, max_entries=1024, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def configure(self, max_entries=None, cache_dir=None):
+        """Ubah batas ukuran / folder disk (dipanggil dari app.py sesuai Config)"""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if cache_dir is not None:
+                self.cache_dir = cache_dir
+            self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, version, digest):
+        return os.path.join(self.cache_dir, version, digest[:2], f"{digest}.json")
+
+    def _read_disk(self, version, digest):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(version, digest), 'rb') as f:
+                data = json.loads(f.read())
+            return DetectionResult(data['severity'], data['count'], data['boxes'])
+        except (OSError, ValueError, KeyError, TypeError):
+            # Tidak ada / rusak: diperlakukan sebagai miss
+            return None
+
+    def get(self, version, digest):
+        """Hasil deteksi model `version` untuk sha256 gambar ini, atau None (miss)"""
+        key = (version, digest)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+
+        result = self._read_disk(version, digest)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._entries[key] = result
+            self._evict()
+        return result
+
+    def put(self, version, digest, result):
+        """Simpan hasil deteksi ke memori (+ disk jika DETECTION_CACHE_DIR diisi)"""
+        result = DetectionResult(*result)
+        with self._lock:
+            self._entries[(version, digest)] = result
+            self._entries.move_to_end((version, digest))
+            self._evict()
+
+        if self.cache_dir:
+            try:
+                write_atomic(self._disk_path(version, digest), json.dumps(result._asdict()).encode())
+            except OSError:
+                pass  # Tier disk bersifat best-effort
+
+    def get_or_detect(self, version, digest, detect):
+        """
+        Ambil hasil dari cache, atau jalankan `detect()` lalu simpan hasilnya.
+
+        Args:
+            version: model_version detector yang dipakai `detect()`; None = tanpa cache
+            digest: sha256 hex byte gambar hasil normalisasi
+            detect: Fungsi tanpa argumen -> (severity, count, boxes)
+
+        Returns:
+            DetectionResult
+        """
+        if not version:
+            return DetectionResult(*detect())
+
+        result = self.get(version, digest)
+        if result is None:
+            result = DetectionResult(*detect())
+            self.put(version, digest, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'disk': bool(self.cache_dir),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.disk_hits) / total, 4) if total else 0.0
+            }
+
+
+detection_cache = DetectionCache()
@@ -0,0 +1,160 @@
+"""
+Detection Job Queue - Worker pool untuk deteksi lubang di luar request HTTP
+
+Upload mode async hanya menyimpan gambar + baris DetectionJob lalu membalas
+202. Inferensi YOLO dijalankan ThreadPoolExecutor terpisah dengan jumlah
+worker terbatas, jadi lonjakan upload tidak menghabiskan worker web.
+
+Job tersimpan di database dan diklaim dengan UPDATE bersyarat (QUEUED ->
+PROCESSING), jadi walau job yang sama dijadwalkan di beberapa proses (worker
+gunicorn, requeue saat start, poll status) hanya satu yang menjalankannya.
+Job PROCESSING yang tidak selesai lebih dari DETECTION_JOB_TIMEOUT detik
+(proses mati di tengah jalan) boleh diklaim ulang; requeue_pending_jobs()
+dipanggil saat app start.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from sqlalchemy import and_, or_
+from models import db, DetectionJob, utc_now
+
+DEFAULT_JOB_TIMEOUT = 300  # detik
+
+
+def _claimable(stale_after):
+    """Kondisi job yang boleh diklaim: QUEUED, atau PROCESSING yang sudah basi"""
+    cutoff = utc_now() - timedelta(seconds=stale_after)
+    return or_(
+        DetectionJob.status == 'QUEUED',
+        and_(DetectionJob.status == 'PROCESSING', DetectionJob.updated_at < cutoff)
+    )
+
+
+def claim_job(job_id, stale_after=DEFAULT_JOB_TIMEOUT):
+    """
+    Klaim job secara atomik (UPDATE ... WHERE status='QUEUED' ...).
+
+    Returns:
+        bool: True jika proses ini yang mendapat job
+    """
+    claimed = db.session.query(DetectionJob).filter(
+        DetectionJob.id == job_id, _claimable(stale_after)
+    ).update({'status': 'PROCESSING', 'updated_at': utc_now()}, synchronize_session=False)
+    db.session.commit()
+    return claimed == 1
+
+
+class DetectionJobQueue:
+    """ThreadPoolExecutor + pencatatan status job di tabel detection_jobs"""
+
+    def __init__(self, max_workers=2, job_timeout=DEFAULT_JOB_TIMEOUT):
+        self.max_workers = max_workers
+        self.job_timeout = job_timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = set()
+
+    def configure(self, max_workers=None, job_timeout=None):
+        """Ubah jumlah worker / timeout job (dipanggil dari app.py sebelum job pertama)"""
+        with self._lock:
+            if max_workers is not None:
+                self.max_workers = max_workers
+            if job_timeout is not None:
+                self.job_timeout = job_timeout
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='detection')
+            return self._executor
+
+    def submit(self, app, job_id, handler):
+        """
+        Jadwalkan job.
+
+        Args:
+            app: Flask app (worker butuh app context sendiri)
+            job_id: ID DetectionJob yang sudah di-commit
+            handler: Fungsi handler(job) yang menjalankan deteksi dan mengisi
+                status akhir job (DONE/REJECTED). Exception -> FAILED.
+        """
+        future = self._get_executor().submit(self._run, app, job_id, handler)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def _run(self, app, job_id, handler):
+        with app.app_context():
+            try:
+                # Job sudah diklaim proses/thread lain, sudah selesai, atau tidak ada
+                if not claim_job(job_id, self.job_timeout):
+                    return
+                job = db.session.get(DetectionJob, job_id)
+
+                try:
+                    handler(job)
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"❌ Detection job {job_id} failed: {e}")
+                    job = db.session.get(DetectionJob, job_id)
+                    job.status = 'FAILED'
+                    job.error = str(e)[:255]
+                    db.session.commit()
+            finally:
+                db.session.remove()
+
+    def resubmit_if_stale(self, app, job_id, handler):
+        """
+        Jadwalkan ulang job yang tertahan lebih dari job_timeout (mis. proses yang
+        memegangnya mati). Dipanggil saat client poll status job.
+
+        Returns:
+            bool: True jika job dijadwalkan ulang
+        """
+        cutoff = utc_now() - timedelta(seconds=self.job_timeout)
+        stale = db.session.query(DetectionJob.id).filter(
+            DetectionJob.id == job_id,
+            DetectionJob.status.in_(('QUEUED', 'PROCESSING')),
+            DetectionJob.updated_at < cutoff
+        ).first()
+        if stale is None:
+            return False
+        self.submit(app, job_id, handler)
+        return True
+
+    def join(self, timeout=None):
+        """Tunggu semua job yang sedang antre/jalan selesai (shutdown & test)"""
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.result(timeout=timeout)
+
+    def stats(self):
+        with self._lock:
+            return {'max_workers': self.max_workers, 'pending': len(self._pending)}
+
+
+detection_queue = DetectionJobQueue()
+
+
+def requeue_pending_jobs(app, handler):
+    """
+    Jadwalkan ulang job QUEUED dan PROCESSING basi yang tertinggal (mis. server restart).
+    Aman dipanggil oleh setiap worker: klaim atomik mencegah job jalan dua kali.
+
+    Returns:
+        int: Jumlah job yang dijadwalkan ulang
+    """
+    with app.app_context():
+        job_ids = [job_id for (job_id,) in db.session.query(DetectionJob.id).filter(
+            _claimable(detection_queue.job_timeout)
+        ).all()]
+    for job_id in job_ids:
+        detection_queue.submit(app, job_id, handler)
+    return len(job_ids)
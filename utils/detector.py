@@ -0,0 +1,229 @@
+"""
+Detector - Abstraksi backend inferensi model deteksi lubang
+
+Backend dipilih lewat config DETECTOR_BACKEND:
+- 'torch': ultralytics YOLO (best.pt), inferensi PyTorch eager
+- 'onnx':  model hasil export (best.onnx) dijalankan onnxruntime tanpa
+           torch/ultralytics. Execution provider diatur DETECTOR_PROVIDERS,
+           mis. ['OpenVINOExecutionProvider'] dari paket onnxruntime-openvino.
+
+Semua backend punya interface yang sama dengan ultralytics:
+predict(source=img | [img, ...], conf=..., verbose=...) -> list hasil dengan
+.boxes.conf (N,) dan .boxes.xywh (N, 4) dalam piksel gambar asli. Jadi
+routes/posts.py, InferenceBatcher dan analyze_severity tidak perlu berubah.
+
+Preprocessing OnnxDetector mengikuti predict() ultralytics untuk best.pt:
+jika semua gambar dalam satu panggilan berukuran sama, letterbox memakai
+padding minimal kelipatan stride (LetterBox auto=True); jika tidak, padding
+ke persegi imgsz x imgsz. Padding minimal butuh export dengan ukuran input
+dinamis (export_onnx.py); model dengan input statis selalu memakai persegi.
+
+Export best.pt -> best.onnx: python export_onnx.py
+"""
+import hashlib
+import cv2
+import numpy as np
+
+try:
+    import onnxruntime
+except ImportError:  # onnxruntime opsional (hanya untuk backend 'onnx')
+    onnxruntime = None
+
+DETECTOR_BACKENDS = ('torch', 'onnx')
+
+# Default ultralytics untuk predict()
+DEFAULT_IMGSZ = 640
+DEFAULT_CONF = 0.25
+DEFAULT_IOU = 0.7
+MAX_DET = 300
+LETTERBOX_COLOR = (114, 114, 114)
+DEFAULT_STRIDE = 32  # Stride maksimum YOLOv8, dipakai jika metadata model tidak ada
+
+
+class Boxes:
+    """Box hasil deteksi satu gambar (format ultralytics: xywh = center x, center y, w, h)"""
+
+    def __init__(self, xywh, conf, cls):
+        self.xywh = xywh
+        self.conf = conf
+        self.cls = cls
+
+    def __len__(self):
+        return len(self.conf)
+
+
+class Detections:
+    """Hasil deteksi satu gambar, pengganti ultralytics Results untuk backend non-torch"""
+
+    def __init__(self, boxes, orig_shape):
+        self.boxes = boxes
+        self.orig_shape = orig_shape
+
+
+def letterbox(img, size=DEFAULT_IMGSZ, auto=False, stride=DEFAULT_STRIDE):
+    """
+    Resize dengan rasio tetap lalu padding (sama dengan ultralytics LetterBox).
+
+    Args:
+        auto: True = padding minimal sampai kelipatan `stride`,
+            False = padding ke size x size
+
+    Returns:
+        tuple: (gambar hasil letterbox, scale, (pad_x, pad_y))
+    """
+    h, w = img.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = round(w * scale), round(h * scale)
+    if (new_w, new_h) != (w, h):
+        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = size - new_w, size - new_h
+    if auto:
+        pad_x, pad_y = pad_x % stride, pad_y % stride
+    pad_x, pad_y = pad_x / 2, pad_y / 2
+    top, bottom = round(pad_y - 0.1), round(pad_y + 0.1)
+    left, right = round(pad_x - 0.1), round(pad_x + 0.1)
+    img = cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR)
+    return img, scale, (left, top)
+
+
+def decode_yolo_output(pred, conf, iou=DEFAULT_IOU, max_det=MAX_DET):
+    """
+    Decode output YOLOv8 satu gambar (4 + num_classes, anchors) + NMS.
+
+    Returns:
+        tuple: (xywh (N, 4), conf (N,), cls (N,)) di koordinat input model
+    """
+    pred = pred.T
+    class_scores = pred[:, 4:]
+    cls = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(cls)), cls]
+    keep = scores > conf
+    xywh, scores, cls = pred[keep, :4], scores[keep], cls[keep]
+    if len(scores) == 0:
+        return np.empty((0, 4), np.float32), np.empty(0, np.float32), np.empty(0, np.float32)
+
+    # NMS per kelas (offset koordinat per kelas seperti ultralytics)
+    top_left = xywh[:, :2] - xywh[:, 2:] / 2 + cls[:, None] * 7680
+    rects = np.column_stack([top_left, xywh[:, 2:]]).tolist()
+    keep = np.asarray(cv2.dnn.NMSBoxes(rects, scores.tolist(), conf, iou, top_k=max_det), dtype=np.int64).reshape(-1)
+    keep = keep[:max_det]
+    return xywh[keep], scores[keep], cls[keep].astype(np.float32)
+
+
+def scale_boxes(xywh, scale, pad, orig_shape):
+    """xywh koordinat input model -> koordinat gambar asli, di-clip ke batas gambar (seperti ultralytics)"""
+    h, w = orig_shape
+    x1 = np.clip((xywh[:, 0] - xywh[:, 2] / 2 - pad[0]) / scale, 0, w)
+    y1 = np.clip((xywh[:, 1] - xywh[:, 3] / 2 - pad[1]) / scale, 0, h)
+    x2 = np.clip((xywh[:, 0] + xywh[:, 2] / 2 - pad[0]) / scale, 0, w)
+    y2 = np.clip((xywh[:, 1] + xywh[:, 3] / 2 - pad[1]) / scale, 0, h)
+    return np.column_stack([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1]).astype(np.float32)
+
+
+class TorchDetector:
+    """Backend PyTorch lewat ultralytics YOLO"""
+
+    backend = 'torch'
+
+    def __init__(self, model_path, imgsz=DEFAULT_IMGSZ):
+        from ultralytics import YOLO
+        self.model = YOLO(model_path)
+        self.imgsz = imgsz
+
+    def predict(self, source, conf=DEFAULT_CONF, verbose=False, **kwargs):
+        kwargs.setdefault('imgsz', self.imgsz)
+        return self.model.predict(source=source, conf=conf, verbose=verbose, **kwargs)
+
+
+class OnnxDetector:
+    """Backend onnxruntime untuk model YOLOv8 hasil export ONNX"""
+
+    backend = 'onnx'
+
+    def __init__(self, model_path, imgsz=DEFAULT_IMGSZ, providers=None, threads=None):
+        if onnxruntime is None:
+            raise RuntimeError("Backend 'onnx' membutuhkan paket onnxruntime")
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        available = onnxruntime.get_available_providers()
+        providers = [p for p in (providers or ['CPUExecutionProvider']) if p in available] or ['CPUExecutionProvider']
+        self.session = onnxruntime.InferenceSession(model_path, sess_options=options, providers=providers)
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Dimensi statis dari export menentukan ukuran input dan boleh tidaknya batch > 1
+        shape = model_input.shape
+        self.imgsz = shape[2] if isinstance(shape[2], int) else imgsz
+        self.fixed_batch = shape[0] if isinstance(shape[0], int) else None
+        self.dynamic_shape = not isinstance(shape[2], int)
+        # export ultralytics menyimpan stride di metadata model
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.stride = int(metadata.get('stride', DEFAULT_STRIDE))
+
+    def _preprocess(self, images):
+        # Sama dengan ultralytics untuk .pt: padding minimal hanya jika ukuran semua gambar sama
+        auto = self.dynamic_shape and len({img.shape for img in images}) == 1
+        blobs, transforms = [], []
+        for img in images:
+            boxed, scale, pad = letterbox(img, self.imgsz, auto, self.stride)
+            blobs.append(boxed[:, :, ::-1].transpose(2, 0, 1))  # BGR HWC -> RGB CHW
+            transforms.append((scale, pad))
+        batch = np.ascontiguousarray(np.stack(blobs), dtype=np.float32) / 255.0
+        return batch, transforms
+
+    def _run(self, images):
+        batch, transforms = self._preprocess(images)
+        output = self.session.run(None, {self.input_name: batch})[0]
+        return output, transforms
+
+    def predict(self, source, conf=DEFAULT_CONF, verbose=False, iou=DEFAULT_IOU, max_det=MAX_DET, **kwargs):
+        images = source if isinstance(source, (list, tuple)) else [source]
+        if self.fixed_batch is None or self.fixed_batch == len(images):
+            outputs = [self._run(images)]
+        else:
+            outputs = [self._run([img]) for img in images]
+
+        results = []
+        preds = [(pred, transform) for output, transforms in outputs for pred, transform in zip(output, transforms)]
+        for img, (pred, (scale, (pad_x, pad_y))) in zip(images, preds):
+            xywh, scores, cls = decode_yolo_output(pred, conf, iou, max_det)
+            xywh = scale_boxes(xywh, scale, (pad_x, pad_y), img.shape[:2])
+            results.append(Detections(Boxes(xywh, scores, cls), img.shape[:2]))
+        return results
+
+
+def model_version(path):
+    """16 karakter pertama sha256 isi file model"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def load_detector(backend, model_path, imgsz=DEFAULT_IMGSZ, providers=None, threads=None, warmup=True):
+    """
+    Buat detector sesuai backend lalu (opsional) warm-up sekali.
+
+    detector.model_version (sha256 file saat dimuat) menjadi key cache hasil
+    deteksi, jadi hasil selalu terikat ke model yang benar-benar berjalan.
+
+    Warm-up menjalankan satu predict() pada gambar kosong supaya alokasi
+    memori/graph optimization tidak dibayar oleh upload pertama.
+
+    Raises:
+        ValueError: Jika backend tidak dikenal
+    """
+    if backend == 'torch':
+        detector = TorchDetector(model_path, imgsz)
+    elif backend == 'onnx':
+        detector = OnnxDetector(model_path, imgsz, providers, threads)
+    else:
+        raise ValueError(f"DETECTOR_BACKEND harus salah satu dari {', '.join(DETECTOR_BACKENDS)}")
+    detector.model_version = f"{backend}-{model_version(model_path)}"
+
+    if warmup:
+        detector.predict(source=np.zeros((detector.imgsz, detector.imgsz, 3), dtype=np.uint8), verbose=False)
+    return detector
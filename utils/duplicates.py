@@ -0,0 +1,78 @@
+"""
+Near-Duplicate Detection - Perceptual hash (dHash) untuk laporan yang dikirim ulang
+
+Warga sering mengirim ulang foto lubang yang sama (sedikit di-crop atau
+dikompres ulang). Hash SHA konten (image_store) hanya menangkap byte yang
+identik, jadi setiap upload juga dihitung dHash 64-bit-nya:
+gambar grayscale diperkecil ke 9x8, lalu tiap bit = apakah piksel lebih
+terang dari tetangga kirinya. Crop kecil/kompresi hanya mengubah sedikit bit,
+sehingga kemiripan cukup dihitung dengan jarak Hamming.
+
+Pencarian duplikat: kandidat diambil lewat prefix geohash (index
+ix_posts_geohash) di sekitar koordinat upload, lalu disaring dengan jarak
+(meter) dan jarak Hamming di Python.
+"""
+import cv2
+import numpy as np
+from sqlalchemy import or_
+from models import db, Post
+from utils.geo import covering_prefixes, radius_bounds, distance_m
+
+HASH_SIZE = 8
+
+# Gambar polos (hitam/putih penuh) menghasilkan hash 0 dan akan cocok satu sama lain
+_EMPTY_HASH = '0' * (HASH_SIZE * HASH_SIZE // 4)
+
+
+def dhash(img):
+    """
+    Hitung dHash 64-bit dari gambar BGR.
+
+    Returns:
+        str: 16 karakter hex, atau None jika gambar tidak punya detail (hash 0)
+    """
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    value = np.packbits(bits).tobytes().hex()
+    return None if value == _EMPTY_HASH else value
+
+
+def hamming_distance(a, b):
+    """Jumlah bit berbeda antara dua hash hex"""
+    return (int(a, 16) ^ int(b, 16)).bit_count()
+
+
+def find_near_duplicate(phash, lat, lng, max_distance=8, radius_m=30):
+    """
+    Cari post dengan foto mirip (Hamming <= max_distance) dalam radius_m meter.
+    Post berstatus SELESAI diabaikan (lubang baru di lokasi yang sudah diperbaiki).
+
+    Returns:
+        Post: Post paling mirip (lalu paling dekat), atau None
+    """
+    if phash is None:
+        return None
+
+    min_lat, max_lat, min_lng, max_lng = radius_bounds(lat, lng, radius_m)
+    prefixes = covering_prefixes(min_lat, max_lat, min_lng, max_lng, max_cells=9)
+    candidates = db.session.query(Post.id, Post.phash, Post.latitude, Post.longitude).filter(
+        or_(*[Post.geohash.like(f'{prefix}%') for prefix in prefixes]),
+        Post.latitude.between(min_lat, max_lat),
+        Post.longitude.between(min_lng, max_lng),
+        Post.phash.isnot(None),
+        Post.status != 'SELESAI'
+    ).all()
+
+    best = None
+    for row in candidates:
+        bits = hamming_distance(phash, row.phash)
+        if bits > max_distance:
+            continue
+        meters = distance_m(lat, lng, row.latitude, row.longitude)
+        if meters > radius_m:
+            continue
+        if best is None or (bits, meters) < best[:2]:
+            best = (bits, meters, row.id)
+
+    return db.session.get(Post, best[2]) if best else None
@@ -0,0 +1,179 @@
+"""
+Geo Helper - Geohash untuk query area peta
+
+Geohash mengubah (lat, lng) menjadi string base32 yang prefix-nya adalah sel
+grid yang lebih besar. Post yang berada di sel yang sama punya prefix yang
+sama, sehingga query viewport cukup berupa beberapa range scan
+`geohash LIKE 'abc%'` pada index kolom geohash.
+"""
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Presisi yang disimpan di kolom posts.geohash (~3.7 cm)
+GEOHASH_PRECISION = 12
+
+EARTH_RADIUS_M = 6371000
+
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    """
+    Encode koordinat menjadi geohash.
+
+    Args:
+        lat: Latitude (-90..90)
+        lng: Longitude (-180..180)
+        precision: Jumlah karakter geohash
+
+    Returns:
+        str: Geohash
+    """
+    lat, lng = float(lat), float(lng)
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bit = 0
+    ch = 0
+    even = True  # Bit genap = longitude
+
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            ch = (ch << 1) | 1
+            rng[0] = mid
+        else:
+            ch <<= 1
+            rng[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(BASE32[ch])
+            bit = 0
+            ch = 0
+
+    return ''.join(chars)
+
+
+def geohash_bounds(geohash):
+    """
+    Bounding box sel sebuah geohash (kebalikan encode_geohash).
+
+    Returns:
+        tuple: (min_lat, max_lat, min_lng, max_lng)
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for c in geohash:
+        ch = BASE32.index(c)
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (ch >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lng_range[0], lng_range[1]
+
+
+def cell_size(precision):
+    """
+    Ukuran satu sel geohash dalam derajat.
+
+    Returns:
+        tuple: (tinggi_lat, lebar_lng)
+    """
+    bits = precision * 5
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def _cell_span(min_lat, max_lat, min_lng, max_lng, precision):
+    """Index sel (baris, kolom) pertama & terakhir yang menutupi bounding box"""
+    lat_h, lng_w = cell_size(precision)
+    lat_cells = 1 << ((precision * 5) // 2)
+    lng_cells = 1 << ((precision * 5 + 1) // 2)
+    i0 = min(int(math.floor((min_lat + 90.0) / lat_h)), lat_cells - 1)
+    i1 = min(int(math.floor((max_lat + 90.0) / lat_h)), lat_cells - 1)
+    j0 = min(int(math.floor((min_lng + 180.0) / lng_w)), lng_cells - 1)
+    j1 = min(int(math.floor((max_lng + 180.0) / lng_w)), lng_cells - 1)
+    return i0, i1, j0, j1
+
+
+def covering_precision(min_lat, max_lat, min_lng, max_lng, max_cells=32):
+    """Presisi geohash tertinggi yang menutupi bounding box dengan <= max_cells sel"""
+    precision = 1
+    for p in range(1, GEOHASH_PRECISION + 1):
+        i0, i1, j0, j1 = _cell_span(min_lat, max_lat, min_lng, max_lng, p)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > max_cells:
+            break
+        precision = p
+    return precision
+
+
+def covering_prefixes(min_lat, max_lat, min_lng, max_lng, max_cells=32, precision=None):
+    """
+    Daftar prefix geohash yang bersama-sama menutupi bounding box.
+
+    Jika precision tidak diberikan, presisi dipilih setinggi mungkin selama
+    jumlah sel <= max_cells, jadi area yang di-scan tidak jauh lebih besar
+    dari viewport.
+
+    Returns:
+        list: Prefix geohash (semua dengan panjang yang sama)
+    """
+    if precision is None:
+        precision = covering_precision(min_lat, max_lat, min_lng, max_lng, max_cells)
+
+    lat_h, lng_w = cell_size(precision)
+    i0, i1, j0, j1 = _cell_span(min_lat, max_lat, min_lng, max_lng, precision)
+    prefixes = []
+    for i in range(i0, i1 + 1):
+        for j in range(j0, j1 + 1):
+            # Encode titik tengah sel -> geohash sel tersebut
+            center_lat = -90.0 + (i + 0.5) * lat_h
+            center_lng = -180.0 + (j + 0.5) * lng_w
+            prefixes.append(encode_geohash(center_lat, center_lng, precision))
+    return prefixes
+
+
+def distance_m(lat1, lng1, lat2, lng2):
+    """Jarak dua koordinat dalam meter (haversine)"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (float(lat1), float(lng1), float(lat2), float(lng2)))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def radius_bounds(lat, lng, radius_m):
+    """Bounding box (min_lat, max_lat, min_lng, max_lng) yang menutupi lingkaran radius_m"""
+    lat, lng = float(lat), float(lng)
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    dlng = dlat / max(math.cos(math.radians(lat)), 1e-6)
+    return (max(lat - dlat, -90.0), min(lat + dlat, 90.0),
+            max(lng - dlng, -180.0), min(lng + dlng, 180.0))
+
+
+def parse_bounds(args):
+    """
+    Baca dan validasi min_lat, max_lat, min_lng, max_lng dari query args.
+
+    Raises:
+        ValueError: Jika ada yang hilang, bukan angka atau di luar rentang
+
+    Returns:
+        tuple: (min_lat, max_lat, min_lng, max_lng)
+    """
+    try:
+        min_lat = float(args['min_lat'])
+        max_lat = float(args['max_lat'])
+        min_lng = float(args['min_lng'])
+        max_lng = float(args['max_lng'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Parameter min_lat, max_lat, min_lng, max_lng wajib berupa angka')
+
+    if not (-90 <= min_lat <= max_lat <= 90) or not (-180 <= min_lng <= max_lng <= 180):
+        raise ValueError('Bounding box tidak valid')
+    return min_lat, max_lat, min_lng, max_lng
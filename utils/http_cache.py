@@ -0,0 +1,91 @@
+"""
+HTTP Cache Helpers - Versi resource & ETag / If-None-Match
+"""
+from functools import wraps
+from flask import request, make_response, current_app, g
+from sqlalchemy import update
+from models import db, ResourceVersion
+from utils.compression import compression_enabled
+from utils.responses import negotiated_format
+
+
+def get_versions(names):
+    """
+    Ambil versi beberapa resource dalam satu query (PK lookup).
+
+    Returns:
+        list: Versi per nama, 0 jika resource belum pernah berubah
+    """
+    rows = db.session.query(ResourceVersion.name, ResourceVersion.version)\
+        .filter(ResourceVersion.name.in_(names)).all()
+    found = {name: version for name, version in rows}
+    return [found.get(name, 0) for name in names]
+
+
+def mark_changed(*names):
+    """
+    Naikkan versi resource. Dipanggil route tulis sebelum db.session.commit()
+    supaya perubahan versi ikut transaksi yang sama dengan datanya.
+    Nama resource juga dicatat di session.info untuk invalidasi response cache
+    setelah commit (lihat utils/response_cache.py).
+    """
+    db.session.info.setdefault('changed_resources', set()).update(names)
+    for name in names:
+        result = db.session.execute(
+            update(ResourceVersion)
+            .where(ResourceVersion.name == name)
+            .values(version=ResourceVersion.version + 1)
+        )
+        if result.rowcount == 0:
+            db.session.add(ResourceVersion(name=name, version=1))
+            db.session.flush()
+
+
+def build_etag(names, versions, fmt='json'):
+    """
+    Gabungkan nama dan versi resource menjadi nilai ETag, mis. 'posts.12-users.3'.
+    Format selain JSON ikut masuk ETag ('posts.12-users.3+msgpack'), karena body
+    MessagePack bukan representasi yang setara dengan JSON.
+    """
+    etag = '-'.join(f"{name}.{version}" for name, version in zip(names, versions))
+    return etag if fmt == 'json' else f"{etag}+{fmt}"
+
+
+def _set_vary(response):
+    # Sama untuk 200 dan 304, supaya proxy menyimpan varian per Accept/Accept-Encoding.
+    # gzip/br memakai ETag yang sama: weak ETag berlaku untuk isi yang setara.
+    response.vary.add('Accept')
+    if compression_enabled():
+        response.vary.add('Accept-Encoding')
+
+
+def etag_versioned(*names):
+    """
+    Decorator untuk endpoint list yang isinya hanya bergantung pada resource `names`.
+
+    Versi dibaca sebelum view dijalankan. Jika header If-None-Match cocok,
+    langsung balas 304 tanpa menjalankan query feed maupun serialisasi.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            versions = get_versions(names)
+            etag = build_etag(names, versions, negotiated_format())
+            g.resource_versions = dict(zip(names, versions))
+            g.resource_etag = etag
+
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag, weak=True)
+                _set_vary(response)
+                return response
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag, weak=True)
+                _set_vary(response)
+            return response
+
+        return decorated
+
+    return decorator
@@ -0,0 +1,96 @@
+"""
+Image Store - Penyimpanan gambar content-addressed
+
+Nama file = sha256 dari byte hasil normalisasi, di-shard 2 level dari prefix
+hash supaya satu folder tidak berisi ratusan ribu file:
+
+    uploads/3f/2c/3f2c9a...e1.jpg   (Post.image_path = '3f/2c/3f2c9a...e1.jpg')
+
+- Dua upload di detik yang sama tidak lagi saling menimpa.
+- Foto identik (mis. client retry) hanya disimpan sekali: keberadaan file
+  dicek sebelum menulis, jadi upload ulang tidak menyentuh disk sama sekali.
+- Satu file bisa dipakai beberapa post; jumlah referensi dihitung dari
+  Post.image_path (di-index) dan file baru dihapus saat referensi terakhir hilang.
+
+Upload identik yang bersamaan dengan penghapusan post terakhir yang memakai
+file (bisa di proses lain, jadi tanpa lock in-process):
+- release_image() memindahkan file ke tombstone dulu, lalu menghitung ulang
+  referensi di transaksi baru; jika ternyata masih dipakai, file dikembalikan.
+- Upload memanggil store_image() sekali lagi setelah post di-commit; jika file
+  sedang/sudah di-tombstone, file ditulis ulang dari byte yang masih dipegang.
+Salah satu dari dua pengecekan itu pasti melihat yang lain.
+"""
+import hashlib
+import os
+import uuid
+from models import db, Post
+from utils.images import save_variants, remove_image, write_atomic
+
+
+def content_digest(data):
+    """sha256 hex dari byte gambar (juga dipakai sebagai key cache deteksi)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def content_filename(data, ext):
+    """Path relatif content-addressed untuk byte gambar, mis. 'ab/cd/abcd...ef.jpg'"""
+    digest = content_digest(data)
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+
+def store_image(upload_folder, normalized, quality=85):
+    """
+    Simpan gambar hasil normalize_image() beserta variannya, kecuali sudah ada.
+
+    Args:
+        upload_folder: UPLOAD_FOLDER
+        normalized: NormalizedImage (image, data, ext)
+        quality: Kualitas encode varian
+
+    Returns:
+        tuple: (image_path relatif, True jika file baru ditulis)
+    """
+    filename = content_filename(normalized.data, normalized.ext)
+    path = os.path.join(upload_folder, filename)
+    if os.path.exists(path):
+        return filename, False
+
+    write_atomic(path, normalized.data)
+    save_variants(upload_folder, filename, normalized.image, quality)
+    return filename, True
+
+
+def image_refcount(image_path):
+    """Jumlah post yang memakai file ini (memakai index ix_posts_image_path)"""
+    return db.session.query(Post.id).filter(Post.image_path == image_path).count()
+
+
+def release_image(upload_folder, image_path):
+    """
+    Hapus file (+ varian) jika sudah tidak dipakai post mana pun.
+    Dipanggil setelah post yang memakainya dihapus dan di-commit.
+
+    Returns:
+        bool: True jika file dihapus
+    """
+    if image_refcount(image_path) > 0:
+        return False
+
+    path = os.path.join(upload_folder, image_path)
+    tombstone = f"{path}.{uuid.uuid4().hex}.del"
+    try:
+        os.replace(path, tombstone)
+    except FileNotFoundError:
+        remove_image(upload_folder, image_path)
+        return False
+
+    # Transaksi baru supaya post dari upload bersamaan yang baru commit ikut terhitung
+    db.session.commit()
+    if image_refcount(image_path) > 0:
+        os.replace(tombstone, path)
+        return False
+
+    os.remove(tombstone)
+    # Varian dibuat ulang secara lazy (ensure_variant) jika file asli ditulis ulang
+    remove_image(upload_folder, image_path)
+    return True
@@ -0,0 +1,211 @@
+"""
+Image Ingestion - Normalisasi gambar upload sebelum inferensi & disimpan
+
+Foto HP bisa 12 MP / 16 MB. Daripada decode resolusi penuh lalu menyimpan
+byte asli apa adanya, setiap upload dinormalisasi:
+1. Ukuran dibaca dari header (JPEG SOF / PNG IHDR) tanpa decode.
+2. Decode langsung di resolusi 1/2, 1/4 atau 1/8 (IMREAD_REDUCED_COLOR_*,
+   libjpeg men-skip DCT yang tidak perlu) selama hasilnya masih >= max_side.
+3. Orientasi EXIF diterapkan oleh cv2.imdecode (tanpa IMREAD_IGNORE_ORIENTATION).
+4. Sisi terpanjang diperkecil ke max_side (INTER_AREA).
+5. Di-encode ulang ke JPEG/WebP; metadata EXIF (termasuk GPS) ikut terbuang.
+
+Varian thumb/medium (untuk feed & peta) disimpan di UPLOAD_FOLDER/<varian>/
+dengan nama file yang sama dengan aslinya: dibuat saat upload, atau lazy saat
+pertama kali diminta lewat /uploads/<varian>/<filename> lalu di-cache di disk.
+"""
+import os
+import tempfile
+from collections import namedtuple
+import cv2
+import numpy as np
+
+IMAGE_FORMATS = {
+    'jpeg': ('.jpg', cv2.IMWRITE_JPEG_QUALITY),
+    'webp': ('.webp', cv2.IMWRITE_WEBP_QUALITY),
+}
+
+# Urutan dari reduksi terbesar; faktor dipakai jika sisi terpanjang // faktor >= max_side
+REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# Marker SOF JPEG (baseline, progressive, dst.) - bukan DHT/JPG/DAC
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# Varian gambar -> sisi terpanjang (px)
+IMAGE_VARIANTS = {
+    'thumb': 160,
+    'medium': 640,
+}
+
+_QUALITY_FLAGS = {
+    '.jpg': cv2.IMWRITE_JPEG_QUALITY,
+    '.jpeg': cv2.IMWRITE_JPEG_QUALITY,
+    '.webp': cv2.IMWRITE_WEBP_QUALITY,
+}
+
+# Ekstensi yang boleh dibuatkan varian (termasuk upload lama .png). File lain di
+# UPLOAD_FOLDER (.upload job async, .tmp dari write_atomic, .del dari release_image)
+# tidak bisa di-encode OpenCV dan tidak pernah dilayani sebagai varian.
+VARIANT_EXTENSIONS = frozenset(_QUALITY_FLAGS) | {'.png'}
+
+NormalizedImage = namedtuple('NormalizedImage', ['image', 'data', 'ext'])
+
+
+def image_size(data):
+    """
+    Baca (width, height) dari header JPEG/PNG tanpa decode.
+
+    Returns:
+        tuple: (width, height) atau None jika format tidak dikenal
+    """
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        return int.from_bytes(data[16:20], 'big'), int.from_bytes(data[20:24], 'big')
+
+    if data[:2] != b'\xff\xd8':
+        return None
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # marker tanpa panjang
+            i += 2
+            continue
+        if marker in _JPEG_SOF:
+            if i + 9 > len(data):
+                return None
+            return int.from_bytes(data[i + 7:i + 9], 'big'), int.from_bytes(data[i + 5:i + 7], 'big')
+        i += 2 + int.from_bytes(data[i + 2:i + 4], 'big')
+    return None
+
+
+def _decode_flag(size, max_side):
+    if size is None:
+        return cv2.IMREAD_COLOR
+    longest = max(size)
+    for factor, flag in REDUCED_FLAGS:
+        if longest // factor >= max_side:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def fit_within(img, max_side):
+    """Perkecil gambar (BGR) supaya sisi terpanjang <= max_side; tidak pernah memperbesar"""
+    h, w = img.shape[:2]
+    longest = max(h, w)
+    if longest <= max_side:
+        return img
+    scale = max_side / longest
+    return cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+def normalize_image(data, max_side=1280, fmt='jpeg', quality=85):
+    """
+    Decode (tereduksi), perbaiki orientasi, perkecil dan encode ulang gambar upload.
+
+    Args:
+        data: Byte file upload (JPEG, PNG, WebP, ...)
+        max_side: Batas sisi terpanjang (px)
+        fmt: 'jpeg' atau 'webp'
+        quality: Kualitas encode (0-100)
+
+    Returns:
+        NormalizedImage: (image BGR untuk model, data hasil encode, ext file)
+        atau None jika gambar tidak bisa di-decode
+    """
+    if not data:
+        return None
+    ext, quality_flag = IMAGE_FORMATS[fmt]
+
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), _decode_flag(image_size(data), max_side))
+    if img is None:
+        return None
+
+    img = fit_within(img, max_side)
+    ok, encoded = cv2.imencode(ext, img, [quality_flag, quality])
+    if not ok:
+        return None
+    return NormalizedImage(img, encoded.tobytes(), ext)
+
+
+# =========================
+# VARIAN THUMB / MEDIUM
+# =========================
+def variant_path(upload_folder, variant, filename):
+    return os.path.join(upload_folder, variant, filename)
+
+
+def write_atomic(path, data):
+    """Tulis via file sementara + rename supaya request lain tidak membaca file setengah jadi"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _write_variant(img, path, size, quality):
+    ext = os.path.splitext(path)[1].lower()
+    params = [_QUALITY_FLAGS[ext], quality] if ext in _QUALITY_FLAGS else []
+    ok, encoded = cv2.imencode(ext, fit_within(img, size), params)
+    if not ok:
+        return False
+    write_atomic(path, encoded.tobytes())
+    return True
+
+
+def save_variants(upload_folder, filename, img, quality=85):
+    """Buat semua varian dari gambar yang sudah di-decode (dipanggil saat upload)"""
+    for variant, size in IMAGE_VARIANTS.items():
+        _write_variant(img, variant_path(upload_folder, variant, filename), size, quality)
+
+
+def ensure_variant(upload_folder, variant, filename, quality=85):
+    """
+    Pastikan varian ada di disk; jika belum, buat dari file asli (lazy).
+
+    Returns:
+        bool: False jika varian tidak dikenal, ekstensi bukan gambar, atau file
+            asli tidak ada/rusak
+    """
+    if variant not in IMAGE_VARIANTS:
+        return False
+    if os.path.splitext(filename)[1].lower() not in VARIANT_EXTENSIONS:
+        return False
+    path = variant_path(upload_folder, variant, filename)
+    if os.path.exists(path):
+        return True
+
+    original = os.path.join(upload_folder, filename)
+    if not os.path.isfile(original):
+        return False
+    with open(original, 'rb') as f:
+        data = f.read()
+    size = IMAGE_VARIANTS[variant]
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), _decode_flag(image_size(data), size))
+    if img is None:
+        return False
+    return _write_variant(img, path, size, quality)
+
+
+def remove_image(upload_folder, filename):
+    """Hapus file asli beserta semua variannya (abaikan yang tidak ada)"""
+    paths = [os.path.join(upload_folder, filename)]
+    paths += [variant_path(upload_folder, variant, filename) for variant in IMAGE_VARIANTS]
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,114 @@
+"""
+Inference Batcher - Micro-batching yolo_model.predict untuk upload bersamaan
+
+Setiap upload memanggil predict() dengan satu gambar. InferenceBatcher
+menampung panggilan yang datang bersamaan (dari thread request maupun worker
+DetectionJob) sampai max_batch_size gambar atau max_wait_ms berlalu, lalu
+menjalankan satu predict(source=[img, ...]) dan membagikan hasil ke tiap
+pemanggil.
+
+Interface-nya sama dengan model YOLO (predict(source=img, ...) -> [result]),
+jadi app.py cukup membungkus model sebelum set_yolo_model(); route dan
+analyze_severity tidak berubah. Panggilan dengan argumen berbeda (mis. conf)
+tidak digabung dalam satu batch.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+def _kwargs_key(kwargs):
+    return tuple(sorted((k, repr(v)) for k, v in kwargs.items()))
+
+
+class InferenceBatcher:
+    """Pembungkus model YOLO yang menggabungkan predict() bersamaan jadi satu batch"""
+
+    def __init__(self, model, max_batch_size=8, max_wait_ms=10):
+        self.model = model
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0, max_wait_ms) / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._images = 0
+        self._largest = 0
+
+    def __getattr__(self, name):
+        # Atribut lain (names, device, ...) diteruskan ke model asli
+        if name == 'model':
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def predict(self, source, **kwargs):
+        """
+        Sama seperti model.predict() untuk satu gambar.
+
+        Returns:
+            list: [result] hasil gambar ini
+        """
+        if self.max_batch_size == 1 or isinstance(source, (list, tuple)):
+            return self.model.predict(source=source, **kwargs)
+
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((source, kwargs, future))
+        return future.result()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='inference-batcher', daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        """Ambil request pertama lalu tunggu sisa batch sampai penuh atau max_wait habis"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            groups = {}
+            for item in self._collect():
+                groups.setdefault(_kwargs_key(item[1]), []).append(item)
+            for items in groups.values():
+                self._run_batch(items)
+
+    def _run_batch(self, items):
+        try:
+            results = list(self.model.predict(source=[source for source, _, _ in items], **items[0][1]))
+            if len(results) != len(items):
+                raise RuntimeError(f"predict() mengembalikan {len(results)} hasil untuk {len(items)} gambar")
+        except Exception as e:
+            for _, _, future in items:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            self._batches += 1
+            self._images += len(items)
+            self._largest = max(self._largest, len(items))
+        for (_, _, future), result in zip(items, results):
+            future.set_result([result])
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+                'batches': self._batches,
+                'images': self._images,
+                'avg_batch_size': round(self._images / self._batches, 2) if self._batches else 0,
+                'largest_batch': self._largest
+            }
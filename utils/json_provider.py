@@ -0,0 +1,78 @@
+"""
+Fast JSON Provider - orjson untuk jsonify/response JSON, fallback ke stdlib
+
+Didaftarkan di app.py (`app.json = FastJSONProvider(app)`). Output setara
+dengan DefaultJSONProvider milik Flask:
+- datetime/date -> HTTP date (RFC 822), sama seperti Flask
+- Decimal -> string, UUID -> string, dataclass -> dict
+- Enum -> value (Flask default tidak mendukung ini)
+- key dict diurutkan (sort_keys) supaya body stabil untuk cache/ETag
+
+Bedanya hanya karakter non-ASCII dikirim sebagai UTF-8 (bukan \\uXXXX).
+Jika orjson tidak terpasang, atau ada nilai yang tidak didukung orjson
+(mis. integer > 64 bit), encode jatuh ke json stdlib.
+"""
+import decimal
+import enum
+from flask.json.provider import DefaultJSONProvider, _default as flask_default
+
+try:
+    import orjson
+except ImportError:  # orjson opsional
+    orjson = None
+
+
+def _default(o):
+    """Konversi tipe yang tidak dikenal encoder (dipakai orjson maupun stdlib)"""
+    if isinstance(o, enum.Enum):
+        return o.value
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    return flask_default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider berbasis orjson dengan fallback ke stdlib"""
+
+    default = staticmethod(_default)
+
+    def _orjson_option(self, pretty=False):
+        # Datetime lewat _default supaya formatnya sama dengan Flask (HTTP date),
+        # dataclass juga lewat _default supaya Enum/Decimal di dalamnya ikut dikonversi
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _dumps_bytes(self, obj, pretty=False):
+        """Encode ke bytes UTF-8, atau None jika orjson tidak bisa dipakai"""
+        if orjson is None:
+            return None
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._orjson_option(pretty))
+        except TypeError:
+            return None
+
+    def dumps(self, obj, **kwargs):
+        # Argumen khusus json.dumps (indent, cls, ...) hanya didukung stdlib
+        if not kwargs:
+            data = self._dumps_bytes(obj)
+            if data is not None:
+                return data.decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+
+        data = self._dumps_bytes(obj, pretty)
+        if data is None:
+            return super().response(obj)
+        return self._app.response_class(data + b'\n', mimetype=self.mimetype)
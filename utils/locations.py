@@ -0,0 +1,167 @@
+"""
+Location Helpers - Facet lokasi (provinsi -> kota -> kecamatan)
+"""
+from sqlalchemy import update, delete, insert, select, func, or_, and_
+from sqlalchemy.exc import IntegrityError
+from models import db, Post, PostLocation, normalize_location
+
+# Mode pencocokan filter lokasi. 'contains' (LIKE '%x%') tidak bisa memakai
+# index sehingga hanya dipakai jika diminta eksplisit.
+MATCH_MODES = ('exact', 'prefix', 'contains')
+
+MAX_CODE_POINT = 0x10FFFF
+SURROGATES = range(0xD800, 0xE000)
+
+
+def _prefix_upper_bound(key):
+    """
+    String terkecil yang lebih besar dari semua string berawalan `key`, atau
+    None jika tidak ada (key hanya berisi U+10FFFF). Karakter U+10FFFF di akhir
+    dibuang dulu; surrogate dilewati karena tidak bisa di-encode ke UTF-8.
+    """
+    key = key.rstrip(chr(MAX_CODE_POINT))
+    if not key:
+        return None
+    code = ord(key[-1]) + 1
+    if code in SURROGATES:
+        code = SURROGATES.stop
+    return key[:-1] + chr(code)
+
+
+def location_filter(column, value, match='prefix'):
+    """
+    Kondisi filter untuk kolom *_key (sudah ternormalisasi).
+
+    Args:
+        column: Post.province_key / Post.city_key / Post.district_key
+        value: Input user (akan dinormalisasi, tidak boleh kosong)
+        match: 'exact', 'prefix' atau 'contains'
+    """
+    key = normalize_location(value)
+    if match == 'exact':
+        return column == key
+    if match == 'prefix':
+        # Range key <= kolom < key' (karakter terakhir dinaikkan satu): selalu
+        # jadi index range scan, tidak tergantung aturan optimasi LIKE tiap database.
+        # Butuh kolom dengan urutan code point (utf8mb4_bin di MySQL, lihat models.py)
+        upper = _prefix_upper_bound(key)
+        if upper is None:
+            return column >= key
+        return and_(column >= key, column < upper)
+    escaped = key.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return column.like(f'%{escaped}%', escape='\\')
+
+
+def _location_key(province, city, district):
+    return (province or '', city or '', district or '')
+
+
+def record_post_location(province, city, district, delta):
+    """
+    Tambah/kurangi jumlah post untuk satu kombinasi lokasi.
+    Dipanggil di transaksi yang sama dengan insert/delete post.
+
+    Args:
+        province, city, district: Lokasi post (None dianggap kosong)
+        delta: +n untuk post baru, -n untuk post yang dihapus
+    """
+    key = _location_key(province, city, district)
+    if key == ('', '', '') or delta == 0:
+        return
+
+    province, city, district = key
+    where = (
+        PostLocation.province == province,
+        PostLocation.city == city,
+        PostLocation.district == district,
+    )
+    result = db.session.execute(
+        update(PostLocation).where(*where).values(post_count=PostLocation.post_count + delta)
+    )
+    if result.rowcount or delta < 0:
+        return
+
+    # Kombinasi baru. Savepoint supaya insert bersamaan dari request lain
+    # (unique constraint) cukup diulang sebagai UPDATE.
+    try:
+        with db.session.begin_nested():
+            db.session.add(PostLocation(province=province, city=city, district=district,
+                                        post_count=delta))
+    except IntegrityError:
+        db.session.execute(
+            update(PostLocation).where(*where).values(post_count=PostLocation.post_count + delta)
+        )
+
+
+def rebuild_location_facets():
+    """
+    Bangun ulang tabel post_locations dari tabel posts (backfill / perbaikan).
+
+    Returns:
+        int: Jumlah kombinasi lokasi
+    """
+    province = func.coalesce(Post.province, '')
+    city = func.coalesce(Post.city, '')
+    district = func.coalesce(Post.district, '')
+
+    db.session.execute(delete(PostLocation))
+    db.session.execute(
+        insert(PostLocation).from_select(
+            ['province', 'city', 'district', 'post_count'],
+            select(province, city, district, func.count(Post.id))
+            .where(or_(province != '', city != '', district != ''))
+            .group_by(province, city, district)
+        )
+    )
+    db.session.commit()
+    return PostLocation.query.count()
+
+
+def location_facets(with_tree=False):
+    """
+    Daftar lokasi unik dari tabel facet (satu query).
+
+    Returns:
+        dict: {'provinces', 'cities', 'districts'} dan opsional 'tree'
+            (provinsi -> kota -> kecamatan, masing-masing dengan jumlah post)
+    """
+    rows = db.session.query(
+        PostLocation.province, PostLocation.city, PostLocation.district, PostLocation.post_count
+    ).filter(PostLocation.post_count > 0).all()
+
+    result = {
+        'provinces': sorted({r.province for r in rows if r.province}),
+        'cities': sorted({r.city for r in rows if r.city}),
+        'districts': sorted({r.district for r in rows if r.district})
+    }
+
+    if with_tree:
+        tree = {}
+        for r in rows:
+            prov = tree.setdefault(r.province, {'count': 0, 'cities': {}})
+            prov['count'] += r.post_count
+            city = prov['cities'].setdefault(r.city, {'count': 0, 'districts': {}})
+            city['count'] += r.post_count
+            if r.district:
+                city['districts'][r.district] = city['districts'].get(r.district, 0) + r.post_count
+
+        result['tree'] = [
+            {
+                'name': p_name,
+                'count': prov['count'],
+                'cities': [
+                    {
+                        'name': c_name,
+                        'count': city['count'],
+                        'districts': [
+                            {'name': d_name, 'count': d_count}
+                            for d_name, d_count in sorted(city['districts'].items())
+                        ]
+                    }
+                    for c_name, city in sorted(prov['cities'].items()) if c_name
+                ]
+            }
+            for p_name, prov in sorted(tree.items()) if p_name
+        ]
+
+    return result
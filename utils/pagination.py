@@ -0,0 +1,153 @@
+"""
+Keyset (Cursor) Pagination Helper
+"""
+import base64
+import binascii
+import json
+import math
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Batas BIGINT signed, supaya id palsu yang terlalu besar tidak sampai ke driver DB
+MAX_INT = 2 ** 63 - 1
+
+
+class InvalidCursor(ValueError):
+    """Cursor tidak bisa di-decode atau tidak cocok dengan mode sort"""
+
+
+def parse_limit(value, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    """
+    Parse query param `limit` dan batasi ke rentang 1..maximum.
+
+    Raises:
+        ValueError: Jika limit bukan angka
+    """
+    if value in (None, ''):
+        return default
+    limit = int(value)
+    return max(1, min(limit, maximum))
+
+
+def encode_cursor(sort_name, values):
+    """
+    Encode nilai sort key terakhir (plus id) menjadi cursor opaque.
+
+    Args:
+        sort_name: Nama mode sort, supaya cursor tidak dipakai lintas mode
+        values: List nilai kolom sort key baris terakhir
+    """
+    payload = [sort_name] + [
+        {'dt': v.isoformat()} if isinstance(v, datetime) else v
+        for v in values
+    ]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def key_types(keys):
+    """
+    Tipe Python tiap sort key (datetime, int, float, ...) dari tipe kolomnya.
+    Ekspresi tanpa tipe Python (mis. skor relevansi MATCH/bm25) dianggap angka.
+    """
+    types = []
+    for key in keys:
+        try:
+            types.append(key.type.python_type)
+        except (AttributeError, NotImplementedError):
+            types.append(float)
+    return types
+
+
+def _valid_key_value(value, expected):
+    """Cek nilai hasil decode cocok dengan tipe sort key-nya"""
+    if expected is datetime:
+        return isinstance(value, datetime)
+    if isinstance(value, bool):
+        return False
+    if expected is int:
+        return isinstance(value, int) and abs(value) <= MAX_INT
+    if expected in (float, Decimal):
+        return isinstance(value, (int, float)) and math.isfinite(value)
+    return isinstance(value, expected)
+
+
+def decode_cursor(cursor, sort_name, types):
+    """
+    Kebalikan dari encode_cursor.
+
+    Args:
+        cursor: Cursor dari client
+        sort_name: Nama mode sort yang sedang dipakai
+        types: Tipe Python tiap sort key (lihat key_types())
+
+    Raises:
+        InvalidCursor: Jika cursor rusak, milik mode sort lain, atau tipe nilainya salah
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidCursor('Cursor tidak valid')
+
+    if not isinstance(payload, list) or len(payload) != len(types) + 1 or payload[0] != sort_name:
+        raise InvalidCursor('Cursor tidak valid')
+
+    values = []
+    for v, expected in zip(payload[1:], types):
+        if isinstance(v, dict):
+            try:
+                v = datetime.fromisoformat(v['dt'])
+            except (KeyError, TypeError, ValueError):
+                raise InvalidCursor('Cursor tidak valid')
+        if not _valid_key_value(v, expected):
+            raise InvalidCursor('Cursor tidak valid')
+        values.append(v)
+    return values
+
+
+def keyset_filter(keys, values):
+    """
+    Kondisi "setelah baris terakhir" untuk sort key yang semuanya DESC.
+
+    (k1 < v1) OR (k1 = v1 AND k2 < v2) OR ... ditulis dalam bentuk OR
+    yang diperluas supaya MySQL tetap bisa memakai index range scan.
+    """
+    clauses = []
+    for i, key in enumerate(keys):
+        conds = [keys[j] == values[j] for j in range(i)]
+        conds.append(key < values[i])
+        clauses.append(and_(*conds))
+    return or_(*clauses)
+
+
+def paginate_keyset(query, sort_name, keys, row_key, cursor=None, limit=DEFAULT_LIMIT):
+    """
+    Ambil satu halaman dari query dengan keyset pagination.
+
+    Args:
+        query: Query yang sudah difilter (belum di-order)
+        sort_name: Nama mode sort (ikut di-encode ke cursor)
+        keys: List kolom sort key, diurutkan DESC, kolom terakhir harus unik (id)
+        row_key: Fungsi row -> list nilai sort key
+        cursor: Cursor dari halaman sebelumnya (opsional)
+        limit: Jumlah maksimum baris per halaman
+
+    Returns:
+        tuple: (rows, next_cursor) - next_cursor None jika sudah halaman terakhir
+    """
+    if cursor:
+        values = decode_cursor(cursor, sort_name, key_types(keys))
+        query = query.filter(keyset_filter(keys, values))
+
+    rows = query.order_by(*[k.desc() for k in keys]).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort_name, row_key(rows[-1]))
+    return rows, next_cursor
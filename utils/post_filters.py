@@ -0,0 +1,103 @@
+"""
+Post Query Filters - Filter gabungan untuk /api/posts/query
+
+Setiap kombinasi umum punya index komposit yang diakhiri kolom sort
+(lihat Post.__table_args__), jadi filter + ORDER BY + LIMIT cukup berupa
+satu index range scan tanpa sort tambahan:
+
+- status             -> ix_posts_status_created / ix_posts_status_engagement
+- severity           -> ix_posts_severity_created
+- lokasi (exact)     -> ix_posts_location_created
+- author (user_id)   -> ix_posts_user_created
+- tanpa filter/rentang tanggal saja -> ix_posts_created
+"""
+from datetime import datetime, timedelta
+from models import Post
+from utils.locations import location_filter, MATCH_MODES
+
+STATUSES = ('MENUNGGU', 'DIPROSES', 'SELESAI')
+SEVERITIES = ('SERIUS', 'TIDAK_SERIUS')
+
+# Mode sort: sort key DESC, kolom terakhir Post.id supaya cursor unik
+QUERY_SORTS = {
+    'terbaru': ([Post.created_at, Post.id],
+                lambda r: [r.created_at, r.id]),
+    'trending': ([Post.engagement_score, Post.created_at, Post.id],
+                 lambda r: [r.engagement_score, r.created_at, r.id]),
+}
+
+
+def _parse_choices(value, choices, name):
+    """Parse daftar nilai dipisah koma (case-insensitive) yang harus ada di `choices`"""
+    values = [v.strip().upper() for v in value.split(',') if v.strip()]
+    invalid = [v for v in values if v not in choices]
+    if invalid:
+        raise ValueError(f"Nilai {name} tidak valid: {', '.join(invalid)}")
+    return values
+
+
+def _parse_date(value, name, end=False):
+    """
+    Parse tanggal ISO ('2024-05-01' atau '2024-05-01T08:00').
+    Untuk batas akhir berupa tanggal saja, seluruh hari itu ikut terhitung.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Format {name} tidak valid (gunakan YYYY-MM-DD)')
+    if parsed.tzinfo is not None:
+        parsed = parsed.replace(tzinfo=None) - parsed.utcoffset()
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def apply_post_filters(query, args):
+    """
+    Terapkan filter dari query args ke query post.
+
+    Args:
+        query: Query post (mis. dari post_list_query())
+        args: request.args
+
+    Raises:
+        ValueError: Jika ada parameter yang tidak valid
+
+    Returns:
+        Query yang sudah difilter
+    """
+    status = args.get('status', '').strip()
+    if status and status.lower() != 'all':
+        statuses = _parse_choices(status, STATUSES, 'status')
+        query = query.filter(Post.status == statuses[0] if len(statuses) == 1 else Post.status.in_(statuses))
+
+    severity = args.get('severity', '').strip()
+    if severity:
+        severities = _parse_choices(severity, SEVERITIES, 'severity')
+        query = query.filter(Post.severity == severities[0] if len(severities) == 1 else Post.severity.in_(severities))
+
+    match = args.get('match', 'prefix').lower()
+    if match not in MATCH_MODES:
+        raise ValueError('Parameter match harus exact, prefix atau contains')
+    for param, column in (('province', Post.province_key),
+                          ('city', Post.city_key),
+                          ('district', Post.district_key)):
+        value = args.get(param, '').strip()
+        if value:
+            query = query.filter(location_filter(column, value, match))
+
+    author = args.get('user_id', '').strip()
+    if author:
+        try:
+            query = query.filter(Post.user_id == int(author))
+        except ValueError:
+            raise ValueError('user_id harus berupa angka')
+
+    date_from = args.get('from', '').strip()
+    if date_from:
+        query = query.filter(Post.created_at >= _parse_date(date_from, 'from'))
+    date_to = args.get('to', '').strip()
+    if date_to:
+        query = query.filter(Post.created_at < _parse_date(date_to, 'to', end=True))
+
+    return query
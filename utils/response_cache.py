@@ -0,0 +1,241 @@
+"""
+In-Process Response Cache untuk endpoint baca yang berat
+
+- Key: path + host + query args yang dinormalisasi + format response (JSON/MessagePack)
+  (+ ETag versi resource jika ada)
+- Eviction: LRU dengan batas jumlah entry, plus TTL
+- Invalidasi: per tag resource ('posts', 'users', ...) setelah transaksi commit
+- Stampede protection: satu request menghitung, request lain dengan key sama menunggu
+- Kompresi: varian gzip/brotli disimpan di entry, jadi payload yang sering diminta
+  cukup dikompres sekali per encoding
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, g, current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from utils.responses import negotiated_format
+from utils.compression import (compress, compression_enabled, choose_encoding,
+                               should_compress, set_encoded_body)
+
+
+class CacheEntry:
+    """Body response yang sudah jadi beserta metadata-nya"""
+
+    __slots__ = ('body', 'status', 'mimetype', 'tags', 'expires_at', 'vary', 'variants')
+
+    def __init__(self, body, status, mimetype, tags, expires_at, vary=()):
+        self.body = body
+        self.status = status
+        self.mimetype = mimetype
+        self.tags = tags
+        self.expires_at = expires_at
+        self.vary = vary
+        # encoding ('gzip'/'br') -> body terkompres, diisi saat pertama diminta
+        self.variants = {}
+
+    def encoded(self, encoding):
+        """Body terkompres untuk encoding ini (dikompres sekali lalu disimpan)"""
+        body = self.variants.get(encoding)
+        if body is None:
+            # Tanpa lock: dua request bersamaan paling buruk mengompres dua kali
+            body = compress(self.body, encoding)
+            self.variants[encoding] = body
+        return body
+
+
+class ResponseCache:
+    """LRU + TTL cache yang thread-safe dengan invalidasi berbasis tag"""
+
+    def __init__(self, max_entries=256, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> [Lock, jumlah request yang sedang memakai lock]
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, max_entries=None, ttl=None):
+        """Ubah batas ukuran/TTL (dipanggil dari app.py sesuai Config)"""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if ttl is not None:
+                self.ttl = ttl
+            self._evict()
+
+    def _get(self, key):
+        """Ambil entry yang masih valid (harus dipanggil dengan self._lock)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._get(key)
+            if entry is not None:
+                self.hits += 1
+            return entry
+
+    def record_miss(self, count=1):
+        with self._lock:
+            self.misses += count
+
+    def set(self, key, body, status=200, mimetype='application/json', tags=(), vary=()):
+        entry = CacheEntry(body, status, mimetype, frozenset(tags), time.monotonic() + self.ttl, tuple(vary))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+        return entry
+
+    def _acquire_key_lock(self, key):
+        with self._lock:
+            slot = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        slot[0].acquire()
+        return slot
+
+    def _release_key_lock(self, key, slot):
+        slot[0].release()
+        with self._lock:
+            slot[1] -= 1
+            if slot[1] == 0:
+                self._key_locks.pop(key, None)
+
+    def get_or_compute(self, key, compute):
+        """
+        Ambil entry dari cache, atau jalankan `compute()` sekali saja untuk key ini.
+
+        Args:
+            key: Cache key
+            compute: Fungsi tanpa argumen yang mengembalikan (entry atau None, hasil asli).
+                Entry None berarti hasil tidak boleh di-cache (mis. error).
+
+        Returns:
+            tuple: (entry atau None, hasil asli atau None jika dari cache, hit)
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry, None, True
+
+        slot = self._acquire_key_lock(key)
+        try:
+            # Request lain mungkin sudah mengisi cache selama kita menunggu lock
+            entry = self.get(key)
+            if entry is not None:
+                return entry, None, True
+
+            self.record_miss()
+            entry, result = compute()
+            return entry, result, False
+        finally:
+            self._release_key_lock(key, slot)
+
+    def invalidate(self, *tags):
+        """Hapus semua entry yang bergantung pada salah satu tag"""
+        tags = set(tags)
+        with self._lock:
+            stale = [k for k, e in self._entries.items() if e.tags & tags]
+            for k in stale:
+                del self._entries[k]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0
+            }
+
+
+response_cache = ResponseCache()
+
+
+def _cache_key():
+    args = tuple(sorted(request.args.items(multi=True)))
+    # ETag dari etag_versioned (jika dipasang di atas decorator ini) membuat key
+    # otomatis berganti saat versi resource naik, termasuk dari worker lain.
+    return (request.path, request.host_url, args, negotiated_format(), g.get('resource_etag'))
+
+
+def cached_response(*tags):
+    """
+    Decorator untuk meng-cache response 200 sebuah endpoint GET.
+
+    Pasang di bawah @etag_versioned supaya 304 tetap dicek lebih dulu.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            key = _cache_key()
+
+            def compute():
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return None, response
+                entry = response_cache.set(
+                    key, response.get_data(), response.status_code, response.mimetype, tags,
+                    vary=response.vary
+                )
+                return entry, response
+
+            entry, response, hit = response_cache.get_or_compute(key, compute)
+            if response is None:
+                response = current_app.response_class(
+                    entry.body, status=entry.status, mimetype=entry.mimetype
+                )
+                response.vary.update(entry.vary)
+            if entry is not None and compression_enabled() and should_compress(response, len(entry.body)):
+                response.vary.add('Accept-Encoding')
+                encoding = choose_encoding()
+                if encoding is not None:
+                    set_encoded_body(response, entry.encoded(encoding), encoding)
+            response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+            return response
+
+        return decorated
+
+    return decorator
+
+
+# =========================
+# INVALIDASI SETELAH COMMIT
+# =========================
+# mark_changed() mencatat resource yang berubah di session.info; cache baru
+# dibuang setelah commit berhasil supaya request lain tidak sempat mengisi
+# ulang cache dengan data lama di antara invalidasi dan commit.
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    changed = session.info.pop('changed_resources', None)
+    if changed:
+        response_cache.invalidate(*changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('changed_resources', None)
@@ -0,0 +1,49 @@
+"""
+Response Helpers - Content negotiation JSON / MessagePack
+
+Endpoint list memakai api_response() alih-alih jsonify(). Client yang
+mengirim `Accept: application/msgpack` mendapat MessagePack (lebih kecil dan
+lebih cepat di-parse di HP), selain itu tetap JSON.
+"""
+from flask import request, jsonify, current_app
+
+try:
+    import msgpack
+except ImportError:  # msgpack opsional, tanpa library ini semua response JSON
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+
+def negotiated_format():
+    """
+    Format response dari header Accept ('json' atau 'msgpack').
+    JSON menang jika client menerima keduanya dengan prioritas sama (mis. */*).
+    """
+    if msgpack is None:
+        return 'json'
+    best = request.accept_mimetypes.best_match([JSON_MIMETYPE, MSGPACK_MIMETYPE])
+    return 'msgpack' if best == MSGPACK_MIMETYPE else 'json'
+
+
+def packb(data):
+    """Encode data ke MessagePack (nilai yang tidak dikenal dikirim sebagai string)"""
+    return msgpack.packb(data, use_bin_type=True, default=str)
+
+
+def api_response(data, status=200):
+    """
+    Response dengan format hasil negosiasi (JSON default, MessagePack jika diminta).
+
+    Args:
+        data: Payload (dict/list)
+        status: HTTP status code
+    """
+    if negotiated_format() == 'msgpack':
+        response = current_app.response_class(packb(data), status=status, mimetype=MSGPACK_MIMETYPE)
+    else:
+        response = jsonify(data)
+        response.status_code = status
+    response.vary.add('Accept')
+    return response
@@ -0,0 +1,68 @@
+"""
+Full-Text Search Posts (address + caption)
+
+Memakai index full-text milik database, bukan LIKE '%x%':
+- MySQL: MATCH(address, caption) AGAINST(... IN BOOLEAN MODE) pada index FULLTEXT
+- SQLite: tabel virtual FTS5 `posts_fts`, relevansi dari bm25()
+
+Semua term wajib ada (AND); term terakhir dicocokkan sebagai prefix supaya
+pencarian sambil mengetik tetap dapat hasil.
+"""
+import re
+from sqlalchemy import func, literal_column, table, column
+from sqlalchemy.dialects.mysql import match
+from models import db, Post
+from utils.serializers import post_list_query
+
+# Batas jumlah term per query supaya query full-text tetap murah
+MAX_TERMS = 8
+
+posts_fts = table('posts_fts', column('rowid'))
+
+
+def parse_search_terms(q):
+    """
+    Pecah input user menjadi term (huruf/angka saja, lowercase).
+    Tanda baca seperti pada "Jl. Sudirman" dibuang.
+
+    Returns:
+        list: Term, kosong jika tidak ada yang bisa dicari
+    """
+    return re.findall(r'\w+', (q or '').lower())[:MAX_TERMS]
+
+
+def fts5_query(terms):
+    """Query MATCH FTS5: setiap term di-quote, term terakhir sebagai prefix"""
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def mysql_boolean_query(terms):
+    """Query BOOLEAN MODE MySQL: setiap term wajib (+), term terakhir sebagai prefix"""
+    return ' '.join(f'+{t}' for t in terms) + '*'
+
+
+def search_posts_query(terms, fields=None):
+    """
+    Query post yang cocok dengan term, beserta sort key untuk paginasi.
+
+    Args:
+        terms: Hasil parse_search_terms()
+        fields: Sparse fieldset untuk post_list_query()
+
+    Returns:
+        tuple: (query, keys DESC [skor, id], row -> nilai key)
+    """
+    if db.session.get_bind().dialect.name == 'mysql':
+        score = match(Post.address, Post.caption, against=mysql_boolean_query(terms)).in_boolean_mode()
+        query = post_list_query(fields).add_columns(score.label('score')).filter(score > 0)
+    else:
+        fts = literal_column('posts_fts')
+        # bm25() makin kecil makin relevan, dibalik supaya bisa diurutkan DESC
+        score = -func.bm25(fts)
+        query = post_list_query(fields).add_columns(score.label('score'))\
+            .join(posts_fts, posts_fts.c.rowid == Post.id)\
+            .filter(fts.op('MATCH')(fts5_query(terms)))
+
+    return query, [score, Post.id], lambda r: [r.score, r.id]
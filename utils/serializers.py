@@ -0,0 +1,218 @@
+"""
+Bulk Serializer untuk list endpoint
+
+Post.to_dict() cocok untuk satu objek, tapi untuk list ia memuat ORM object
+per baris dan memicu lazy load `author` (N+1 query). Helper di sini mengambil
+kolom yang dibutuhkan saja dalam satu query JOIN lalu membangun dict langsung
+dari row, dengan output yang identik dengan Post.to_dict().
+
+Sparse fieldset (`?fields=id,lat,long`): hanya kolom untuk field yang diminta
+yang di-SELECT (JOIN ke users pun dilewati jika `uploaded_by` tidak diminta),
+dan dict hanya berisi field tersebut.
+"""
+from flask import request
+from models import db, Post, User, Review
+
+
+# Field payload post -> (kolom yang dibutuhkan, builder(row, upload_base))
+POST_FIELDS = {
+    'id': ([Post.id], lambda r, base: r.id),
+    'user_id': ([Post.user_id], lambda r, base: r.user_id),
+    'uploaded_by': ([User.full_name.label('uploaded_by')], lambda r, base: r.uploaded_by or 'Unknown'),
+    'image_url': ([Post.image_path], lambda r, base: base + r.image_path),
+    'thumb_url': ([Post.image_path], lambda r, base: f"{base}thumb/{r.image_path}"),
+    'medium_url': ([Post.image_path], lambda r, base: f"{base}medium/{r.image_path}"),
+    'lat': ([Post.latitude], lambda r, base: float(r.latitude)),
+    'long': ([Post.longitude], lambda r, base: float(r.longitude)),
+    'address': ([Post.address], lambda r, base: r.address or "Lokasi tidak diketahui"),
+    'province': ([Post.province], lambda r, base: r.province or ""),
+    'city': ([Post.city], lambda r, base: r.city or ""),
+    'district': ([Post.district], lambda r, base: r.district or ""),
+    'severity': ([Post.severity], lambda r, base: r.severity),
+    'pothole_count': ([Post.pothole_count], lambda r, base: r.pothole_count),
+    'caption': ([Post.caption], lambda r, base: r.caption),
+    'verification': ([Post.confirm_count, Post.false_count],
+                     lambda r, base: {'valid': r.confirm_count, 'false': r.false_count}),
+    'status': ([Post.status], lambda r, base: r.status.upper() if r.status else 'MENUNGGU'),
+    'date': ([Post.created_at], lambda r, base: r.created_at.isoformat(' ', 'minutes')[:16]),
+}
+
+# Kolom sort key feed/cursor, selalu ikut di-SELECT walau tidak diminta
+POST_KEY_COLUMNS = [Post.id, Post.created_at, Post.engagement_score]
+
+# Field payload user -> (kolom, builder(row))
+USER_FIELDS = {
+    'id': ([User.id], lambda r: r.id),
+    'username': ([User.username], lambda r: r.username),
+    'email': ([User.email], lambda r: r.email),
+    'full_name': ([User.full_name], lambda r: r.full_name),
+    'role': ([User.role], lambda r: r.role.value),
+    'phone': ([User.phone], lambda r: r.phone if r.phone else ""),
+    'bio': ([User.bio], lambda r: r.bio if r.bio else ""),
+    'points': ([User.points], lambda r: r.points),
+}
+
+
+def parse_fields(value, available):
+    """
+    Parse parameter `fields` (dipisah koma).
+
+    Raises:
+        ValueError: Jika ada nama field yang tidak dikenal
+
+    Returns:
+        list: Nama field sesuai urutan di `available`, atau None (semua field)
+    """
+    names = {f.strip() for f in (value or '').split(',') if f.strip()}
+    if not names:
+        return None
+    unknown = sorted(names - set(available))
+    if unknown:
+        raise ValueError(f"Field tidak dikenal: {', '.join(unknown)}")
+    return [name for name in available if name in names]
+
+
+def requested_fields(available):
+    """parse_fields() untuk query param `fields` request saat ini"""
+    return parse_fields(request.args.get('fields'), available)
+
+
+def _select_columns(fields, registry, extra=()):
+    """Kolom unik (berdasarkan nama) untuk field yang diminta"""
+    columns = {c.key: c for c in extra}
+    for name in fields:
+        for c in registry[name][0]:
+            columns.setdefault(c.key, c)
+    return list(columns.values())
+
+
+def post_list_query(fields=None):
+    """
+    Query kolom-kolom payload post + nama pelapor (satu JOIN, tanpa ORM object).
+
+    Args:
+        fields: List field dari parse_fields(), None untuk semua field
+    """
+    if fields is not None:
+        query = db.session.query(*_select_columns(fields, POST_FIELDS, POST_KEY_COLUMNS))
+        if 'uploaded_by' in fields:
+            query = query.outerjoin(User, User.id == Post.user_id)
+        return query
+
+    return db.session.query(
+        Post.id,
+        Post.user_id,
+        User.full_name.label('uploaded_by'),
+        Post.image_path,
+        Post.latitude,
+        Post.longitude,
+        Post.address,
+        Post.province,
+        Post.city,
+        Post.district,
+        Post.severity,
+        Post.pothole_count,
+        Post.caption,
+        Post.confirm_count,
+        Post.false_count,
+        Post.engagement_score,
+        Post.status,
+        Post.created_at,
+    ).outerjoin(User, User.id == Post.user_id)
+
+
+def iter_post_dicts(rows, fields=None):
+    """
+    Ubah hasil post_list_query() menjadi dict satu per satu (format sama dengan
+    Post.to_dict). Dipakai langsung oleh mode streaming.
+
+    Args:
+        rows: Iterable row dari post_list_query()
+        fields: Field yang sama dengan yang dipakai post_list_query()
+    """
+    upload_base = f"{request.host_url}uploads/"
+    if fields is not None:
+        builders = [(name, POST_FIELDS[name][1]) for name in fields]
+        for r in rows:
+            yield {name: build(r, upload_base) for name, build in builders}
+        return
+
+    for r in rows:
+        yield {
+            'id': r.id,
+            'user_id': r.user_id,
+            'uploaded_by': r.uploaded_by or 'Unknown',
+            'image_url': upload_base + r.image_path,
+            'thumb_url': f"{upload_base}thumb/{r.image_path}",
+            'medium_url': f"{upload_base}medium/{r.image_path}",
+            'lat': float(r.latitude),
+            'long': float(r.longitude),
+            'address': r.address or "Lokasi tidak diketahui",
+            'province': r.province or "",
+            'city': r.city or "",
+            'district': r.district or "",
+            'severity': r.severity,
+            'pothole_count': r.pothole_count,
+            'caption': r.caption,
+            'verification': {
+                'valid': r.confirm_count,
+                'false': r.false_count
+            },
+            'status': r.status.upper() if r.status else 'MENUNGGU',
+            # Sama dengan strftime('%Y-%m-%d %H:%M'), tapi jauh lebih murah per baris
+            'date': r.created_at.isoformat(' ', 'minutes')[:16]
+        }
+
+
+def serialize_post_rows(rows, fields=None):
+    """
+    Ubah hasil post_list_query() menjadi list dict (format sama dengan Post.to_dict).
+
+    Args:
+        rows: Iterable row dari post_list_query()
+        fields: Field yang sama dengan yang dipakai post_list_query()
+
+    Returns:
+        list: List dict post
+    """
+    return list(iter_post_dicts(rows, fields))
+
+
+def user_list_query(fields=None):
+    """Query kolom payload user (semua field jika fields None)"""
+    return db.session.query(*_select_columns(fields or list(USER_FIELDS), USER_FIELDS))
+
+
+def serialize_user_rows(rows, fields=None):
+    """Ubah hasil user_list_query() menjadi list dict (format sama dengan User.to_dict)"""
+    builders = [(name, USER_FIELDS[name][1]) for name in (fields or USER_FIELDS)]
+    return [{name: build(r) for name, build in builders} for r in rows]
+
+
+def review_list_query():
+    """Query kolom-kolom payload review + username/nama reviewer (satu JOIN)"""
+    return db.session.query(
+        Review.id,
+        Review.user_id,
+        User.username,
+        User.full_name,
+        Review.rating,
+        Review.comment,
+        Review.sentiment,
+        Review.created_at,
+    ).outerjoin(User, User.id == Review.user_id)
+
+
+def iter_review_dicts(rows):
+    """Ubah hasil review_list_query() menjadi dict (format sama dengan Review.to_dict)"""
+    for r in rows:
+        yield {
+            'id': r.id,
+            'user_id': r.user_id,
+            'username': r.username if r.username is not None else "Unknown",
+            'full_name': r.full_name if r.full_name is not None else "Unknown",
+            'rating': r.rating,
+            'comment': r.comment,
+            'sentiment': r.sentiment,
+            'created_at': r.created_at.isoformat(' ', 'minutes')[:16]
+        }
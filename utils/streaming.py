@@ -0,0 +1,52 @@
+"""
+Streaming JSON Response untuk listing besar
+
+Array JSON ditulis bertahap dari generator, jadi server tidak perlu membangun
+list dict lengkap maupun satu string JSON raksasa sebelum mengirim byte pertama.
+"""
+from flask import request, current_app, stream_with_context
+
+# Ukuran chunk kira-kira sebelum di-flush ke client
+CHUNK_SIZE = 64 * 1024
+
+# Jumlah baris yang diambil per fetch dari server-side cursor (query.yield_per)
+STREAM_BATCH_SIZE = 500
+
+
+def iter_json_array(items, chunk_size=CHUNK_SIZE):
+    """
+    Encode iterable dict menjadi potongan-potongan string JSON array.
+
+    Args:
+        items: Iterable item yang bisa di-serialize JSON
+        chunk_size: Ukuran minimum tiap potongan yang di-yield
+    """
+    dumps = current_app.json.dumps
+    buffer = ['[']
+    size = 1
+    separator = ''
+    for item in items:
+        encoded = dumps(item)
+        buffer.append(separator)
+        buffer.append(encoded)
+        size += len(encoded) + 1
+        separator = ','
+        if size >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    buffer.append(']')
+    yield ''.join(buffer)
+
+
+def stream_json_array(items):
+    """Response JSON array yang di-stream (request context tetap aktif selama streaming)"""
+    return current_app.response_class(
+        stream_with_context(iter_json_array(items)),
+        mimetype='application/json'
+    )
+
+
+def wants_stream():
+    """True jika client meminta mode streaming (?stream=1)"""
+    return request.args.get('stream', '').lower() in ('1', 'true', 'yes')